@@ -1,7 +1,5 @@
-import pandas as pd
-
-
-def compute_tcap(dmsg, dominator_mutants, dominator_mutant_detecting_tests, short_names_to_nodes_mapping):
+def compute_tcap(dmsg, dominator_mutants, dominator_mutant_detecting_tests, short_names_to_nodes_mapping,
+                 verbose=True):
     """
     Computes the TCAP (Test Coverage Adequacy Percentage) score for each mutant in a Directed Mutation Subsumption Graph (DMSG).
 
@@ -15,12 +13,15 @@ def compute_tcap(dmsg, dominator_mutants, dominator_mutant_detecting_tests, shor
         dominator_mutants (set): A set of dominator mutants (mutants that have no parents in the graph).
         dominator_mutant_detecting_tests (set): The set of tests that detect dominator mutants.
         short_names_to_nodes_mapping (dict): A mapping from short mutant names to their corresponding nodes in the graph.
+        verbose (bool): Whether to print the intermediate and final scores.
 
     Returns:
         pd.DataFrame: A DataFrame containing the TCAP scores for each mutant, with columns "Mutant" and "TCAP".
     """
+    import pandas as pd
 
-    print("Computing TCAP...")
+    if verbose:
+        print("Computing TCAP...")
 
     # Dictionary to store TCAP scores for each node in the DMSG
     tcap_scores = {}
@@ -38,7 +39,8 @@ def compute_tcap(dmsg, dominator_mutants, dominator_mutant_detecting_tests, shor
                 tcap = 0  # If no tests detect the mutant, the TCAP is 0
             tcap_scores[mutant_node] = tcap
 
-    print(f"TCAP scores for each mutant node: {tcap_scores}")
+    if verbose:
+        print(f"TCAP scores for each mutant node: {tcap_scores}")
 
     # Break down the TCAP scores for each mutant by splitting the short names
     tcap_scores_per_mutant = {mutant: tcap for node, tcap in tcap_scores.items()
@@ -47,7 +49,8 @@ def compute_tcap(dmsg, dominator_mutants, dominator_mutant_detecting_tests, shor
 
     # Create a DataFrame from the TCAP scores
     tcap_scores_df = pd.DataFrame(tcap_scores_per_mutant.items(), columns=["Mutant", "TCAP"])
-    print(f"TCAP scores for each mutant: {tcap_scores_df}")
+    if verbose:
+        print(f"TCAP scores for each mutant: {tcap_scores_df}")
 
 
     return tcap_scores_df
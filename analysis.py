@@ -0,0 +1,185 @@
+from functools import cached_property
+
+from MutantNode import MutantNode
+from TCAP_calculator import compute_tcap
+from graph_results import compute_dominator_mutants, compute_lowest_layer_mutants
+from parser import build_subsumption_graph, generate_mutation_subsumption_graph
+from writers import write_table
+
+# rough per-object costs used to estimate how much memory a built analysis holds
+NODE_OVERHEAD_BYTES = 1024
+TEST_ENTRY_BYTES = 120
+
+
+class MutationAnalysis:
+    """
+    In-memory mutation subsumption analysis.
+
+    Results are computed on first access and kept, and nothing is printed or written to disk unless
+    ``write_csvs`` or ``plot`` is called explicitly.
+
+    Example:
+        analysis = MutationAnalysis.from_kill_sets({"m1": {"t1"}, "m2": {"t1", "t2"}, "m3": set()})
+        analysis.dominator_mutants    # DataFrame with the columns Node, Mutants, Tests
+        analysis.tcap_of("m2")        # 0.5
+    """
+
+    def __init__(self, hierarchy, merged_nodes, short_names_to_nodes_mapping):
+        self.hierarchy = hierarchy
+        self.merged_nodes = merged_nodes
+        self.short_names_to_nodes_mapping = short_names_to_nodes_mapping
+
+    @classmethod
+    def from_dataframes(cls, csv_df, column_for_mutants_in_csv, killmatrix_df, column_for_mutants_in_kill_matrix,
+                        column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix):
+        """Build the analysis from the mutants and kill matrix DataFrames that ``main.py`` reads from CSV."""
+        return cls(*generate_mutation_subsumption_graph(
+            csv_df, column_for_mutants_in_csv, killmatrix_df, column_for_mutants_in_kill_matrix,
+            column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix, show_progress=False))
+
+    @classmethod
+    def from_kill_sets(cls, kill_sets):
+        """
+        Build the analysis from a mapping of mutant IDs to the tests that kill them.
+
+        Mutants that no test kills must be present with an empty set.
+        """
+        nodes = {}
+        for mutant, tests in kill_sets.items():
+            nodes[mutant] = MutantNode(mutant)
+            nodes[mutant].add_tests(tests)
+        return cls(*build_subsumption_graph(nodes))
+
+    @classmethod
+    def from_arrays(cls, kill_matrix, mutant_ids, test_ids):
+        """
+        Build the analysis from a boolean ``(mutants, tests)`` array where ``kill_matrix[i][j]`` is true when test
+        ``test_ids[j]`` kills mutant ``mutant_ids[i]``.
+        """
+        import numpy as np
+
+        kill_matrix = np.asarray(kill_matrix, dtype=bool)
+        return cls.from_kill_sets({mutant: {test_ids[j] for j in np.flatnonzero(row)}
+                                   for mutant, row in zip(mutant_ids, kill_matrix)})
+
+    @cached_property
+    def _dominators(self):
+        return compute_dominator_mutants(self.hierarchy, self.short_names_to_nodes_mapping)
+
+    @property
+    def dominator_mutants(self):
+        """pd.DataFrame: The dominator mutants with the columns Node, Mutants and Tests."""
+        return self._dominators[0]
+
+    @property
+    def dominator_mutant_detecting_tests(self):
+        """set: The tests that detect at least one dominator mutant."""
+        return self._dominators[1]
+
+    @cached_property
+    def lowest_layer_mutants(self):
+        """pd.DataFrame: The lowest layer mutants with the columns Node, Mutants, Unique Tests and Tests."""
+        return compute_lowest_layer_mutants(self.hierarchy, self.merged_nodes, self.short_names_to_nodes_mapping)
+
+    @cached_property
+    def tcap_scores(self):
+        """pd.DataFrame: The TCAP of every mutant with the columns Mutant and TCAP."""
+        return compute_tcap(self.hierarchy, set(self.dominator_mutants["Node"]), self.dominator_mutant_detecting_tests,
+                            self.short_names_to_nodes_mapping, verbose=False)
+
+    @cached_property
+    def reachability_index(self):
+        from reachability import ReachabilityIndex
+
+        return ReachabilityIndex.from_hierarchy(self.hierarchy)
+
+    @cached_property
+    def priority_scores(self):
+        """pd.DataFrame: The priority score of every mutant, highest first."""
+        from prioritization import compute_mutant_priority_scores
+
+        return compute_mutant_priority_scores(self.hierarchy, self.short_names_to_nodes_mapping,
+                                              self.reachability_index)
+
+    @cached_property
+    def graph_metrics(self):
+        """metrics.GraphMetrics: The depth, layer widths, longest chains, and class sizes of the graph."""
+        from metrics import GraphMetrics
+
+        return GraphMetrics(self.hierarchy, self.short_names_to_nodes_mapping, self.reachability_index)
+
+    @cached_property
+    def _tcap_by_mutant(self):
+        return dict(zip(self.tcap_scores["Mutant"].astype(str), self.tcap_scores["TCAP"]))
+
+    @cached_property
+    def _node_by_mutant(self):
+        return {str(mutant): self.merged_nodes[short_name]
+                for short_name, mutants in self.short_names_to_nodes_mapping.items()
+                for mutant in mutants.split("-")}
+
+    def node_of(self, mutant):
+        """Return the node of the equivalence class that contains the mutant."""
+        if str(mutant) not in self._node_by_mutant:
+            raise KeyError(f"Unknown mutant: {mutant}")
+        return self._node_by_mutant[str(mutant)]
+
+    def mutants_of(self, node):
+        """Return the sorted mutant IDs merged into the node."""
+        return sorted(self.short_names_to_nodes_mapping[node.name].split("-"))
+
+    def tcap_of(self, mutant):
+        self.node_of(mutant)
+        return self._tcap_by_mutant[str(mutant)]
+
+    def dominators_subsuming(self, mutant):
+        """Return the dominator nodes that subsume the mutant (its own node if it is a dominator)."""
+        node = self.node_of(mutant)
+        dominator_nodes = set(self.dominator_mutants["Node"])
+        candidates = self.reachability_index.subsumers_of(node) + [node]
+        return sorted((candidate for candidate in candidates if candidate in dominator_nodes),
+                      key=lambda candidate: candidate.name)
+
+    def unique_tests_of(self, mutant):
+        """Return the unique tests of the mutant if it is in the lowest layer, otherwise None."""
+        node = self.node_of(mutant)
+        if node not in set(self.lowest_layer_mutants["Node"]):
+            return None
+        return node.unique_tests
+
+    def estimated_size(self):
+        """
+        Estimate the bytes held by the graph: a fixed cost per node, a cost per stored test, and the closure bitsets.
+        """
+        size = sum(NODE_OVERHEAD_BYTES + TEST_ENTRY_BYTES * (len(node.tests) + len(node.unique_tests))
+                   for node in self.merged_nodes.values())
+        if "reachability_index" in self.__dict__:
+            reachability_index = self.reachability_index
+            for closure in ("descendants", "ancestors"):
+                if closure in reachability_index.__dict__:
+                    size += reachability_index.__dict__[closure].nbytes
+        return size
+
+    def write_csvs(self, results_dir, results_prefix="", tcap=True, output_format="csv", compression=None):
+        """
+        Write the result tables with the file names used by ``main.py``.
+
+        Args:
+            output_format (str): ``csv``, ``long_csv``, or ``parquet``, as for ``write_table``.
+            compression (str, optional): The compression of the written files.
+
+        Returns:
+            list: The paths of the written files.
+        """
+        tables = {"dominator_mutants_tests": self.dominator_mutants,
+                  "lowest_layer_mutant_to_unique_tests": self.lowest_layer_mutants}
+        if tcap:
+            tables["tcap_scores"] = self.tcap_scores
+
+        return [write_table(table, results_dir, results_prefix, name, output_format, compression)
+                for name, table in tables.items()]
+
+    def plot(self, results_dir, results_prefix=""):
+        from plot import plot_graph
+
+        plot_graph(self.hierarchy, results_dir, results_prefix)
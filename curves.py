@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from kill_matrix import DEFAULT_MEMORY_BUDGET, EncodedKillMatrix
+from out_of_core import classes_killed_by_tests, generate_packed_subsumption_graph
+
+CURVE_COLUMNS = ["Step", "Test", "Killed Mutants", "Mutation Score", "Dominators Killed", "Dominator Score",
+                 "Mean Suite TCAP"]
+
+
+def read_test_order(test_order_file):
+    """Read a test order file with one test ID per line, ignoring blank lines."""
+    with open(test_order_file) as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+class OrderingCurves:
+    """
+    Mutation score, dominator score, and TCAP curves of test orderings over one kill matrix.
+
+    The subsumption graph of the full test suite is built once, together with the list of equivalence classes
+    each test kills. A curve is then one sweep over the ordered tests that only updates the classes each test
+    kills, so its cost is proportional to the number of kills instead of a full recomputation per prefix.
+
+    For a prefix of the ordering, a class is killed once any of its tests has run. Its suite TCAP counts only the
+    tests run so far, measured against the dominators of the full suite: 1.0 for a killed dominator, and otherwise
+    the share of its killing tests seen so far that detect a dominator of the full suite. This is not the TCAP of
+    the prefix analyzed as a test suite of its own, whose dominators would be recomputed from the prefix's kill
+    sets, hence the Mean Suite TCAP column. Only after the last test of a complete ordering does it equal the mean
+    TCAP of ``compute_tcap``.
+    """
+
+    def __init__(self, encoded: EncodedKillMatrix, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.graph = generate_packed_subsumption_graph(encoded, memory_budget)
+        self.test_ids = encoded.test_ids
+        self.test_positions = {test: j for j, test in enumerate(self.test_ids)}
+        self.n_mutants = encoded.n_mutants
+        self.class_sizes = np.array([len(members) for members in self.graph.members], dtype=np.int64)
+
+        self.is_dominator = np.zeros(self.graph.n_classes, dtype=bool)
+        self.is_dominator[self.graph.dominators()] = True
+        self.n_dominators = int(self.is_dominator.sum())
+
+        self._kill_offsets, self._killed_classes = classes_killed_by_tests(self.graph, memory_budget)
+        dominator_kills = np.bincount(self._kill_test_positions(), weights=self.is_dominator[self._killed_classes],
+                                      minlength=len(self.test_ids))
+        self.detects_dominator = dominator_kills > 0
+
+    def _kill_test_positions(self):
+        return np.repeat(np.arange(len(self.test_ids)), np.diff(self._kill_offsets))
+
+    def classes_killed_by(self, test):
+        position = self.test_positions[test]
+        return self._killed_classes[self._kill_offsets[position]:self._kill_offsets[position + 1]]
+
+    def curve(self, test_order):
+        """
+        Compute the curve of one test ordering.
+
+        Args:
+            test_order (list): Test IDs in the order they run. Tests left out are never run.
+
+        Returns:
+            pd.DataFrame: One row per test with the columns of ``CURVE_COLUMNS``.
+        """
+        unknown = [test for test in test_order if test not in self.test_positions]
+        if unknown:
+            raise ValueError(f"Tests not in the kill matrix: {unknown[:10]}")
+
+        seen_tests = np.zeros(self.graph.n_classes, dtype=np.int64)
+        seen_dominator_tests = np.zeros(self.graph.n_classes, dtype=np.int64)
+        tcap = np.zeros(self.graph.n_classes, dtype=np.float64)
+        has_run = set()
+        killed_mutants = dominators_killed = 0
+        tcap_sum = 0.0
+
+        rows = []
+        for step, test in enumerate(test_order, start=1):
+            if test not in has_run:
+                has_run.add(test)
+                hit = self.classes_killed_by(test)
+                newly_killed = hit[seen_tests[hit] == 0]
+                killed_mutants += int(self.class_sizes[newly_killed].sum())
+                dominators_killed += int(self.is_dominator[newly_killed].sum())
+
+                seen_tests[hit] += 1
+                if self.detects_dominator[self.test_positions[test]]:
+                    seen_dominator_tests[hit] += 1
+                new_tcap = np.where(self.is_dominator[hit], 1.0, seen_dominator_tests[hit] / seen_tests[hit])
+                tcap_sum += float(((new_tcap - tcap[hit]) * self.class_sizes[hit]).sum())
+                tcap[hit] = new_tcap
+
+            rows.append((step, test, killed_mutants, killed_mutants / max(1, self.n_mutants), dominators_killed,
+                         dominators_killed / max(1, self.n_dominators), tcap_sum / max(1, self.n_mutants)))
+        return pd.DataFrame(rows, columns=CURVE_COLUMNS)
+
+    def compare(self, test_orders):
+        """
+        Compute the curves of several orderings and summarize each one.
+
+        Args:
+            test_orders (dict): Ordering name to list of test IDs.
+
+        Returns:
+            tuple: ``(curves_df, summary_df)``. ``curves_df`` stacks the curves with an Ordering column;
+            ``summary_df`` has one row per ordering with the mean of each score over its steps (the normalized
+            area under the curve, higher is better) and the number of steps until every dominator is killed.
+        """
+        curves, summary = [], []
+        for name, test_order in test_orders.items():
+            curve = self.curve(test_order)
+            curves.append(curve.assign(Ordering=name)[["Ordering"] + CURVE_COLUMNS])
+
+            all_killed = curve.index[curve["Dominators Killed"] == self.n_dominators]
+            summary.append({
+                "Ordering": name,
+                "Steps": len(curve),
+                "Mutation Score AUC": curve["Mutation Score"].mean() if len(curve) else 0.0,
+                "Dominator Score AUC": curve["Dominator Score"].mean() if len(curve) else 0.0,
+                "Mean Suite TCAP AUC": curve["Mean Suite TCAP"].mean() if len(curve) else 0.0,
+                "Steps To All Dominators": int(curve["Step"][all_killed[0]]) if len(all_killed) else None,
+            })
+        curves_df = pd.concat(curves, ignore_index=True) if curves else pd.DataFrame(columns=["Ordering"] +
+                                                                                      CURVE_COLUMNS)
+        return curves_df, pd.DataFrame(summary)
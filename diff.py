@@ -0,0 +1,137 @@
+import pandas as pd
+
+from incremental import IncrementalSubsumptionGraph
+
+
+def kill_sets_from_kill_matrix(kill_matrix_df: pd.DataFrame, column_for_mutants: int, column_for_tests: int,
+                               column_for_kill_status: int, mutant_ids=None):
+    """
+    Return every mutant's kill set, including empty sets for mutants no test kills.
+
+    Args:
+        mutant_ids (list, optional): Mutants to include, e.g. those of the mutants CSV. Defaults to the mutants of
+            the kill matrix.
+    """
+    mutant_column = kill_matrix_df.iloc[:, column_for_mutants]
+    killed = kill_matrix_df[kill_matrix_df.iloc[:, column_for_kill_status] == 1]
+    grouped = killed.groupby(killed.columns[column_for_mutants])[killed.columns[column_for_tests]].apply(frozenset)
+    kill_sets = dict.fromkeys(mutant_column.unique() if mutant_ids is None else mutant_ids, frozenset())
+    kill_sets.update(grouped.to_dict())
+    return kill_sets
+
+
+class KillMatrixDiff:
+    """
+    The dominator, edge, and TCAP changes between a baseline and a candidate kill matrix.
+
+    The candidate graph is derived from the baseline graph by moving only the mutants whose kill sets changed, so
+    equivalence classes and edges that the changed tests do not touch are reused as they are.
+    """
+
+    def __init__(self, baseline: IncrementalSubsumptionGraph, candidate: IncrementalSubsumptionGraph,
+                 changed_mutants, changed_tests):
+        self.baseline = baseline
+        self.candidate = candidate
+        self.changed_mutants = changed_mutants
+        self.changed_tests = changed_tests
+
+        baseline_tests = baseline.dominator_mutant_detecting_tests()
+        candidate_tests = candidate.dominator_mutant_detecting_tests()
+        self.baseline_tcap = baseline.tcap(dominator_mutant_detecting_tests=baseline_tests)
+        if baseline_tests == candidate_tests and self._same_dominators():
+            # the scores of mutants whose kill sets did not change cannot move
+            self.candidate_tcap = dict(self.baseline_tcap)
+            self.candidate_tcap.update(candidate.tcap(changed_mutants, candidate_tests))
+        else:
+            self.candidate_tcap = candidate.tcap(dominator_mutant_detecting_tests=candidate_tests)
+
+    def _same_dominators(self):
+        return set(self.baseline.dominators()) == set(self.candidate.dominators())
+
+    @staticmethod
+    def _members(graph, tests):
+        return {str(mutant) for mutant in graph.classes[tests]}
+
+    def dominator_changes(self):
+        """pd.DataFrame: Dominator classes that appeared or disappeared, with the columns Change, Mutants, Tests."""
+        def keyed(graph):
+            return {(tests, frozenset(self._members(graph, tests))): tests for tests in graph.dominators()}
+
+        baseline, candidate = keyed(self.baseline), keyed(self.candidate)
+        rows = [{"Change": "removed", "Mutants": set(key[1]), "Tests": set(key[0])}
+                for key in baseline if key not in candidate]
+        rows += [{"Change": "added", "Mutants": set(key[1]), "Tests": set(key[0])}
+                 for key in candidate if key not in baseline]
+        return pd.DataFrame(rows, columns=["Change", "Mutants", "Tests"])
+
+    def edge_changes(self):
+        """pd.DataFrame: Direct subsumption edges that appeared or disappeared, between the mutants of each class."""
+        baseline, candidate = self.baseline.edges(), self.candidate.edges()
+        rows = [{"Change": "removed", "Parent Mutants": self._members(self.baseline, parent),
+                 "Child Mutants": self._members(self.baseline, child)} for parent, child in baseline - candidate]
+        rows += [{"Change": "added", "Parent Mutants": self._members(self.candidate, parent),
+                  "Child Mutants": self._members(self.candidate, child)} for parent, child in candidate - baseline]
+        return pd.DataFrame(rows, columns=["Change", "Parent Mutants", "Child Mutants"])
+
+    def tcap_changes(self):
+        """pd.DataFrame: Mutants whose TCAP changed, with the columns Mutant, Baseline TCAP, Candidate TCAP, Delta."""
+        rows = []
+        for mutant, candidate_tcap in self.candidate_tcap.items():
+            baseline_tcap = self.baseline_tcap.get(mutant, 0)
+            if candidate_tcap != baseline_tcap:
+                rows.append({"Mutant": str(mutant), "Baseline TCAP": baseline_tcap, "Candidate TCAP": candidate_tcap,
+                             "Delta": candidate_tcap - baseline_tcap})
+        return pd.DataFrame(rows, columns=["Mutant", "Baseline TCAP", "Candidate TCAP", "Delta"])
+
+    def summary(self):
+        baseline_mean = sum(self.baseline_tcap.values()) / max(1, len(self.baseline_tcap))
+        candidate_mean = sum(self.candidate_tcap.values()) / max(1, len(self.candidate_tcap))
+        dominator_changes = self.dominator_changes()
+        edge_changes = self.edge_changes()
+        return {
+            "Changed Tests": len(self.changed_tests),
+            "Changed Mutants": len(self.changed_mutants),
+            "Dominators Added": int((dominator_changes["Change"] == "added").sum()),
+            "Dominators Removed": int((dominator_changes["Change"] == "removed").sum()),
+            "Edges Added": int((edge_changes["Change"] == "added").sum()),
+            "Edges Removed": int((edge_changes["Change"] == "removed").sum()),
+            "Baseline Mean TCAP": baseline_mean,
+            "Candidate Mean TCAP": candidate_mean,
+        }
+
+
+def diff_kill_matrices(baseline_df, candidate_df, column_for_mutants: int, column_for_tests: int,
+                       column_for_kill_status: int, mutant_ids=None):
+    """
+    Compare the subsumption graphs of two kill matrices in the same layout.
+
+    The baseline graph is built once; the candidate graph is a copy of it in which only the mutants whose kill
+    sets changed are moved between classes.
+
+    Returns:
+        KillMatrixDiff: The changes between the two kill matrices.
+    """
+    baseline_sets = kill_sets_from_kill_matrix(baseline_df, column_for_mutants, column_for_tests,
+                                               column_for_kill_status, mutant_ids)
+    candidate_sets = kill_sets_from_kill_matrix(candidate_df, column_for_mutants, column_for_tests,
+                                                column_for_kill_status, mutant_ids)
+
+    baseline = IncrementalSubsumptionGraph.from_kill_sets(baseline_sets)
+    candidate = baseline.copy()
+
+    changed_mutants = []
+    changed_tests = set()
+    for mutant, tests in candidate_sets.items():
+        old_tests = baseline_sets.get(mutant, frozenset())
+        if tests != old_tests or mutant not in baseline_sets:
+            changed_mutants.append(mutant)
+            changed_tests |= tests ^ old_tests
+            candidate.set_kill_set(mutant, tests)
+    for mutant in baseline_sets.keys() - candidate_sets.keys():
+        # mutants missing from the candidate matrix are no longer killed
+        if baseline_sets[mutant]:
+            changed_mutants.append(mutant)
+            changed_tests |= baseline_sets[mutant]
+            candidate.set_kill_set(mutant, frozenset())
+
+    return KillMatrixDiff(baseline, candidate, changed_mutants, changed_tests)
@@ -0,0 +1,139 @@
+import json
+import os
+from os import path
+
+import pandas as pd
+
+from analysis import NODE_OVERHEAD_BYTES, TEST_ENTRY_BYTES
+from kill_matrix import row_bytes_for
+
+ENGINES = ["in_memory", "vectorized", "out_of_core"]
+
+# rough costs of the in-memory path: a DataFrame row of the kill matrix, and the seconds per row read, per
+# pair of mutants compared, and per test in each comparison
+DATAFRAME_ROW_BYTES = 250
+SECONDS_PER_ROW = 1e-6
+SECONDS_PER_PAIR = 2e-7
+SECONDS_PER_PAIR_TEST = 1e-8
+# rough costs of the packed engines: the bytes per mutant or test ID, and the seconds per packed byte compared
+ID_BYTES = 100
+SECONDS_PER_PACKED_BYTE = 1e-9
+OUT_OF_CORE_SLOWDOWN = 1.5
+
+
+class KillMatrixProfile:
+    """The size and density of a kill matrix, enough to estimate what each engine will need."""
+
+    def __init__(self, n_rows, n_mutants, n_tests, n_kills):
+        self.n_rows = n_rows
+        self.n_mutants = n_mutants
+        self.n_tests = n_tests
+        self.n_kills = n_kills
+
+    @property
+    def density(self):
+        return self.n_kills / max(1, self.n_mutants * self.n_tests)
+
+    def to_dict(self):
+        return {"n_rows": self.n_rows, "n_mutants": self.n_mutants, "n_tests": self.n_tests, "n_kills": self.n_kills}
+
+
+def _file_signature(file_path):
+    stat = path.getsize(file_path), path.getmtime(file_path)
+    return {"size": stat[0], "mtime": stat[1]}
+
+
+def profile_kill_matrix(kill_matrix_file, column_for_mutants: int, column_for_tests: int,
+                        column_for_kill_status: int, profile_path=None, chunk_rows=1_000_000):
+    """
+    Count the rows, mutants, tests, and kills of a kill matrix CSV in one streamed pass over its three columns.
+
+    When ``profile_path`` is given, the counts are cached there and reused while the CSV keeps the same size and
+    modification time.
+
+    Returns:
+        KillMatrixProfile: The counts of the kill matrix.
+    """
+    signature = _file_signature(kill_matrix_file)
+    if profile_path is not None and path.exists(profile_path):
+        with open(profile_path) as profile_file:
+            cached = json.load(profile_file)
+        if cached.get("signature") == signature:
+            return KillMatrixProfile(**cached["profile"])
+
+    columns = [column_for_mutants, column_for_tests, column_for_kill_status]
+    mutants, tests = set(), set()
+    n_rows = n_kills = 0
+    for chunk in pd.read_csv(kill_matrix_file, usecols=columns, chunksize=chunk_rows):
+        # usecols keeps the file order of the columns, whatever the order they were requested in
+        mutant_column, test_column, kill_column = (chunk.columns[sorted(columns).index(column)]
+                                                   for column in columns)
+        mutants.update(chunk[mutant_column].unique())
+        tests.update(chunk[test_column].unique())
+        n_rows += len(chunk)
+        n_kills += int((chunk[kill_column] == 1).sum())
+    profile = KillMatrixProfile(n_rows, len(mutants), len(tests), n_kills)
+
+    if profile_path is not None:
+        with open(profile_path, "w") as profile_file:
+            json.dump({"signature": signature, "profile": profile.to_dict()}, profile_file)
+    return profile
+
+
+def estimate_engines(profile: KillMatrixProfile, memory_budget):
+    """
+    Estimate the peak memory in bytes and the relative run time in seconds of every engine.
+
+    The estimates are coarse: they are meant to rank the engines and to tell whether one fits in memory, not to
+    predict the exact run time.
+
+    * ``in_memory`` is the ``parser.py`` path. It holds the kill matrix DataFrame and one Python set of tests per
+      mutant, which is already a sparse representation, and compares every pair of mutants in Python.
+    * ``vectorized`` holds the kill matrix as packed bits and compares blocks of rows with numpy.
+    * ``out_of_core`` runs the same code over a memory-mapped bit file, so it only holds the IDs and the blocks
+      that fit ``memory_budget``.
+
+    Returns:
+        dict: Engine name to ``{"memory": bytes, "time": seconds}``.
+    """
+    kills_per_mutant = profile.n_kills / max(1, profile.n_mutants)
+    pairs = profile.n_mutants * profile.n_mutants / 2
+    packed_bytes = profile.n_mutants * row_bytes_for(profile.n_tests)
+    id_bytes = (profile.n_mutants + profile.n_tests) * ID_BYTES
+    block_bytes = min(memory_budget, 2 * packed_bytes)
+
+    packed_time = profile.n_rows * 2 * SECONDS_PER_ROW + pairs * row_bytes_for(profile.n_tests) * \
+        SECONDS_PER_PACKED_BYTE
+    return {
+        "in_memory": {
+            "memory": profile.n_rows * DATAFRAME_ROW_BYTES + profile.n_mutants * NODE_OVERHEAD_BYTES
+            + 2 * profile.n_kills * TEST_ENTRY_BYTES,
+            "time": profile.n_rows * SECONDS_PER_ROW + pairs * (SECONDS_PER_PAIR + kills_per_mutant *
+                                                                SECONDS_PER_PAIR_TEST),
+        },
+        "vectorized": {"memory": 2 * packed_bytes + id_bytes + block_bytes, "time": packed_time},
+        "out_of_core": {"memory": id_bytes + block_bytes, "time": packed_time * OUT_OF_CORE_SLOWDOWN},
+    }
+
+
+def select_engine(estimates, max_memory):
+    """
+    Pick the fastest engine whose estimated memory fits ``max_memory`` bytes.
+
+    Falls back to ``out_of_core``, the engine with the smallest footprint, when none of them fits.
+
+    Returns:
+        str: The name of the selected engine.
+    """
+    fitting = [engine for engine in ENGINES if estimates[engine]["memory"] <= max_memory]
+    if not fitting:
+        return "out_of_core"
+    return min(fitting, key=lambda engine: estimates[engine]["time"])
+
+
+def physical_memory():
+    """Return the physical memory in bytes, or None where the platform does not report it."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
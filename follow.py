@@ -0,0 +1,160 @@
+import csv
+import time
+from os import path
+
+import pandas as pd
+
+from graph_results import DOMINATOR_COLUMNS
+from incremental import IncrementalSubsumptionGraph
+from parser import short_name
+
+PROGRESS_COLUMNS = ["Refresh", "Rows", "Killed Mutants", "Equivalence Classes", "Dominators", "Mean TCAP",
+                    "Dominators Changed"]
+
+
+class KillMatrixFollower:
+    """
+    Tails a kill matrix CSV that is still being written and keeps its subsumption graph up to date.
+
+    Every call to ``ingest`` reads only the complete records appended since the previous call; a record whose quoted
+    field spans several lines waits until all its lines are written. The kills they add move just the affected
+    mutants between classes of an ``IncrementalSubsumptionGraph``, so nothing is rebuilt. Kill rows are assumed to
+    be appended only: a kill status of 0 never removes an earlier kill. A file that does not exist yet has no rows.
+    """
+
+    def __init__(self, kill_matrix_file, column_for_mutants: int, column_for_tests: int,
+                 column_for_kill_status: int, mutant_ids=()):
+        self.kill_matrix_file = kill_matrix_file
+        self.column_for_mutants = column_for_mutants
+        self.column_for_tests = column_for_tests
+        self.column_for_kill_status = column_for_kill_status
+
+        self.offset = 0
+        self.pending = ""
+        self.has_header = False
+        self.n_rows = 0
+        self.graph = IncrementalSubsumptionGraph.from_kill_sets({str(mutant): frozenset() for mutant in mutant_ids})
+
+    def _read_new_records(self):
+        if not path.exists(self.kill_matrix_file):
+            return []
+        with open(self.kill_matrix_file, "rb") as kill_matrix_file:
+            kill_matrix_file.seek(0, 2)
+            if kill_matrix_file.tell() < self.offset:
+                raise ValueError(f"{self.kill_matrix_file} shrank while it was followed")
+            kill_matrix_file.seek(self.offset)
+            data = kill_matrix_file.read()
+        # a trailing line without a newline may still be being written, so leave it for the next call
+        complete = data[:data.rfind(b"\n") + 1]
+        self.offset += len(complete)
+
+        records = []
+        record = self.pending
+        for line in complete.decode("utf-8").splitlines(keepends=True):
+            record += line
+            # quotes inside a quoted field are doubled, so an odd count means a newline inside a quoted field
+            if record.count('"') % 2 == 0:
+                records.append(record)
+                record = ""
+        self.pending = record
+
+        if not self.has_header and records:
+            self.has_header = True
+            records = records[1:]
+        return [record for record in records if record.strip()]
+
+    @staticmethod
+    def _is_kill(status):
+        try:
+            return float(status) == 1
+        except ValueError:
+            return False
+
+    def ingest(self):
+        """
+        Read the rows appended since the last call and add their kills to the graph.
+
+        Returns:
+            int: The number of rows read.
+        """
+        rows = list(csv.reader(self._read_new_records()))
+        new_kills = {}
+        for row in rows:
+            mutant = row[self.column_for_mutants]
+            tests = new_kills.setdefault(mutant, set())
+            if self._is_kill(row[self.column_for_kill_status]):
+                tests.add(row[self.column_for_tests])
+        # one move per mutant, however many of its rows arrived
+        for mutant, tests in new_kills.items():
+            self.graph.add_kills(mutant, tests)
+        self.n_rows += len(rows)
+        return len(rows)
+
+    def dominator_mutants(self):
+        """
+        pd.DataFrame: The current dominators in the layout of ``compute_dominator_mutants``.
+
+        The classes get the short names of the batch pipeline: ``merge_indistinguishable_nodes`` moves a class
+        to the end each time a mutant joins it, so they are numbered in order of their last mutant.
+        """
+        class_order = {}
+        for tests in self.graph.kill_sets.values():
+            class_order.pop(tests, None)
+            class_order[tests] = None
+        class_names = {tests: short_name(i) for i, tests in enumerate(class_order)}
+        rows = [{"Node": class_names[tests], "Mutants": set(self.graph.classes[tests]), "Tests": set(tests)}
+                for tests in self.graph.dominators()]
+        return pd.DataFrame(rows, columns=DOMINATOR_COLUMNS)
+
+    def tcap_scores(self):
+        """pd.DataFrame: The current TCAP of every mutant with the columns Mutant and TCAP."""
+        return pd.DataFrame(list(self.graph.tcap().items()), columns=["Mutant", "TCAP"])
+
+
+def follow_kill_matrix(follower: KillMatrixFollower, on_refresh, interval=5.0, stop_when_stable=None,
+                       max_refreshes=None, sleep=time.sleep):
+    """
+    Ingest new rows and refresh the results every ``interval`` seconds.
+
+    Args:
+        follower (KillMatrixFollower): The follower of the kill matrix.
+        on_refresh (callable): Called after every refresh that read new rows, with the follower and the progress
+            table so far.
+        interval (float): Seconds between refreshes.
+        stop_when_stable (int, optional): Stop once the dominators stayed the same over this many consecutive
+            refreshes, counting those that read no new rows. By default the follow only ends with
+            ``max_refreshes`` or Ctrl+C.
+        max_refreshes (int, optional): Stop after this many refreshes.
+
+    Returns:
+        pd.DataFrame: One row per refresh that read new rows, with the columns of ``PROGRESS_COLUMNS``.
+    """
+    progress = []
+    dominators = None
+    stable_refreshes = 0
+    refreshes = 0
+    try:
+        while True:
+            refreshes += 1
+            if follower.ingest():
+                new_dominators = frozenset(follower.graph.dominators())
+                changed = new_dominators != dominators
+                stable_refreshes = 0 if changed else stable_refreshes + 1
+                dominators = new_dominators
+
+                tcap = follower.graph.tcap()
+                progress.append((refreshes, follower.n_rows,
+                                 sum(1 for tests in follower.graph.kill_sets.values() if tests),
+                                 len(follower.graph.parents), len(dominators),
+                                 sum(tcap.values()) / max(1, len(tcap)), changed))
+                on_refresh(follower, pd.DataFrame(progress, columns=PROGRESS_COLUMNS))
+            elif dominators is not None:
+                stable_refreshes += 1
+            if stop_when_stable is not None and dominators is not None and stable_refreshes >= stop_when_stable:
+                break
+            if max_refreshes is not None and refreshes >= max_refreshes:
+                break
+            sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    return pd.DataFrame(progress, columns=PROGRESS_COLUMNS)
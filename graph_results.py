@@ -0,0 +1,72 @@
+from copy import copy
+
+# pandas is imported where it is used, so that importing this module from `main.py` stays cheap
+
+DOMINATOR_COLUMNS = ["Node", "Mutants", "Tests"]
+
+
+def compute_dominator_mutants(hierarchy, short_names_to_nodes_mapping):
+    """
+    Compute and return the dominator mutants (mutants without parents).
+
+    Args:
+        hierarchy: The graph hierarchy.
+        short_names_to_nodes_mapping (dict): Mapping from short names to nodes.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing dominator mutants and their detecting tests.
+    """
+    import pandas as pd
+
+    dominator_mutants = [node for node in hierarchy.nodes() if hierarchy.in_degree(node) == 0 and len(node.tests) > 0]
+    dominator_mutant_rows = []
+    dominator_mutant_detecting_tests = set()
+
+    for mutant in dominator_mutants:
+        dominator_mutant_rows.append({
+            "Node": mutant,
+            "Mutants": set(short_names_to_nodes_mapping[mutant.name].split("-")),
+            "Tests": mutant.tests
+        })
+        dominator_mutant_detecting_tests.update(mutant.tests)
+
+    # build the DataFrame once instead of growing it row by row
+    dominator_mutants_df = pd.DataFrame(dominator_mutant_rows, columns=DOMINATOR_COLUMNS)
+    return dominator_mutants_df, dominator_mutant_detecting_tests
+
+
+def compute_lowest_layer_mutants(hierarchy, merged_nodes, short_names_to_nodes_mapping):
+    """
+    Compute and return the lowest layer mutants that are not equivalent.
+
+    Args:
+        hierarchy: The graph hierarchy.
+        merged_nodes (dict): Merged nodes data.
+        short_names_to_nodes_mapping (dict): Mapping from short names to nodes.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing the lowest layer mutants and their unique tests.
+    """
+    import pandas as pd
+
+    equivalent_mutants = {node for node in hierarchy.nodes() if len(merged_nodes[str(node)].tests) == 0}
+    lowest_layer_mutants = [node for node in hierarchy.nodes() if
+                            hierarchy.out_degree(node) == 0 and node not in equivalent_mutants]
+
+    lowest_layer_mutant_rows = []
+
+    for mutant in lowest_layer_mutants:
+        tests = copy(mutant.tests)
+        parents = hierarchy.predecessors(mutant)
+        for parent in parents:
+            tests = tests - parent.tests
+        mutant.unique_tests = mutant.tests if len(tests) == 0 else tests
+
+        lowest_layer_mutant_rows.append({
+            "Node": mutant,
+            "Mutants": set(short_names_to_nodes_mapping[mutant.name].split("-")),
+            "Unique Tests": mutant.unique_tests,
+            "Tests": mutant.tests
+        })
+
+    return pd.DataFrame(lowest_layer_mutant_rows, columns=["Node", "Mutants", "Unique Tests", "Tests"])
@@ -0,0 +1,140 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from analysis import MutationAnalysis
+
+SUMMARY_COLUMNS = ["Group", "Mutants", "Killed Mutants", "Mutation Score", "Equivalence Classes", "Dominators",
+                   "Dominator Mutants", "Global Dominator Mutants", "Global Dominator Share", "Mean TCAP"]
+
+
+def resolve_column(df: pd.DataFrame, column):
+    """Return the name of a column given either its name or its index."""
+    if column in df.columns:
+        return column
+    if str(column).isdigit() and int(column) < len(df.columns):
+        return df.columns[int(column)]
+    raise KeyError(f"Unknown column: {column}")
+
+
+def group_file_names(groups):
+    """
+    Map every group value to a distinct name that is safe to use in file names.
+
+    Names are numbered in the order of the groups and keep the word characters of the value, e.g. ``g3_false``.
+    """
+    names = {}
+    for i, group in enumerate(groups):
+        slug = re.sub(r"[^\w.-]+", "_", str(group)).strip("_")
+        names[group] = f"g{i}_{slug}" if slug else f"g{i}"
+    return names
+
+
+def _node_names(table):
+    return table.assign(Node=[node.name for node in table["Node"]])
+
+
+def analyze_group(group, csv_df, column_for_mutants_in_csv, kill_matrix_df, column_for_mutants_in_kill_matrix,
+                  column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix):
+    """
+    Build the subsumption graph of one group of mutants and summarize it.
+
+    This runs in a worker process, so it returns plain tables with node names rather than the graph itself.
+
+    Returns:
+        dict: The group, its summary row without the global columns, and its dominator and TCAP tables.
+    """
+    analysis = MutationAnalysis.from_dataframes(csv_df, column_for_mutants_in_csv, kill_matrix_df,
+                                                column_for_mutants_in_kill_matrix, column_for_tests_in_kill_matrix,
+                                                column_for_kill_status_in_kill_matrix)
+    dominator_mutants = analysis.dominator_mutants
+    tcap_scores = analysis.tcap_scores
+    n_mutants = len(tcap_scores)
+    killed_mutants = sum(len(analysis.mutants_of(node)) for node in analysis.merged_nodes.values() if node.tests)
+    return {
+        "group": group,
+        "summary": {
+            "Group": group,
+            "Mutants": n_mutants,
+            "Killed Mutants": killed_mutants,
+            "Mutation Score": killed_mutants / max(1, n_mutants),
+            "Equivalence Classes": sum(1 for node in analysis.merged_nodes.values() if node.tests),
+            "Dominators": len(dominator_mutants),
+            "Dominator Mutants": sum(len(mutants) for mutants in dominator_mutants["Mutants"]),
+            "Mean TCAP": tcap_scores["TCAP"].mean() if n_mutants else 0.0,
+        },
+        "dominator_mutants": _node_names(dominator_mutants),
+        "tcap_scores": tcap_scores,
+    }
+
+
+def global_dominator_mutants(csv_df, column_for_mutants_in_csv, kill_matrix_df, column_for_mutants_in_kill_matrix,
+                             column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix):
+    """Return the IDs of the dominator mutants of the graph over all mutants, as plain strings for a worker."""
+    analysis = MutationAnalysis.from_dataframes(csv_df, column_for_mutants_in_csv, kill_matrix_df,
+                                                column_for_mutants_in_kill_matrix, column_for_tests_in_kill_matrix,
+                                                column_for_kill_status_in_kill_matrix)
+    return {str(mutant) for mutants in analysis.dominator_mutants["Mutants"] for mutant in mutants}
+
+
+def analyze_groups(csv_df, column_for_mutants_in_csv, group_column, kill_matrix_df,
+                   column_for_mutants_in_kill_matrix, column_for_tests_in_kill_matrix,
+                   column_for_kill_status_in_kill_matrix, workers=None):
+    """
+    Analyze every group of mutants of the mutants CSV separately, in parallel worker processes.
+
+    Mutants are grouped by the values of ``group_column`` of the mutants CSV (e.g. ``MutOp`` or ``Context``).
+    Each group gets its own subsumption graph, dominators, and TCAP over its own mutants. The summary also counts,
+    per group, the mutants that are dominators of the graph over all mutants: a group with none of them only
+    produces mutants that the other groups already subsume. The graph over all mutants is built in the worker
+    pool together with the groups.
+
+    Args:
+        group_column (str or int): Name or index of the metadata column to group by.
+        workers (int, optional): Number of worker processes. ``1`` runs the groups one after another in this
+            process; by default one worker per CPU is used.
+
+    Returns:
+        tuple: ``(summary_df, group_results)`` where ``summary_df`` has one row per group with the columns of
+        ``SUMMARY_COLUMNS`` and ``group_results`` maps every group to the result of ``analyze_group``.
+    """
+    group_column = resolve_column(csv_df, group_column)
+    mutant_column = csv_df.columns[column_for_mutants_in_csv]
+    kill_matrix_mutants = kill_matrix_df.iloc[:, column_for_mutants_in_kill_matrix]
+
+    jobs = []
+    for group, group_csv_df in csv_df.groupby(group_column, sort=True):
+        group_kill_matrix_df = kill_matrix_df[kill_matrix_mutants.isin(group_csv_df[mutant_column])]
+        jobs.append((group, group_csv_df, column_for_mutants_in_csv, group_kill_matrix_df,
+                     column_for_mutants_in_kill_matrix, column_for_tests_in_kill_matrix,
+                     column_for_kill_status_in_kill_matrix))
+
+    global_job = (csv_df, column_for_mutants_in_csv, kill_matrix_df, column_for_mutants_in_kill_matrix,
+                  column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix)
+    if workers == 1:
+        results = [analyze_group(*job) for job in jobs]
+        global_dominators = global_dominator_mutants(*global_job)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # the graph over all mutants is the largest job, so it is submitted first and built alongside the groups
+            global_future = executor.submit(global_dominator_mutants, *global_job)
+            results = list(executor.map(analyze_group, *zip(*jobs))) if jobs else []
+            global_dominators = global_future.result()
+
+    group_of_mutant = dict(zip(csv_df[mutant_column].astype(str), csv_df[group_column]))
+    global_dominators_per_group = {}
+    for mutant in global_dominators:
+        group = group_of_mutant[mutant]
+        global_dominators_per_group[group] = global_dominators_per_group.get(group, 0) + 1
+
+    rows = []
+    for result in results:
+        group_global_dominators = global_dominators_per_group.get(result["group"], 0)
+        rows.append(dict(result["summary"], **{
+            "Global Dominator Mutants": group_global_dominators,
+            "Global Dominator Share": group_global_dominators / max(1, len(global_dominators)),
+        }))
+    summary_df = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    summary_df = summary_df.sort_values("Global Dominator Mutants", ascending=False, kind="stable")
+    return summary_df.reset_index(drop=True), {result["group"]: result for result in results}
@@ -0,0 +1,148 @@
+class IncrementalSubsumptionGraph:
+    """
+    A mutation subsumption graph over kill-set equivalence classes that is updated in place.
+
+    Classes are keyed by their kill set (a ``frozenset`` of tests). Only killed classes take part in the graph: an
+    edge ``parent -> child`` means the parent's kill set is a strict subset of the child's with no class in between,
+    as in the hierarchy built by ``create_subsumption_hierarchy``. Changing a mutant's kill set only touches the
+    classes it leaves and joins and the edges around them; nothing is rebuilt.
+    """
+
+    def __init__(self):
+        self.kill_sets = {}
+        self.classes = {}
+        self.parents = {}
+        self.children = {}
+
+    @classmethod
+    def from_kill_sets(cls, kill_sets):
+        """
+        Build the graph from a mapping of mutant IDs to the tests that kill them.
+
+        Classes are inserted from the smallest kill set to the largest, so each insertion only has to find the
+        parents of the new class.
+        """
+        graph = cls()
+        for mutant, tests in kill_sets.items():
+            tests = frozenset(tests)
+            graph.kill_sets[mutant] = tests
+            graph.classes.setdefault(tests, set()).add(mutant)
+        for tests in sorted((tests for tests in graph.classes if tests), key=len):
+            graph._insert_class(tests)
+        return graph
+
+    def copy(self):
+        graph = IncrementalSubsumptionGraph()
+        graph.kill_sets = dict(self.kill_sets)
+        graph.classes = {tests: set(mutants) for tests, mutants in self.classes.items()}
+        graph.parents = {tests: set(parents) for tests, parents in self.parents.items()}
+        graph.children = {tests: set(children) for tests, children in self.children.items()}
+        return graph
+
+    def set_kill_set(self, mutant, tests):
+        """Move the mutant to the class of its new kill set, updating classes and edges locally."""
+        tests = frozenset(tests)
+        old_tests = self.kill_sets.get(mutant)
+        if old_tests == tests:
+            return
+        if old_tests is not None:
+            self.classes[old_tests].discard(mutant)
+            if not self.classes[old_tests]:
+                del self.classes[old_tests]
+                if old_tests:
+                    self._remove_class(old_tests)
+
+        self.kill_sets[mutant] = tests
+        if tests not in self.classes:
+            self.classes[tests] = set()
+            if tests:
+                self._insert_class(tests)
+        self.classes[tests].add(mutant)
+
+    def add_kills(self, mutant, tests):
+        """Add tests to the kill set of the mutant (creating it if needed)."""
+        self.set_kill_set(mutant, self.kill_sets.get(mutant, frozenset()) | frozenset(tests))
+
+    def _insert_class(self, tests):
+        subsets, supersets = [], []
+        for other in self.parents:
+            if other < tests:
+                subsets.append(other)
+            elif tests < other:
+                supersets.append(other)
+
+        direct_parents = _extremes(subsets, largest=True)
+        direct_children = _extremes(supersets, largest=False)
+
+        self.parents[tests] = set(direct_parents)
+        self.children[tests] = set(direct_children)
+        for parent in direct_parents:
+            # edges that now run through the new class are no longer direct
+            for child in direct_children:
+                if child in self.children[parent]:
+                    self.children[parent].discard(child)
+                    self.parents[child].discard(parent)
+            self.children[parent].add(tests)
+        for child in direct_children:
+            self.parents[child].add(tests)
+
+    def _remove_class(self, tests):
+        parents = self.parents.pop(tests)
+        children = self.children.pop(tests)
+        for parent in parents:
+            self.children[parent].discard(tests)
+        for child in children:
+            self.parents[child].discard(tests)
+
+        # a parent and a child of the removed class become direct unless another class still lies between them
+        for parent in parents:
+            for child in children:
+                if not any(other < child for other in self.children[parent]):
+                    self.children[parent].add(child)
+                    self.parents[child].add(parent)
+
+    def dominators(self):
+        """Return the kill sets of the killed classes without parents."""
+        return [tests for tests, parents in self.parents.items() if not parents]
+
+    def lowest_layer(self):
+        """Return the kill sets of the killed classes without children."""
+        return [tests for tests, children in self.children.items() if not children]
+
+    def edges(self):
+        return {(parent, child) for parent, children in self.children.items() for child in children}
+
+    def dominator_mutant_detecting_tests(self):
+        return frozenset().union(*self.dominators())
+
+    def tcap(self, mutants=None, dominator_mutant_detecting_tests=None):
+        """
+        Compute the TCAP of the given mutants (all by default) as ``compute_tcap`` does.
+
+        Returns:
+            dict: Mutant ID to TCAP.
+        """
+        if dominator_mutant_detecting_tests is None:
+            dominator_mutant_detecting_tests = self.dominator_mutant_detecting_tests()
+        dominators = set(self.dominators())
+        scores = {}
+        for mutant in self.kill_sets if mutants is None else mutants:
+            tests = self.kill_sets[mutant]
+            if tests in dominators:
+                scores[mutant] = 1.0
+            elif tests:
+                scores[mutant] = len(tests & dominator_mutant_detecting_tests) / len(tests)
+            else:
+                scores[mutant] = 0
+        return scores
+
+
+def _extremes(sets, largest):
+    """Return the maximal (``largest``) or minimal elements of a family of sets under inclusion."""
+    kept = []
+    for candidate in sorted(sets, key=len, reverse=largest):
+        if largest and not any(candidate < other for other in kept):
+            kept.append(candidate)
+        elif not largest and not any(other < candidate for other in kept):
+            kept.append(candidate)
+    return kept
@@ -0,0 +1,196 @@
+import json
+from os import path
+
+import numpy as np
+import pandas as pd
+
+# number of set bits for every possible byte value, used to popcount packed rows
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+DEFAULT_MEMORY_BUDGET = 1024 * 1024 * 1024
+
+
+class EncodedKillMatrix:
+    """
+    A kill matrix encoded as packed bits: one row per mutant and one bit per test.
+
+    Bits are packed big-endian within each byte (the layout of ``np.packbits``), so test ``j`` of a row lives in
+    byte ``j // 8`` under the mask ``0x80 >> (j % 8)``. ``bits`` is either an in-memory array or a read-only
+    ``np.memmap`` backed by a file on disk; every helper below works on both.
+    """
+
+    def __init__(self, mutant_ids, test_ids, bits):
+        self.mutant_ids = list(mutant_ids)
+        self.test_ids = list(test_ids)
+        self.bits = bits
+
+    @property
+    def n_mutants(self):
+        return len(self.mutant_ids)
+
+    @property
+    def n_tests(self):
+        return len(self.test_ids)
+
+    @property
+    def row_bytes(self):
+        return self.bits.shape[1]
+
+    def tests_of(self, row):
+        """Return the set of test IDs whose bit is set in the given row."""
+        return tests_of_packed_row(self.bits[row], self.test_ids)
+
+    def kill_counts(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """Return the number of killing tests for every row, computed block by block."""
+        counts = np.empty(self.n_mutants, dtype=np.int64)
+        for start, stop in iter_row_blocks(self.n_mutants, self.row_bytes, memory_budget):
+            counts[start:stop] = popcount_rows(self.bits[start:stop])
+        return counts
+
+
+def popcount_rows(packed_rows):
+    """Count the set bits of each packed row."""
+    packed_rows = np.asarray(packed_rows)
+    return _POPCOUNT_TABLE[packed_rows].sum(axis=-1, dtype=np.int64)
+
+
+def tests_of_packed_row(packed_row, test_ids):
+    """Decode one packed row back into the set of test IDs it contains."""
+    positions = np.flatnonzero(np.unpackbits(np.asarray(packed_row), count=len(test_ids)))
+    return {test_ids[position] for position in positions}
+
+
+def pack_test_sets(test_sets, test_ids):
+    """
+    Pack an iterable of test sets into rows of bits over the given test ordering.
+
+    Args:
+        test_sets (list): One set of test IDs per row.
+        test_ids (list): The test ordering that decides the bit position of each test.
+
+    Returns:
+        np.ndarray: A ``(len(test_sets), ceil(len(test_ids) / 8))`` array of packed rows.
+    """
+    test_positions = {test: i for i, test in enumerate(test_ids)}
+    bits = np.zeros((len(test_sets), row_bytes_for(len(test_ids))), dtype=np.uint8)
+    for row, tests in enumerate(test_sets):
+        positions = np.fromiter((test_positions[test] for test in tests), dtype=np.int64, count=len(tests))
+        _set_bits(bits, np.full(len(positions), row, dtype=np.int64), positions)
+    return bits
+
+
+def row_bytes_for(n_tests):
+    return max(1, (n_tests + 7) // 8)
+
+
+def rows_per_block(row_bytes, memory_budget=DEFAULT_MEMORY_BUDGET, copies=4):
+    """
+    Return how many packed rows fit in the memory budget, leaving room for ``copies`` temporaries per row.
+    """
+    return max(1, int(memory_budget // max(1, row_bytes * copies)))
+
+
+def iter_row_blocks(n_rows, row_bytes, memory_budget=DEFAULT_MEMORY_BUDGET, copies=4):
+    """Yield ``(start, stop)`` ranges that cover ``n_rows`` rows in budget-sized blocks."""
+    block = rows_per_block(row_bytes, memory_budget, copies)
+    for start in range(0, n_rows, block):
+        yield start, min(n_rows, start + block)
+
+
+def _set_bits(bits, rows, test_positions):
+    np.bitwise_or.at(bits, (rows, test_positions >> 3),
+                     (np.uint8(0x80) >> (test_positions & 7).astype(np.uint8)).astype(np.uint8))
+
+
+def encode_kill_matrix(kill_matrix_df: pd.DataFrame, column_for_mutants: int, column_for_tests: int,
+                       column_for_kill_status: int, mutant_ids=None):
+    """
+    Encode a kill matrix DataFrame as packed bits held in memory.
+
+    Args:
+        kill_matrix_df (pd.DataFrame): The kill matrix in long format (one row per mutant/test pair).
+        column_for_mutants (int): Index of the mutant ID column.
+        column_for_tests (int): Index of the test ID column.
+        column_for_kill_status (int): Index of the kill status column (1 means killed).
+        mutant_ids (list, optional): Row ordering to use, e.g. the mutants from the mutants CSV. Defaults to the
+            mutants of the kill matrix in order of first appearance.
+
+    Returns:
+        EncodedKillMatrix: The encoded kill matrix.
+    """
+    mutant_column = kill_matrix_df.iloc[:, column_for_mutants]
+    test_column = kill_matrix_df.iloc[:, column_for_tests]
+    if mutant_ids is None:
+        mutant_ids = mutant_column.unique()
+    test_ids = test_column.unique()
+
+    killed = (kill_matrix_df.iloc[:, column_for_kill_status] == 1).to_numpy()
+    rows = pd.Index(mutant_ids).get_indexer(mutant_column[killed])
+    test_positions = pd.Index(test_ids).get_indexer(test_column[killed])
+    known = rows >= 0
+
+    bits = np.zeros((len(mutant_ids), row_bytes_for(len(test_ids))), dtype=np.uint8)
+    _set_bits(bits, rows[known].astype(np.int64), test_positions[known].astype(np.int64))
+    return EncodedKillMatrix(mutant_ids, test_ids, bits)
+
+
+def encode_kill_matrix_to_file(kill_matrix_file, column_for_mutants: int, column_for_tests: int,
+                               column_for_kill_status: int, bits_path, mutant_ids=None,
+                               memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Encode a kill matrix CSV into a memory-mapped packed bit file without loading the CSV into memory.
+
+    The CSV is streamed twice in chunks sized by ``memory_budget``: once to collect the mutant and test IDs and
+    once to set the bits. The IDs are stored next to the bit file in ``<bits_path>.json``.
+
+    Returns:
+        EncodedKillMatrix: The encoded kill matrix backed by a read-only memory map.
+    """
+    chunk_rows = max(1000, int(memory_budget // 256))
+
+    known_mutants = dict.fromkeys(mutant_ids) if mutant_ids is not None else {}
+    known_tests = {}
+    for chunk in pd.read_csv(kill_matrix_file, chunksize=chunk_rows):
+        if mutant_ids is None:
+            known_mutants.update(dict.fromkeys(chunk.iloc[:, column_for_mutants].unique()))
+        known_tests.update(dict.fromkeys(chunk.iloc[:, column_for_tests].unique()))
+    mutant_ids = list(known_mutants)
+    test_ids = list(known_tests)
+
+    mutant_index = pd.Index(mutant_ids)
+    test_index = pd.Index(test_ids)
+    shape = (len(mutant_ids), row_bytes_for(len(test_ids)))
+    if shape[0] == 0:
+        # np.memmap cannot map an empty file, so there is nothing to fill in
+        open(bits_path, "wb").close()
+    else:
+        bits = np.memmap(bits_path, dtype=np.uint8, mode="w+", shape=shape)
+        for chunk in pd.read_csv(kill_matrix_file, chunksize=chunk_rows):
+            killed = chunk[chunk.iloc[:, column_for_kill_status] == 1]
+            rows = mutant_index.get_indexer(killed.iloc[:, column_for_mutants])
+            test_positions = test_index.get_indexer(killed.iloc[:, column_for_tests])
+            known = rows >= 0
+            _set_bits(bits, rows[known].astype(np.int64), test_positions[known].astype(np.int64))
+        bits.flush()
+        del bits
+
+    with open(f"{bits_path}.json", "w") as metadata_file:
+        json.dump({"shape": shape, "mutant_ids": [str(m) for m in mutant_ids],
+                   "test_ids": [str(t) for t in test_ids]}, metadata_file)
+    return open_encoded_kill_matrix(bits_path)
+
+
+def open_encoded_kill_matrix(bits_path):
+    """Open a packed bit file written by ``encode_kill_matrix_to_file`` as a read-only memory map."""
+    with open(f"{bits_path}.json") as metadata_file:
+        metadata = json.load(metadata_file)
+    shape = tuple(metadata["shape"])
+    if shape[0] == 0:
+        bits = np.zeros(shape, dtype=np.uint8)
+    else:
+        bits = np.memmap(bits_path, dtype=np.uint8, mode="r", shape=shape)
+    return EncodedKillMatrix(metadata["mutant_ids"], metadata["test_ids"], bits)
+
+
+def encoded_kill_matrix_exists(bits_path):
+    return path.exists(bits_path) and path.exists(f"{bits_path}.json")
@@ -1,12 +1,13 @@
 import argparse
-from copy import copy
 from os import path, makedirs
 from datetime import datetime
-import pandas as pd
 
+# heavy dependencies (pandas, numpy, networkx, matplotlib) are imported by the stages that need them, so that
+# `--help` and runs that skip plotting do not pay for them at start-up
 from TCAP_calculator import compute_tcap
+from graph_results import compute_dominator_mutants, compute_lowest_layer_mutants
 from parser import generate_mutation_subsumption_graph
-from plot import plot_graph
+from writers import CSV_COMPRESSIONS, OUTPUT_FORMATS, PARQUET_COMPRESSIONS, check_output_options, write_table
 
 
 def parse_arguments():
@@ -25,7 +26,62 @@ def parse_arguments():
     parser.add_argument("--disable_cache", help="Disable cache and force sanitization", action="store_true")
     parser.add_argument("--results_dir", help="Directory to store the results", required=False)
     parser.add_argument("--results_prefix", help="Prefix for the result files", required=False)
-    return parser.parse_args()
+    parser.add_argument("--no_plot", help="Skip plotting the graph", action="store_true")
+    parser.add_argument("--out_of_core", help="Keep the kill matrix in a memory-mapped bit file and process it in blocks",
+                        action="store_true")
+    parser.add_argument("--memory_budget", help="Memory budget in MB for the out-of-core mode", type=int, default=1024)
+    parser.add_argument("--engine", help="Engine that builds the graph; auto picks the fastest one that fits "
+                                         "--max_memory", choices=["auto", "in_memory", "vectorized", "out_of_core"],
+                        default="auto")
+    parser.add_argument("--max_memory", help="Memory bound in MB for the automatic engine selection (default is 80%% "
+                                             "of the physical memory)", type=int, required=False)
+    parser.add_argument("--approximate", help="Estimate dominators and TCAP from kill-set sketches", action="store_true")
+    parser.add_argument("--sketch_size", help="Number of hashes kept per kill set in the approximate mode", type=int,
+                        default=64)
+    parser.add_argument("--confirm", help="Confirm the approximate results exactly", action="store_true")
+    parser.add_argument("--diff_killmatrix", help="Candidate kill matrix CSV, in the --killmatrix layout, to compare "
+                                                  "against the --killmatrix baseline", required=False)
+    parser.add_argument("--reduce_tests", help="Collapse tests with identical kill vectors and drop tests that kill "
+                                               "nothing before building the graph", action="store_true")
+    parser.add_argument("--priority", help="Score every mutant by how early it should be run", action="store_true")
+    parser.add_argument("--metrics", help="Compute the depth, layer widths, longest chains, subsumed descendants, "
+                                          "and class sizes of the graph; the plot reuses its layering",
+                        action="store_true")
+    parser.add_argument("--test_order", help="Files with one test ID per line; compute the mutation score, dominator "
+                                             "score, and suite TCAP curve of each ordering; suite TCAP counts the "
+                                             "tests run so far against the dominators of the full suite, not of the "
+                                             "prefix",
+                        nargs="+", required=False)
+    parser.add_argument("--what_if", help="Rank the impact of removing every test, or every subset of tests listed "
+                                          "one per line (comma-separated) in the given file", nargs="?", const="",
+                        required=False)
+    parser.add_argument("--group_by", help="Metadata column of the mutants CSV (name or index), e.g. MutOp; analyze "
+                                           "each group of mutants separately", required=False)
+    parser.add_argument("--workers", help="Number of worker processes for --group_by (default is one per CPU)",
+                        type=int, required=False)
+    parser.add_argument("--follow", help="Follow a kill matrix that is still being written and refresh the results "
+                                         "as rows arrive", action="store_true")
+    parser.add_argument("--follow_interval", help="Seconds between refreshes in the follow mode", type=float,
+                        default=5.0)
+    parser.add_argument("--stop_when_stable", help="Stop following once the dominators stayed the same over this "
+                                                   "many refreshes", type=int, required=False)
+    parser.add_argument("--checkpoint", help="File for the checkpoints of the hierarchy build (default is in the cache "
+                                             "directory when --resume is given)", required=False)
+    parser.add_argument("--checkpoint_every", help="Number of inserted mutants between two checkpoints", type=int,
+                        default=1000)
+    parser.add_argument("--resume", help="Resume the hierarchy build from its last checkpoint", action="store_true")
+    parser.add_argument("--output_format", help="Format of the result tables: csv, long_csv with one row per set "
+                                                "element, or parquet with list columns", choices=OUTPUT_FORMATS,
+                        default="csv")
+    parser.add_argument("--compression", help="Compression of the result tables",
+                        choices=sorted(set(CSV_COMPRESSIONS) | set(PARQUET_COMPRESSIONS)), required=False)
+    args = parser.parse_args()
+    try:
+        check_output_options(args.output_format, args.compression)
+        check_engine_options(args)
+    except (ValueError, ImportError) as error:
+        parser.error(str(error))
+    return args
 
 
 def cache_exists(file_path):
@@ -46,6 +102,7 @@ def cache_exists(file_path):
 
 
 def load_cache_if_possible(file_path, cache_path, disable_cache):
+    import pandas as pd
 
     if not disable_cache and cache_exists(cache_path):
         # Load from cache
@@ -55,78 +112,330 @@ def load_cache_if_possible(file_path, cache_path, disable_cache):
         return sanitize_data(file_path, cache_path)
 
 
-def compute_dominator_mutants(hierarchy, short_names_to_nodes_mapping):
+def plot_graph(hierarchy, results_dir="results", results_prefix="", layers=None):
     """
-    Compute and return the dominator mutants (mutants without parents).
+    Plot the graph, importing matplotlib and the Graphviz bridge only when a plot is requested.
+    """
+    from plot import plot_graph as _plot_graph
 
-    Args:
-        hierarchy: The graph hierarchy.
-        short_names_to_nodes_mapping (dict): Mapping from short names to nodes.
+    return _plot_graph(hierarchy, results_dir, results_prefix, layers)
+
+
+def write_results(args, results_dir, table, name):
+    """Write a result table in the --output_format and --compression of the run."""
+    return write_table(table, results_dir, args.results_prefix, name, args.output_format, args.compression)
+
+
+def create_results_directory(results_dir="results"):
+    """
+    Creates a directory for the current run based on the timestamp (year, month, day, hour, minute, second).
+
+    Returns:
+        str: The path to the created directory.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    results_dir = path.join(results_dir, timestamp)
+    makedirs(results_dir, exist_ok=True)
+    return results_dir
+
+
+def read_mutant_ids(csv_file, column_for_mutants):
+    """
+    Read only the mutant ID column of the mutants CSV.
 
     Returns:
-        pd.DataFrame: A DataFrame containing dominator mutants and their detecting tests.
+        list: The unique mutant IDs in order of first appearance.
     """
-    dominator_mutants = [node for node in hierarchy.nodes() if hierarchy.in_degree(node) == 0 and len(node.tests) > 0]
-    dominator_mutants_df = pd.DataFrame(columns=["Node", "Mutants", "Tests"])
-    dominator_mutant_detecting_tests = set()
+    import pandas as pd
 
-    for mutant in dominator_mutants:
-        dominator_mutants_df.loc[len(dominator_mutants_df)] = {
-            "Node": mutant,
-            "Mutants": set(short_names_to_nodes_mapping[mutant.name].split("-")),
-            "Tests": mutant.tests
-        }
-        dominator_mutant_detecting_tests = dominator_mutant_detecting_tests.union(mutant.tests)
+    mutants_df = pd.read_csv(csv_file, usecols=[column_for_mutants])
+    return list(mutants_df[mutants_df.columns[0]].unique())
 
-    return dominator_mutants_df, dominator_mutant_detecting_tests
 
+def in_memory_only_options(args):
+    """Return the requested options that only the in-memory pipeline supports, apart from the plot."""
+    options = {"--priority": args.priority, "--reduce_tests": args.reduce_tests, "--metrics": args.metrics,
+               "--checkpoint": args.checkpoint, "--resume": args.resume}
+    return [option for option, requested in options.items() if requested]
 
-def compute_lowest_layer_mutants(hierarchy, merged_nodes, short_names_to_nodes_mapping):
+
+def in_memory_only_mode(args):
+    """Return the requested mode that runs on the in-memory DataFrames, or None."""
+    modes = {"--approximate": args.approximate, "--diff_killmatrix": args.diff_killmatrix,
+             "--test_order": args.test_order, "--group_by": args.group_by is not None,
+             "--what_if": args.what_if is not None}
+    return next((mode for mode, requested in modes.items() if requested), None)
+
+
+def check_engine_options(args):
     """
-    Compute and return the lowest layer mutants that are not equivalent.
+    Check that a forced packed engine is not combined with a mode or option only the in-memory pipeline supports.
+
+    Raises:
+        ValueError: If it is.
+    """
+    engine = "out_of_core" if args.out_of_core else args.engine
+    if engine not in ("vectorized", "out_of_core"):
+        return
+    unsupported = in_memory_only_options(args)
+    mode = in_memory_only_mode(args)
+    if mode is not None:
+        unsupported.append(mode)
+    if unsupported:
+        raise ValueError(f"The {engine} engine does not support {', '.join(unsupported)}; use --engine in_memory")
 
-    Args:
-        hierarchy: The graph hierarchy.
-        merged_nodes (dict): Merged nodes data.
-        short_names_to_nodes_mapping (dict): Mapping from short names to nodes.
+
+def skip_plot(args, engine):
+    """Turn the plot off for a packed engine, which does not build the hierarchy the plot draws."""
+    if not args.no_plot:
+        print(f"The {engine} engine does not plot the graph; skipping the plot")
+        args.no_plot = True
+
+
+def choose_engine(args, cache_dir):
+    """
+    Return the engine to run: the one forced on the command line, or the fastest one estimated to fit --max_memory.
+
+    The automatic selection profiles the kill matrix and estimates every engine first. When the selected engine is
+    a packed one but an option only the in-memory pipeline supports is requested, it keeps the in-memory engine if
+    that fits too, and otherwise fails rather than risk running out of memory. The plot alone does not keep the
+    in-memory engine when it does not fit; it is skipped instead. The engine and the reason it was chosen are
+    always printed.
 
     Returns:
-        pd.DataFrame: A DataFrame containing the lowest layer mutants and their unique tests.
+        tuple: ``(engine, memory_budget)`` where ``memory_budget`` bounds in bytes the blocks of the packed engines.
+
+    Raises:
+        ValueError: If a packed engine is forced together with an option only the in-memory pipeline supports, or
+            if such an option is requested but the in-memory engine is estimated not to fit --max_memory.
     """
-    equivalent_mutants = [node for node in hierarchy.nodes() if len(merged_nodes[str(node)].tests) == 0]
-    lowest_layer_mutants = [node for node in hierarchy.nodes() if
-                            hierarchy.out_degree(node) == 0 and node not in equivalent_mutants]
+    memory_budget = args.memory_budget * 1024 * 1024
+    engine = "out_of_core" if args.out_of_core else args.engine
+    if engine != "auto":
+        check_engine_options(args)
+        if engine != "in_memory":
+            skip_plot(args, engine)
+        print(f"Using the {engine} engine, as forced on the command line")
+        return engine, memory_budget
+    mode = in_memory_only_mode(args)
+    if mode is not None:
+        print(f"Using the in_memory engine, as {mode} runs on the in-memory DataFrames")
+        return "in_memory", memory_budget
+
+    from engine import estimate_engines, physical_memory, profile_kill_matrix, select_engine
+
+    if args.max_memory:
+        max_memory = args.max_memory * 1024 * 1024
+    else:
+        max_memory = int(0.8 * (physical_memory() or 4096 * 1024 * 1024))
+    memory_budget = min(memory_budget, max_memory // 2)
+
+    profile_path = path.join(cache_dir, f"{path.basename(args.killmatrix[0])}_profile.json")
+    profile = profile_kill_matrix(args.killmatrix[0], int(args.killmatrix[1]), int(args.killmatrix[2]),
+                                  int(args.killmatrix[3]), profile_path)
+    estimates = estimate_engines(profile, memory_budget)
+    engine = select_engine(estimates, max_memory)
+    if estimates[engine]["memory"] <= max_memory:
+        reason = "the fastest engine that fits"
+    else:
+        reason = "no engine is estimated to fit, and it has the smallest footprint"
+
+    print(f"Kill matrix: {profile.n_mutants} mutants, {profile.n_tests} tests, {profile.density:.2%} killed")
+    for name, estimate in estimates.items():
+        print(f"  {name}: ~{estimate['memory'] / 1024 / 1024:.1f} MB, ~{estimate['time']:.1f} s")
+
+    required = in_memory_only_options(args) + ([] if args.no_plot else ["the plot"])
+    if engine != "in_memory" and required:
+        if estimates["in_memory"]["memory"] <= max_memory:
+            engine, reason = "in_memory", f"the fastest engine that fits and supports {', '.join(required)}"
+        elif in_memory_only_options(args):
+            raise ValueError(f"{', '.join(in_memory_only_options(args))} need the in_memory engine, which is "
+                             f"estimated to need ~{estimates['in_memory']['memory'] / 1024 / 1024:.0f} MB, over the "
+                             f"memory bound of {max_memory / 1024 / 1024:.0f} MB; raise --max_memory or drop them")
+        else:
+            skip_plot(args, engine)
+    print(f"Selected the {engine} engine for a memory bound of {max_memory / 1024 / 1024:.0f} MB: {reason}")
+    return engine, memory_budget
+
+
+def run_out_of_core(args, results_dir, cache_dir, memory_budget, vectorized=False):
+    """
+    Run the pipeline on a packed encoding of the kill matrix, block by block within the memory budget.
+
+    The kill matrix is encoded into a memory-mapped bit file. The out-of-core engine works on the memory map and
+    keeps its equivalence classes on disk; the vectorized engine loads both into memory.
+    """
+    import numpy as np
 
-    lowest_layer_mutant_to_unique_tests_df = pd.DataFrame(columns=["Node", "Mutants", "Unique Tests", "Tests"])
+    from kill_matrix import encode_kill_matrix_to_file, encoded_kill_matrix_exists, open_encoded_kill_matrix
+    from out_of_core import (generate_packed_subsumption_graph, packed_dominator_mutants,
+                             packed_lowest_layer_mutants, packed_tcap_scores)
 
-    for mutant in lowest_layer_mutants:
-        tests = copy(mutant.tests)
-        parents = hierarchy.predecessors(mutant)
-        for parent in parents:
-            tests = tests - parent.tests
-        mutant.unique_tests = mutant.tests if len(tests) == 0 else tests
+    bits_path = path.join(cache_dir, f"{path.basename(args.killmatrix[0])}_killmatrix.bits")
 
-        lowest_layer_mutant_to_unique_tests_df.loc[len(lowest_layer_mutant_to_unique_tests_df)] = {
-            "Node": mutant,
-            "Mutants": set(short_names_to_nodes_mapping[mutant.name].split("-")),
-            "Unique Tests": mutant.unique_tests,
-            "Tests": mutant.tests
-        }
+    if args.disable_cache or not encoded_kill_matrix_exists(bits_path):
+        encode_kill_matrix_to_file(args.killmatrix[0], int(args.killmatrix[1]), int(args.killmatrix[2]),
+                                   int(args.killmatrix[3]), bits_path,
+                                   mutant_ids=read_mutant_ids(args.csv[0], int(args.csv[1])),
+                                   memory_budget=memory_budget)
+    encoded = open_encoded_kill_matrix(bits_path)
+    if vectorized:
+        encoded.bits = np.array(encoded.bits)
 
-    return lowest_layer_mutant_to_unique_tests_df
+    graph = generate_packed_subsumption_graph(encoded, memory_budget, workdir=None if vectorized else cache_dir)
+    print(f"Equivalence classes: {graph.n_classes}, edges: {len(graph.edges)}")
 
+    dominator_mutants_df, _ = packed_dominator_mutants(graph)
+    print(f"Dominator mutants: {len(dominator_mutants_df)}")
+    write_results(args, results_dir, dominator_mutants_df, "dominator_mutants_tests")
 
-def create_results_directory(results_dir="results"):
+    write_results(args, results_dir, packed_lowest_layer_mutants(graph, memory_budget),
+                  "lowest_layer_mutant_to_unique_tests")
+
+    if args.tcap:
+        write_results(args, results_dir, packed_tcap_scores(graph, memory_budget), "tcap_scores")
+
+
+def run_approximate(args, results_dir, csv_df, kill_matrix_df):
     """
-    Creates a directory for the current run based on the timestamp (year, month, day, hour, minute, second).
+    Estimate the dominators and TCAP from kill-set sketches, and optionally confirm them exactly.
+    """
+    from sketch import estimate_mutation_subsumption
+
+    estimate = estimate_mutation_subsumption(csv_df, int(args.csv[1]), kill_matrix_df, int(args.killmatrix[1]),
+                                             int(args.killmatrix[2]), int(args.killmatrix[3]), args.sketch_size)
+    print(f"Estimated equivalence classes: {len(estimate.classes)}, dominator candidates: {len(estimate.dominators)}")
+
+    write_results(args, results_dir, estimate.equivalence_classes(), "approximate_equivalence_classes")
+    write_results(args, results_dir, estimate.dominator_candidates(), "approximate_dominator_mutants")
+    if args.tcap:
+        write_results(args, results_dir, estimate.tcap_scores(), "approximate_tcap_scores")
+
+    if args.confirm:
+        dominator_mutants_df, tcap_scores_df = estimate.confirm()
+        print(f"Confirmed dominator mutants: {len(dominator_mutants_df)}")
+        write_results(args, results_dir, dominator_mutants_df, "dominator_mutants_tests")
+        if args.tcap:
+            write_results(args, results_dir, tcap_scores_df, "tcap_scores")
+
+
+def run_diff(args, results_dir, cache_dir, csv_df, kill_matrix_df):
+    """
+    Report the dominator, edge, and TCAP changes from the --killmatrix baseline to the --diff_killmatrix candidate.
+    """
+    from diff import diff_kill_matrices
+
+    candidate_cache_path = path.join(cache_dir, f"{path.basename(args.diff_killmatrix)}_sanitized.csv")
+    candidate_df = load_cache_if_possible(args.diff_killmatrix, candidate_cache_path, args.disable_cache)
+
+    kill_matrix_diff = diff_kill_matrices(kill_matrix_df, candidate_df, int(args.killmatrix[1]),
+                                          int(args.killmatrix[2]), int(args.killmatrix[3]),
+                                          mutant_ids=csv_df[csv_df.columns[int(args.csv[1])]].unique())
+    print(f"Kill matrix diff: {kill_matrix_diff.summary()}")
+
+    write_results(args, results_dir, kill_matrix_diff.dominator_changes(), "diff_dominator_mutants")
+    write_results(args, results_dir, kill_matrix_diff.edge_changes(), "diff_edges")
+    write_results(args, results_dir, kill_matrix_diff.tcap_changes(), "diff_tcap_scores")
+
+
+def run_test_order_curves(args, results_dir, csv_df, kill_matrix_df):
+    """
+    Compute the curve of every --test_order ordering in one incremental sweep each, and compare them.
+    """
+    from curves import OrderingCurves, read_test_order
+    from kill_matrix import encode_kill_matrix
+
+    encoded = encode_kill_matrix(kill_matrix_df, int(args.killmatrix[1]), int(args.killmatrix[2]),
+                                 int(args.killmatrix[3]),
+                                 mutant_ids=csv_df[csv_df.columns[int(args.csv[1])]].unique())
+    # test IDs are compared as strings, as they are read from the order files
+    encoded.test_ids = [str(test) for test in encoded.test_ids]
+    curves = OrderingCurves(encoded, args.memory_budget * 1024 * 1024)
+
+    test_orders = {path.basename(test_order_file): read_test_order(test_order_file)
+                   for test_order_file in args.test_order}
+    curves_df, summary_df = curves.compare(test_orders)
+    print(f"Test order curves:\n{summary_df.to_string(index=False)}")
+
+    write_results(args, results_dir, curves_df, "test_order_curves")
+    write_results(args, results_dir, summary_df, "test_order_summary")
+
+
+def run_what_if(args, results_dir, csv_df, kill_matrix_df):
+    """
+    Rank the impact of removing every test, or every --what_if subset of tests, on dominators and TCAP.
+    """
+    from kill_matrix import encode_kill_matrix
+    from what_if import RemovalImpact, read_test_subsets
+
+    encoded = encode_kill_matrix(kill_matrix_df, int(args.killmatrix[1]), int(args.killmatrix[2]),
+                                 int(args.killmatrix[3]),
+                                 mutant_ids=csv_df[csv_df.columns[int(args.csv[1])]].unique())
+    # test IDs are compared as strings, as they are read from the subsets file
+    encoded.test_ids = [str(test) for test in encoded.test_ids]
+    removal_impact = RemovalImpact(encoded, args.memory_budget * 1024 * 1024)
+
+    impact_df = removal_impact.rank(read_test_subsets(args.what_if) if args.what_if else None)
+    print(f"Test removal impact:\n{impact_df.head(20).to_string(index=False)}")
+    write_results(args, results_dir, impact_df, "what_if_test_removal")
+
+
+def run_metrics(args, results_dir, hierarchy, short_names_to_nodes_mapping):
+    """
+    Write the per-node metrics, layer widths, and class size distribution of the graph.
 
     Returns:
-        str: The path to the created directory.
+        list: The killed nodes of every layer, from the dominators down, for the plot to reuse.
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    results_dir = path.join(results_dir, timestamp)
-    makedirs(results_dir, exist_ok=True)
-    return results_dir
+    from metrics import GraphMetrics
+
+    graph_metrics = GraphMetrics(hierarchy, short_names_to_nodes_mapping)
+    print(f"Graph metrics: {graph_metrics.summary()}")
+    write_results(args, results_dir, graph_metrics.node_metrics(), "graph_metrics")
+    write_results(args, results_dir, graph_metrics.layer_widths(), "layer_widths")
+    write_results(args, results_dir, graph_metrics.class_size_distribution(), "class_sizes")
+    return graph_metrics.layers()
+
+
+def run_grouped(args, results_dir, csv_df, kill_matrix_df):
+    """
+    Analyze every --group_by group of mutants in parallel and summarize which groups produce dominators.
+    """
+    from grouped import analyze_groups, group_file_names
+
+    summary_df, group_results = analyze_groups(csv_df, int(args.csv[1]), args.group_by, kill_matrix_df,
+                                               int(args.killmatrix[1]), int(args.killmatrix[2]),
+                                               int(args.killmatrix[3]), args.workers)
+    file_names = group_file_names(summary_df["Group"])
+    summary_df["File Prefix"] = [f"{args.results_prefix}_{file_names[group]}" for group in summary_df["Group"]]
+    print(f"Groups by {args.group_by}:\n{summary_df.to_string(index=False)}")
+    write_results(args, results_dir, summary_df, "group_summary")
+
+    for group, name in file_names.items():
+        write_results(args, results_dir, group_results[group]["dominator_mutants"],
+                      f"{name}_dominator_mutants_tests")
+        if args.tcap:
+            write_results(args, results_dir, group_results[group]["tcap_scores"], f"{name}_tcap_scores")
+
+
+def run_follow(args, results_dir):
+    """
+    Follow the kill matrix as it grows, rewriting the dominator and TCAP files after every refresh with new rows.
+    """
+    from follow import KillMatrixFollower, follow_kill_matrix
+
+    follower = KillMatrixFollower(args.killmatrix[0], int(args.killmatrix[1]), int(args.killmatrix[2]),
+                                  int(args.killmatrix[3]), read_mutant_ids(args.csv[0], int(args.csv[1])))
+
+    def on_refresh(follower, progress_df):
+        print(f"Follow: {progress_df.iloc[-1].to_dict()}")
+        write_results(args, results_dir, follower.dominator_mutants(), "dominator_mutants_tests")
+        if args.tcap:
+            write_results(args, results_dir, follower.tcap_scores(), "tcap_scores")
+        write_results(args, results_dir, progress_df, "follow_progress")
+
+    print(f"Following {args.killmatrix[0]} every {args.follow_interval} s; press Ctrl+C to stop")
+    follow_kill_matrix(follower, on_refresh, args.follow_interval, args.stop_when_stable)
 
 
 def main():
@@ -139,6 +448,18 @@ def main():
     cache_dir = path.join("cache")
     makedirs(cache_dir, exist_ok=True)
 
+    if args.follow:
+        run_follow(args, results_dir)
+        return
+
+    try:
+        engine, memory_budget = choose_engine(args, cache_dir)
+    except ValueError as error:
+        raise SystemExit(f"Error: {error}")
+    if engine in ("vectorized", "out_of_core"):
+        run_out_of_core(args, results_dir, cache_dir, memory_budget, vectorized=engine == "vectorized")
+        return
+
     # Define cache paths for CSV and killmatrix
     csv_cache_path = path.join(cache_dir, f"{path.basename(args.csv[0])}_sanitized.csv")
     killmatrix_cache_path = path.join(cache_dir, f"{path.basename(args.killmatrix[0])}_sanitized.csv")
@@ -147,16 +468,59 @@ def main():
     csv_df = load_cache_if_possible(args.csv[0], csv_cache_path, args.disable_cache)
     kill_matrix_df = load_cache_if_possible(args.killmatrix[0], killmatrix_cache_path, args.disable_cache)
 
+    if args.approximate:
+        run_approximate(args, results_dir, csv_df, kill_matrix_df)
+        return
+
+    if args.diff_killmatrix:
+        run_diff(args, results_dir, cache_dir, csv_df, kill_matrix_df)
+        return
+
+    if args.test_order:
+        run_test_order_curves(args, results_dir, csv_df, kill_matrix_df)
+        return
+
+    if args.group_by is not None:
+        run_grouped(args, results_dir, csv_df, kill_matrix_df)
+        return
+
+    if args.what_if is not None:
+        run_what_if(args, results_dir, csv_df, kill_matrix_df)
+        return
+
+    # Build the graph over representative tests only, if requested
+    reduction = None
+    if args.reduce_tests:
+        from reduction import reduce_kill_matrix
+
+        kill_matrix_df, reduction = reduce_kill_matrix(kill_matrix_df, int(args.killmatrix[1]),
+                                                       int(args.killmatrix[2]), int(args.killmatrix[3]))
+        print(f"Test reduction: {reduction.summary()}")
+
     # Generate the mutation subsumption graph
+    checkpoint_path = args.checkpoint
+    if checkpoint_path is None and args.resume:
+        checkpoint_path = path.join(cache_dir, f"{path.basename(args.killmatrix[0])}_hierarchy.checkpoint")
     hierarchy, merged_nodes, short_names_to_nodes_mapping = generate_mutation_subsumption_graph(
         csv_df, int(args.csv[1]), kill_matrix_df, int(args.killmatrix[1]), int(args.killmatrix[2]),
-        int(args.killmatrix[3])
+        int(args.killmatrix[3]), checkpoint_path=checkpoint_path, checkpoint_every=args.checkpoint_every,
+        resume=args.resume
     )
 
+    # Map the tests of every node back to the original test IDs
+    if reduction is not None:
+        reduction.expand_nodes(merged_nodes)
+
     print(f"short_names_to_nodes_mapping: {short_names_to_nodes_mapping}")
 
-    # Output the graph if specified
-    plot_graph(hierarchy, results_dir, args.results_prefix)
+    # Compute and save the layered graph metrics if requested
+    layers = None
+    if args.metrics:
+        layers = run_metrics(args, results_dir, hierarchy, short_names_to_nodes_mapping)
+
+    # Output the graph if specified, reusing the layering of the metrics when there is one
+    if not args.no_plot:
+        plot_graph(hierarchy, results_dir, args.results_prefix, layers)
 
     # Compute and save dominator mutants
     dominator_mutants_df, dominator_mutant_detecting_tests = compute_dominator_mutants(hierarchy,
@@ -164,23 +528,30 @@ def main():
 
     print(f"Dominator mutants: {dominator_mutants_df}")
 
-    dominator_mutants_df.to_csv(path.join(results_dir, f"{args.results_prefix}_dominator_mutants_tests.csv"),
-                                index=False)
+    write_results(args, results_dir, dominator_mutants_df, "dominator_mutants_tests")
 
     # Compute and save lowest layer mutants
     lowest_layer_mutant_to_unique_tests_df = compute_lowest_layer_mutants(hierarchy, merged_nodes,
                                                                           short_names_to_nodes_mapping)
-    lowest_layer_mutant_to_unique_tests_df.to_csv(
-        path.join(results_dir, f"{args.results_prefix}_lowest_layer_mutant_to_unique_tests.csv"), index=False)
+    write_results(args, results_dir, lowest_layer_mutant_to_unique_tests_df, "lowest_layer_mutant_to_unique_tests")
 
     # Calculate the T-cap if requested
     if args.tcap:
         tcap_scores_df = compute_tcap(hierarchy, dominator_mutants_df["Node"],
                                       dominator_mutant_detecting_tests,
                                       short_names_to_nodes_mapping)
-        tcap_scores_df.to_csv(path.join(results_dir, f"{args.results_prefix}_tcap_scores.csv"), index=False)
+        write_results(args, results_dir, tcap_scores_df, "tcap_scores")
+
+    # Compute and save the mutant priority scores if requested
+    if args.priority:
+        from prioritization import compute_mutant_priority_scores
+
+        priority_scores_df = compute_mutant_priority_scores(hierarchy, short_names_to_nodes_mapping)
+        write_results(args, results_dir, priority_scores_df, "mutant_priority_scores")
 
 def sanitize_data(csv_file, cache_path):
+    import pandas as pd
+
     # if the entry for a cell is empty, replace it with 0
     df = pd.read_csv(csv_file)
     df.fillna(0, inplace=True)
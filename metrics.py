@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from reachability import ReachabilityIndex
+
+NODE_METRICS_COLUMNS = ["Node", "Mutants", "Class Size", "Kill Set Size", "Depth", "Height", "Longest Chain Through",
+                        "Subsumed Nodes", "Subsumed Mutants", "Dominator"]
+
+
+class GraphMetrics:
+    """
+    Layer, chain, descendant, and class-size metrics of a subsumption hierarchy.
+
+    The layering, depths, and heights all come from the topological layers of the array-backed graph: depths
+    (the longest path from a dominator) in the forward sweep, and heights (the longest path down to the lowest
+    layer) in one backward sweep over the same layers. None of them needs the transitive closure. The subsumed
+    node and mutant counts come from the reachability index in one more backward sweep, over blocks of the closure
+    that fit its memory budget. Classes that no test kills are kept out of the layers, as they are out of the
+    graph's edges.
+    """
+
+    def __init__(self, hierarchy, short_names_to_nodes_mapping, index=None):
+        self.index = ReachabilityIndex.from_hierarchy(hierarchy) if index is None else index
+        graph = self.index.graph
+        self.nodes = graph.nodes
+        self.mutants = [short_names_to_nodes_mapping[node.name].split("-") for node in self.nodes]
+        self.class_sizes = np.fromiter((node.size for node in self.nodes), dtype=np.int64, count=len(self.nodes))
+        self.kill_set_sizes = np.fromiter((len(node.tests) for node in self.nodes), dtype=np.int64,
+                                          count=len(self.nodes))
+        self.killed = self.kill_set_sizes > 0
+        self.depth = graph.depth
+        self.height = self._heights(graph)
+        self.subsumed_nodes, self.subsumed_mutants = self.index.descendant_counts(
+            np.stack([np.ones_like(self.class_sizes), self.class_sizes], axis=1)).T
+
+    @staticmethod
+    def _heights(graph):
+        height = np.zeros(graph.n_nodes, dtype=np.int64)
+        for layer in reversed(graph.layers):
+            edges = graph.out_edges_of(layer)
+            if len(edges):
+                # the children of this layer lie in deeper layers, which are already final
+                np.maximum.at(height, graph.sources[edges], height[graph.targets[edges]] + 1)
+        return height
+
+    def layers(self):
+        """Return the killed nodes of every layer, from the dominators (layer 0) down."""
+        return [[self.nodes[i] for i in layer if self.killed[i]] for layer in self.index.graph.layers
+                if self.killed[layer].any()]
+
+    def longest_chain(self):
+        """Return one longest chain of nodes, from a dominator down to the lowest layer."""
+        if not self.killed.any():
+            return []
+        graph = self.index.graph
+        chain_lengths = np.where(self.killed, self.depth + self.height, -1)
+        current = int(np.argmax(np.where(self.depth == 0, chain_lengths, -1)))
+        chain = [current]
+        while self.height[current] > 0:
+            children = graph.children_of(current)
+            current = int(children[np.argmax(self.height[children] == self.height[current] - 1)])
+            chain.append(current)
+        return [self.nodes[i] for i in chain]
+
+    def node_metrics(self):
+        """pd.DataFrame: One row per node with the columns of ``NODE_METRICS_COLUMNS``, dominators first."""
+        node_metrics_df = pd.DataFrame({
+            "Node": [node.name for node in self.nodes],
+            "Mutants": [set(mutants) for mutants in self.mutants],
+            "Class Size": self.class_sizes,
+            "Kill Set Size": self.kill_set_sizes,
+            "Depth": np.where(self.killed, self.depth, -1),
+            "Height": np.where(self.killed, self.height, -1),
+            "Longest Chain Through": np.where(self.killed, self.depth + self.height + 1, 0),
+            "Subsumed Nodes": self.subsumed_nodes,
+            "Subsumed Mutants": self.subsumed_mutants,
+            "Dominator": self.killed & (self.index.graph.in_degrees() == 0),
+        }, columns=NODE_METRICS_COLUMNS)
+        return node_metrics_df.sort_values(["Depth", "Node"], kind="stable").reset_index(drop=True)
+
+    def layer_widths(self):
+        """pd.DataFrame: The number of nodes and mutants of every layer, with the columns Layer, Nodes, Mutants."""
+        depth = self.depth[self.killed]
+        n_layers = int(depth.max()) + 1 if len(depth) else 0
+        return pd.DataFrame({
+            "Layer": np.arange(n_layers),
+            "Nodes": np.bincount(depth, minlength=n_layers),
+            "Mutants": np.bincount(depth, weights=self.class_sizes[self.killed], minlength=n_layers).astype(np.int64),
+        })
+
+    def class_size_distribution(self):
+        """pd.DataFrame: How many equivalence classes have each size, with the columns Class Size, Classes, Killed."""
+        sizes, classes = np.unique(self.class_sizes, return_counts=True)
+        killed = [int(self.killed[self.class_sizes == size].sum()) for size in sizes]
+        return pd.DataFrame({"Class Size": sizes, "Classes": classes, "Killed": killed})
+
+    def summary(self):
+        chain = self.longest_chain()
+        layer_widths = self.layer_widths()
+        return {
+            "Nodes": int(self.killed.sum()),
+            "Layers": len(layer_widths),
+            "Widest Layer": int(layer_widths["Nodes"].max()) if len(layer_widths) else 0,
+            "Longest Chain": len(chain),
+            "Longest Chain Nodes": "-".join(node.name for node in chain),
+            "Largest Class": int(self.class_sizes.max()) if len(self.class_sizes) else 0,
+        }
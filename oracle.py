@@ -0,0 +1,326 @@
+import argparse
+import math
+import random
+import tempfile
+import time
+from collections import namedtuple
+from os import path
+
+import pandas as pd
+
+# The comparable outcome of one engine: ``classes`` maps every kill set (a frozenset of test IDs, empty for the
+# mutants no test kills) to its mutants, ``edges`` holds (parent kill set, child kill set) pairs, ``dominators``
+# the dominator kill sets, and ``tcap`` maps every mutant ID to its TCAP. All IDs are strings.
+GraphOutcome = namedtuple("GraphOutcome", ["classes", "edges", "dominators", "tcap"])
+
+ASPECTS = ["Classes", "Edges", "Dominators", "TCAP"]
+RESULT_COLUMNS = ["Case", "Mutants", "Tests", "Engine", "Seconds", "Classes Match", "Edges Match",
+                  "Dominators Match", "TCAP Match", "Missing Edges", "Extra Edges", "Reachability Match"]
+
+# the engines that keep only the transitively reduced edges; the in_memory hierarchy (and the reduced run of it)
+# may also keep transitive edges, which are only checked through the reachability
+REDUCED_EDGE_ENGINES = ["reference", "vectorized", "out_of_core", "incremental"]
+
+# a small block budget makes the packed engines cross block boundaries even on small matrices
+ORACLE_MEMORY_BUDGET = 4096
+
+
+def reference_outcome(kill_sets):
+    """
+    Build the graph by brute force: compare every pair of classes, then drop every edge that a third class
+    lies on, which leaves the transitive reduction of the strict-subset order.
+
+    Args:
+        kill_sets (dict): Mutant ID to the set of tests that kill it; mutants no test kills map to an empty set.
+
+    Returns:
+        GraphOutcome: The reference outcome.
+    """
+    classes = {}
+    for mutant, tests in kill_sets.items():
+        classes.setdefault(frozenset(map(str, tests)), set()).add(str(mutant))
+    killed = [tests for tests in classes if tests]
+
+    subsets = {(parent, child) for parent in killed for child in killed if parent < child}
+    edges = {(parent, child) for parent, child in subsets
+             if not any((parent, other) in subsets and (other, child) in subsets for other in killed)}
+    dominators = {tests for tests in killed if not any(other < tests for other in killed)}
+
+    dominator_tests = frozenset().union(*dominators)
+    tcap = {}
+    for tests, mutants in classes.items():
+        score = 1.0 if tests in dominators else len(tests & dominator_tests) / len(tests) if tests else 0.0
+        tcap.update(dict.fromkeys(mutants, score))
+    return GraphOutcome({tests: frozenset(mutants) for tests, mutants in classes.items()}, edges, dominators, tcap)
+
+
+def kill_matrix_frame(kill_sets, test_ids):
+    """Lay the kill sets out as a long kill matrix with the columns TestID (0), Mutant (1), and Killed (2)."""
+    return pd.DataFrame([(str(test), str(mutant), int(test in tests))
+                         for mutant, tests in kill_sets.items() for test in test_ids],
+                        columns=["TestID", "Mutant", "Killed"])
+
+
+def _hierarchy_outcome(hierarchy, mapping, dominator_mutants_df, tcap_df):
+    def kill_set(node):
+        return frozenset(map(str, node.tests))
+
+    return GraphOutcome(
+        {kill_set(node): frozenset(mapping[node.name].split("-")) for node in hierarchy.nodes()},
+        {(kill_set(parent), kill_set(child)) for parent, child in hierarchy.edges() if parent.tests},
+        {frozenset(map(str, tests)) for tests in dominator_mutants_df["Tests"]},
+        dict(zip(tcap_df["Mutant"].astype(str), tcap_df["TCAP"].astype(float))))
+
+
+def _run_parser(kill_matrix_df, reduce_tests=False):
+    from graph_results import compute_dominator_mutants
+    from parser import generate_mutation_subsumption_graph
+    from reduction import reduce_kill_matrix
+    from TCAP_calculator import compute_tcap
+
+    csv_df = kill_matrix_df
+    reduction = None
+    if reduce_tests:
+        kill_matrix_df, reduction = reduce_kill_matrix(kill_matrix_df, 1, 0, 2)
+    hierarchy, merged_nodes, mapping = generate_mutation_subsumption_graph(csv_df, 1, kill_matrix_df, 1, 0, 2,
+                                                                           show_progress=False)
+    if reduction is not None:
+        reduction.expand_nodes(merged_nodes)
+    dominator_mutants_df, dominator_tests = compute_dominator_mutants(hierarchy, mapping)
+    tcap_df = compute_tcap(hierarchy, set(dominator_mutants_df["Node"]), dominator_tests, mapping, verbose=False)
+    return _hierarchy_outcome(hierarchy, mapping, dominator_mutants_df, tcap_df)
+
+
+def _packed_outcome(graph):
+    from out_of_core import compute_packed_tcap
+
+    kill_sets = [frozenset(map(str, graph.classes.tests_of(i))) for i in range(graph.n_classes)]
+    tcap = compute_packed_tcap(graph, ORACLE_MEMORY_BUDGET, show_progress=False)
+    return GraphOutcome(
+        {kill_sets[i]: frozenset(map(str, members)) for i, members in enumerate(graph.members)},
+        {(kill_sets[parent], kill_sets[child]) for parent, child in graph.edges},
+        {kill_sets[i] for i in graph.dominators()},
+        {str(mutant): float(tcap[i]) for i, members in enumerate(graph.members) for mutant in members})
+
+
+def run_in_memory(kill_sets, test_ids, workdir):
+    """The pure-Python pipeline of ``main.py``: ``create_subsumption_hierarchy`` and ``add_or_refine_edge``."""
+    return _run_parser(kill_matrix_frame(kill_sets, test_ids))
+
+
+def run_reduced(kill_sets, test_ids, workdir):
+    """The pure-Python pipeline over the representative tests of ``--reduce_tests``."""
+    return _run_parser(kill_matrix_frame(kill_sets, test_ids), reduce_tests=True)
+
+
+def run_vectorized(kill_sets, test_ids, workdir):
+    """The packed-row engine with the kill matrix held in memory."""
+    from kill_matrix import encode_kill_matrix
+    from out_of_core import generate_packed_subsumption_graph
+
+    encoded = encode_kill_matrix(kill_matrix_frame(kill_sets, test_ids), 1, 0, 2,
+                                 mutant_ids=[str(mutant) for mutant in kill_sets])
+    return _packed_outcome(generate_packed_subsumption_graph(encoded, ORACLE_MEMORY_BUDGET, show_progress=False))
+
+
+def run_out_of_core(kill_sets, test_ids, workdir):
+    """The packed-row engine over a memory-mapped bit file, with its equivalence classes on disk."""
+    from kill_matrix import encode_kill_matrix_to_file
+    from out_of_core import generate_packed_subsumption_graph
+
+    kill_matrix_file = path.join(workdir, "killmatrix.csv")
+    kill_matrix_frame(kill_sets, test_ids).to_csv(kill_matrix_file, index=False)
+    encoded = encode_kill_matrix_to_file(kill_matrix_file, 1, 0, 2, path.join(workdir, "killmatrix.bits"),
+                                         mutant_ids=[str(mutant) for mutant in kill_sets],
+                                         memory_budget=ORACLE_MEMORY_BUDGET)
+    return _packed_outcome(generate_packed_subsumption_graph(encoded, ORACLE_MEMORY_BUDGET, workdir=workdir,
+                                                                     show_progress=False))
+
+
+def run_incremental(kill_sets, test_ids, workdir):
+    """The graph that ``--diff_killmatrix`` and ``--follow`` update in place."""
+    from incremental import IncrementalSubsumptionGraph
+
+    graph = IncrementalSubsumptionGraph.from_kill_sets({str(mutant): frozenset(map(str, tests))
+                                                        for mutant, tests in kill_sets.items()})
+    return GraphOutcome({tests: frozenset(mutants) for tests, mutants in graph.classes.items()},
+                        graph.edges(), set(graph.dominators()),
+                        {mutant: float(score) for mutant, score in graph.tcap().items()})
+
+
+ENGINES = {
+    "in_memory": run_in_memory,
+    "reduced": run_reduced,
+    "vectorized": run_vectorized,
+    "out_of_core": run_out_of_core,
+    "incremental": run_incremental,
+}
+
+
+def _reachable_pairs(edges):
+    children = {}
+    for parent, child in edges:
+        children.setdefault(parent, set()).add(child)
+    pairs = set()
+    for source in children:
+        stack = list(children[source])
+        seen = set()
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(children.get(node, ()))
+        pairs.update((source, node) for node in seen)
+    return pairs
+
+
+def compare_outcomes(reference: GraphOutcome, outcome: GraphOutcome):
+    """
+    Compare an engine's outcome with the reference.
+
+    Returns:
+        dict: ``<aspect> Match`` for every aspect of ``ASPECTS``, the number of reference edges the engine missed
+        and of edges it added, and whether its edges still reach exactly the pairs of the reference. Extra edges
+        with a matching reachability are transitive edges that the reduction would drop, not wrong ones.
+    """
+    tcap_match = outcome.tcap.keys() == reference.tcap.keys() and all(
+        math.isclose(outcome.tcap[mutant], score, abs_tol=1e-12) for mutant, score in reference.tcap.items())
+    return {
+        "Classes Match": outcome.classes == reference.classes,
+        "Edges Match": outcome.edges == reference.edges,
+        "Dominators Match": outcome.dominators == reference.dominators,
+        "TCAP Match": tcap_match,
+        "Missing Edges": len(reference.edges - outcome.edges),
+        "Extra Edges": len(outcome.edges - reference.edges),
+        "Reachability Match": _reachable_pairs(outcome.edges) == _reachable_pairs(reference.edges),
+    }
+
+
+def random_kill_sets(generator: random.Random, n_mutants, n_tests, kill_probability=0.3):
+    """
+    Draw a random kill matrix with the structure of real ones: mutants share kill sets (equivalence classes),
+    kill sets grow along chains of strict supersets, and some mutants are killed by no test.
+
+    Returns:
+        tuple: ``(kill_sets, test_ids)``.
+    """
+    test_ids = [f"t{j}" for j in range(n_tests)]
+    pool = [frozenset()]
+    for _ in range(max(1, n_mutants // 2)):
+        if len(pool) > 1 and generator.random() < 0.5:
+            # extend an existing kill set to build chains of subsumption
+            base = generator.choice(pool)
+            pool.append(base | {test for test in test_ids if generator.random() < kill_probability / 2})
+        else:
+            pool.append(frozenset(test for test in test_ids if generator.random() < kill_probability))
+    kill_sets = {f"m{i}": generator.choice(pool) for i in range(n_mutants)}
+    return kill_sets, test_ids
+
+
+def fuzz(n_cases=50, seed=0, max_mutants=200, max_tests=40, engines=None):
+    """
+    Run every engine on random kill matrices and compare each outcome with the brute-force reference.
+
+    Cases alternate between small matrices, where corner cases such as empty or single-class graphs are likely,
+    and medium ones of up to ``max_mutants`` mutants and ``max_tests`` tests.
+
+    Args:
+        engines (list, optional): Names of the engines of ``ENGINES`` to run (all by default).
+
+    Returns:
+        pd.DataFrame: One row per case and engine, including the reference, with the columns of
+        ``RESULT_COLUMNS``.
+    """
+    generator = random.Random(seed)
+    engines = list(ENGINES) if engines is None else engines
+    rows = []
+    for case in range(n_cases):
+        small = case % 2 == 0
+        n_mutants = generator.randint(0 if small else 20, 20 if small else max(20, max_mutants))
+        n_tests = generator.randint(1, 8 if small else max(8, max_tests))
+        kill_sets, test_ids = random_kill_sets(generator, n_mutants, n_tests, generator.uniform(0.05, 0.6))
+
+        start = time.perf_counter()
+        reference = reference_outcome(kill_sets)
+        rows.append({"Case": case, "Mutants": n_mutants, "Tests": n_tests, "Engine": "reference",
+                     "Seconds": time.perf_counter() - start, **compare_outcomes(reference, reference)})
+
+        for engine in engines:
+            with tempfile.TemporaryDirectory() as workdir:
+                start = time.perf_counter()
+                outcome = ENGINES[engine](kill_sets, test_ids, workdir)
+                seconds = time.perf_counter() - start
+            rows.append({"Case": case, "Mutants": n_mutants, "Tests": n_tests, "Engine": engine,
+                         "Seconds": seconds, **compare_outcomes(reference, outcome)})
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def passed(results_df):
+    """
+    Return which rows of the fuzz results are correct: the classes, dominators, TCAP, and reachability match and
+    no reference edge is missing. The edges must also match exactly for the engines of ``REDUCED_EDGE_ENGINES``.
+
+    Returns:
+        pd.Series: One boolean per row.
+    """
+    correct = results_df[["Classes Match", "Dominators Match", "TCAP Match", "Reachability Match"]].all(axis=1)
+    correct &= results_df["Missing Edges"] == 0
+    return correct & (results_df["Edges Match"] | ~results_df["Engine"].isin(REDUCED_EDGE_ENGINES))
+
+
+def summarize(results_df):
+    """
+    Summarize the fuzz results per engine: the cases that passed, the cases whose every aspect matched exactly,
+    the cases that missed each aspect, and the total time.
+
+    Returns:
+        pd.DataFrame: One row per engine.
+    """
+    match_columns = [f"{aspect} Match" for aspect in ASPECTS]
+    summary = results_df.groupby("Engine", sort=False).agg(
+        Cases=("Case", "count"),
+        Passed=("Case", lambda cases: int(passed(results_df.loc[cases.index]).sum())),
+        Matched=("Case", lambda cases: int(results_df.loc[cases.index, match_columns].all(axis=1).sum())),
+        **{f"{aspect} Mismatches": (f"{aspect} Match", lambda matches: int((~matches).sum())) for aspect in ASPECTS},
+        Seconds=("Seconds", "sum"),
+    )
+    reference_seconds = summary.loc["reference", "Seconds"] if "reference" in summary.index else float("nan")
+    summary["Relative Time"] = summary["Seconds"] / reference_seconds if reference_seconds else float("nan")
+    return summary.reset_index()
+
+
+def parse_arguments():
+    """
+    Parse command-line arguments for the fuzz harness.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Compare the graph engines with a brute-force reference on "
+                                                 "random kill matrices")
+    parser.add_argument("--cases", help="Number of random kill matrices", type=int, default=50)
+    parser.add_argument("--seed", help="Seed of the random kill matrices", type=int, default=0)
+    parser.add_argument("--max_mutants", help="Largest number of mutants of a medium case", type=int, default=200)
+    parser.add_argument("--max_tests", help="Largest number of tests of a medium case", type=int, default=40)
+    parser.add_argument("--engines", help="Engines to run (default is all)", nargs="+", choices=list(ENGINES))
+    parser.add_argument("--results", help="CSV file to write the per-case results to", required=False)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    results_df = fuzz(args.cases, args.seed, args.max_mutants, args.max_tests, args.engines)
+    if args.results:
+        results_df.to_csv(args.results, index=False)
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(summarize(results_df).to_string(index=False))
+        failures = results_df[~passed(results_df)]
+        if len(failures):
+            print(f"\nFailed cases (rerun with --seed {args.seed}):")
+            print(failures.to_string(index=False))
+    return 1 if len(failures) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,387 @@
+from os import path
+
+import numpy as np
+import pandas as pd
+import tqdm
+
+from kill_matrix import (DEFAULT_MEMORY_BUDGET, EncodedKillMatrix, iter_row_blocks, popcount_rows,
+                         tests_of_packed_row)
+from parser import short_name
+
+
+class PackedSubsumptionGraph:
+    """
+    A mutation subsumption graph whose nodes are equivalence classes of mutants stored as packed kill-set rows.
+
+    This is the block-wise counterpart of the ``networkx`` hierarchy built by ``create_subsumption_hierarchy``:
+    an edge ``(parent, child)`` means the parent's kill set is a strict subset of the child's, and only direct
+    (transitively reduced) edges are kept. The class of mutants that no test kills has no edges.
+    """
+
+    def __init__(self, classes: EncodedKillMatrix, members, edges, kill_counts):
+        self.classes = classes
+        self.members = members
+        self.edges = edges
+        self.kill_counts = kill_counts
+
+    @property
+    def short_names(self):
+        return self.classes.mutant_ids
+
+    @property
+    def n_classes(self):
+        return self.classes.n_mutants
+
+    def in_degrees(self):
+        return np.bincount(self.edges[:, 1], minlength=self.n_classes)
+
+    def out_degrees(self):
+        return np.bincount(self.edges[:, 0], minlength=self.n_classes)
+
+    def dominators(self):
+        """Return the indices of the killed classes without parents."""
+        return np.flatnonzero((self.in_degrees() == 0) & (self.kill_counts > 0))
+
+    def lowest_layer(self):
+        """Return the indices of the killed classes without children."""
+        return np.flatnonzero((self.out_degrees() == 0) & (self.kill_counts > 0))
+
+    def parents_of(self, class_index):
+        return self.edges[self.edges[:, 1] == class_index, 0]
+
+
+# the constants of the splitmix64 finalizer, which mixes every 64-bit word of a row before the words are summed
+_MIX_MULTIPLIERS = (np.uint64(0xBF58476D1CE4E5B9), np.uint64(0x94D049BB133111EB))
+_DIGEST_SEED = 0x5EED
+
+
+def _mix(words):
+    words = (words ^ (words >> np.uint64(30))) * _MIX_MULTIPLIERS[0]
+    words = (words ^ (words >> np.uint64(27))) * _MIX_MULTIPLIERS[1]
+    return words ^ (words >> np.uint64(31))
+
+
+def _row_digests(rows, keys):
+    """
+    Return a 128-bit digest of every packed row as one ``np.void`` value, computed for the whole block at once.
+
+    Each half of the digest sums the mixed 64-bit words of the row, keyed by their position with one row of
+    ``keys``.
+    """
+    words = np.zeros((len(rows), keys.shape[1] * 8), dtype=np.uint8)
+    words[:, :rows.shape[1]] = rows
+    words = words.view(np.uint64)
+    digests = np.stack([_mix(words ^ half_keys).sum(axis=1, dtype=np.uint64) for half_keys in keys], axis=1)
+    return np.ascontiguousarray(digests).view(np.dtype((np.void, 16))).ravel()
+
+
+def merge_equivalent_rows(encoded: EncodedKillMatrix, memory_budget=DEFAULT_MEMORY_BUDGET, show_progress=True):
+    """
+    Group mutants with identical kill rows, reading the encoded matrix one block at a time.
+
+    Every block is digested in bulk and deduplicated with ``np.unique``; its distinct digests are then looked up
+    in the sorted digests of the classes found so far with ``np.searchsorted``. Rows are keyed by a 128-bit
+    digest rather than by their bytes, so the memory used is proportional to the number of classes and not to
+    the number of tests.
+
+    Returns:
+        tuple: ``(class_of, representatives)`` where ``class_of[i]`` is the class of mutant ``i`` and
+        ``representatives[c]`` is the first mutant of class ``c``. Classes are numbered by first appearance.
+    """
+    keys = np.random.default_rng(_DIGEST_SEED).integers(0, np.iinfo(np.uint64).max, dtype=np.uint64,
+                                                        size=(2, (encoded.row_bytes + 7) // 8), endpoint=True)
+    class_of = np.empty(encoded.n_mutants, dtype=np.int64)
+    known_digests = np.empty(0, dtype=np.dtype((np.void, 16)))
+    known_classes = np.empty(0, dtype=np.int64)
+    representatives = []
+    for start, stop in tqdm.tqdm(list(iter_row_blocks(encoded.n_mutants, encoded.row_bytes, memory_budget)),
+                                 desc="Merging Indistinguishable Mutants", disable=not show_progress):
+        digests, first, inverse = np.unique(_row_digests(np.asarray(encoded.bits[start:stop]), keys),
+                                            return_index=True, return_inverse=True)
+        positions = np.searchsorted(known_digests, digests)
+        found = positions < len(known_digests)
+        found[found] = known_digests[positions[found]] == digests[found]
+
+        block_classes = np.empty(len(digests), dtype=np.int64)
+        block_classes[found] = known_classes[positions[found]]
+        new = np.flatnonzero(~found)
+        new = new[np.argsort(first[new], kind="stable")]
+        block_classes[new] = np.arange(len(representatives), len(representatives) + len(new))
+        representatives.extend((start + first[new]).tolist())
+        class_of[start:stop] = block_classes[inverse.ravel()]
+
+        new = np.sort(new)
+        known_digests = np.insert(known_digests, positions[new], digests[new])
+        known_classes = np.insert(known_classes, positions[new], block_classes[new])
+    return class_of, representatives
+
+
+def gather_rows(bits, row_indices, out_path=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Copy the selected rows of a packed matrix into a new matrix, in memory or in a memory-mapped file.
+    """
+    shape = (len(row_indices), bits.shape[1])
+    if out_path is None or shape[0] == 0:
+        gathered = np.empty(shape, dtype=np.uint8)
+    else:
+        gathered = np.memmap(out_path, dtype=np.uint8, mode="w+", shape=shape)
+    row_indices = np.asarray(row_indices, dtype=np.int64)
+    for start, stop in iter_row_blocks(shape[0], shape[1], memory_budget):
+        gathered[start:stop] = bits[row_indices[start:stop]]
+    if isinstance(gathered, np.memmap):
+        gathered.flush()
+    return gathered
+
+
+def _rarest_tests(bits, kill_counts, n_tests, memory_budget):
+    """
+    Return, for every row, the position of the test it contains that the fewest rows contain (-1 for empty rows).
+    """
+    test_counts = np.zeros(n_tests, dtype=np.int64)
+    for start, stop in iter_row_blocks(len(kill_counts), bits.shape[1], memory_budget, copies=16):
+        test_counts += np.unpackbits(np.asarray(bits[start:stop]), axis=1, count=n_tests).sum(axis=0, dtype=np.int64)
+    tests_by_count = np.argsort(test_counts, kind="stable")
+    ranks = np.empty(n_tests, dtype=np.int64)
+    ranks[tests_by_count] = np.arange(n_tests)
+
+    rarest = np.full(len(kill_counts), -1, dtype=np.int64)
+    for start, stop in iter_row_blocks(len(kill_counts), bits.shape[1], memory_budget, copies=80):
+        unpacked = np.unpackbits(np.asarray(bits[start:stop]), axis=1, count=n_tests).astype(bool)
+        best = np.where(unpacked, ranks, n_tests).min(axis=1, initial=n_tests)
+        rarest[start:stop] = np.where(best < n_tests, tests_by_count[np.minimum(best, n_tests - 1)], -1)
+    return rarest
+
+
+def _ranges(starts, lengths):
+    """Concatenate ``range(start, start + length)`` for every pair, without a Python loop."""
+    ends = np.cumsum(lengths)
+    return np.repeat(starts - ends + lengths, lengths) + np.arange(ends[-1] if len(ends) else 0)
+
+
+def _direct_parents(candidates, bits, kill_counts):
+    """Keep the candidates that are not a strict subset of another candidate."""
+    candidates = candidates[np.argsort(-kill_counts[candidates], kind="stable")]
+    rows = np.asarray(bits[candidates])
+    kept = []
+    for position in range(len(candidates)):
+        if kept and not np.bitwise_and(rows[position], np.bitwise_not(rows[kept])).any(axis=1).all():
+            continue
+        kept.append(position)
+    return candidates[kept]
+
+
+def compute_direct_edges(bits, kill_counts, memory_budget=DEFAULT_MEMORY_BUDGET, show_progress=True):
+    """
+    Compute the transitively reduced subsumption edges between packed kill-set rows.
+
+    Instead of comparing every pair of rows, every killed row is filed in an inverted index under its rarest test,
+    the test it contains that the fewest rows contain, and sorted there by kill-set size. A row can only be a
+    strict subset of a child if all its tests, so in particular its rarest test, are tests of the child, and if it
+    has fewer kills: the candidate parents of a child are the entries under the child's tests that are smaller
+    than the child, found with one ``np.searchsorted``. The candidates are checked in bulk, in chunks that fit the
+    memory budget, and every child's subsets are then reduced to its direct parents.
+
+    Returns:
+        np.ndarray: An ``(n_edges, 2)`` array of ``(parent, child)`` row indices.
+    """
+    n_tests = bits.shape[1] * 8
+    killed = np.flatnonzero(kill_counts > 0)
+    if len(killed) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    rarest = _rarest_tests(bits, kill_counts, n_tests, memory_budget)
+
+    # the inverted index, sorted by rarest test and then by kill count, with one searchable key per entry
+    indexed = killed[np.lexsort((kill_counts[killed], rarest[killed]))]
+    key_stride = int(kill_counts.max()) + 1
+    index_keys = rarest[indexed] * key_stride + kill_counts[indexed]
+    offsets = np.zeros(n_tests + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rarest[indexed], minlength=n_tests), out=offsets[1:])
+
+    # a pair of a candidate parent and a child materialises about three rows
+    pair_budget = max(1, int(memory_budget // (3 * bits.shape[1] + 32)))
+    edges = []
+    for child_start, child_stop in tqdm.tqdm(list(iter_row_blocks(len(killed), bits.shape[1], memory_budget,
+                                                                  copies=160)),
+                                             desc="Creating Subsumption Hierarchy", disable=not show_progress):
+        child_indices = killed[child_start:child_stop]
+        child_rows = np.asarray(bits[child_indices])
+        child_positions, tests = np.nonzero(np.unpackbits(child_rows, axis=1, count=n_tests))
+        starts = offsets[tests]
+        lengths = np.searchsorted(index_keys, tests * key_stride + kill_counts[child_indices][child_positions]) - starts
+        candidate_ends = np.cumsum(lengths)
+
+        found_children, found_parents = [], []
+        entry = 0
+        while entry < len(lengths):
+            stop = max(entry + 1, int(np.searchsorted(candidate_ends, candidate_ends[entry] - lengths[entry]
+                                                      + pair_budget, side="right")))
+            pair_children = np.repeat(child_positions[entry:stop], lengths[entry:stop])
+            pair_parents = indexed[_ranges(starts[entry:stop], lengths[entry:stop])]
+            subsets = ~np.bitwise_and(np.asarray(bits[pair_parents]),
+                                      np.bitwise_not(child_rows[pair_children])).any(axis=1)
+            found_children.append(pair_children[subsets])
+            found_parents.append(pair_parents[subsets])
+            entry = stop
+
+        found_children = np.concatenate(found_children) if found_children else np.empty(0, dtype=np.int64)
+        found_parents = np.concatenate(found_parents) if found_parents else np.empty(0, dtype=np.int64)
+        by_child = np.argsort(found_children, kind="stable")
+        found_children, found_parents = found_children[by_child], found_parents[by_child]
+        group_starts = np.flatnonzero(np.r_[True, found_children[1:] != found_children[:-1]]) \
+            if len(found_children) else np.empty(0, dtype=np.int64)
+        for start, stop in zip(group_starts, np.r_[group_starts[1:], len(found_children)]):
+            parents = found_parents[start:stop]
+            if len(parents) > 1:
+                parents = _direct_parents(parents, bits, kill_counts)
+            child = child_indices[found_children[start]]
+            edges.extend((parent, child) for parent in parents)
+
+    return np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+
+def _classes_path(encoded: EncodedKillMatrix, workdir):
+    """
+    Return the file for the equivalence classes, named after the bit file of the memory-mapped kill matrix so that
+    runs on different kill matrices do not overwrite each other's.
+
+    Raises:
+        ValueError: If the kill matrix is held in memory, whose classes are kept in memory too.
+    """
+    bits_path = getattr(encoded.bits, "filename", None)
+    if bits_path is None:
+        raise ValueError("A workdir is only used for a memory-mapped kill matrix; omit it for one held in memory")
+    return path.join(workdir, f"{path.splitext(path.basename(bits_path))[0]}_equivalence_classes.bits")
+
+
+def generate_packed_subsumption_graph(encoded: EncodedKillMatrix, memory_budget=DEFAULT_MEMORY_BUDGET,
+                                      workdir=None, show_progress=True):
+    """
+    Build the mutation subsumption graph from an encoded kill matrix, block by block.
+
+    Args:
+        encoded (EncodedKillMatrix): The encoded kill matrix, in memory or memory-mapped.
+        memory_budget (int): Upper bound in bytes for the blocks held in memory at once.
+        workdir (str, optional): Directory for the memory-mapped matrix of equivalence classes of a
+            memory-mapped kill matrix. When omitted the classes are kept in memory.
+        show_progress (bool): Show progress bars for the merge and the subsumption edges.
+
+    Returns:
+        PackedSubsumptionGraph: The subsumption graph over the equivalence classes.
+
+    Raises:
+        ValueError: If ``workdir`` is given for a kill matrix held in memory.
+    """
+    # an empty kill matrix is never memory-mapped, and has no classes to write
+    classes_path = None if workdir is None or encoded.n_mutants == 0 else _classes_path(encoded, workdir)
+    class_of, representatives = merge_equivalent_rows(encoded, memory_budget, show_progress)
+
+    members = [[] for _ in representatives]
+    for mutant_id, class_index in zip(encoded.mutant_ids, class_of):
+        members[class_index].append(mutant_id)
+
+    class_bits = gather_rows(encoded.bits, representatives, classes_path, memory_budget)
+    classes = EncodedKillMatrix([short_name(i) for i in range(len(representatives))], encoded.test_ids, class_bits)
+    kill_counts = classes.kill_counts(memory_budget)
+
+    edges = compute_direct_edges(class_bits, kill_counts, memory_budget, show_progress)
+    return PackedSubsumptionGraph(classes, members, edges, kill_counts)
+
+
+def classes_killed_by_tests(graph: PackedSubsumptionGraph, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """
+    Transpose the class rows into, for every test, the sorted classes it kills.
+
+    Returns:
+        tuple: ``(offsets, classes)`` in CSR form: the classes killed by test ``j`` are
+        ``classes[offsets[j]:offsets[j + 1]]``.
+    """
+    classes = graph.classes
+    test_positions, class_indices = [], []
+    for start, stop in iter_row_blocks(classes.n_mutants, classes.row_bytes, memory_budget, copies=16):
+        unpacked = np.unpackbits(np.asarray(classes.bits[start:stop]), axis=1, count=classes.n_tests)
+        rows, positions = np.nonzero(unpacked)
+        test_positions.append(positions)
+        class_indices.append(rows + start)
+    test_positions = np.concatenate(test_positions) if test_positions else np.empty(0, dtype=np.int64)
+    class_indices = np.concatenate(class_indices) if class_indices else np.empty(0, dtype=np.int64)
+
+    order = np.argsort(test_positions, kind="stable")
+    offsets = np.zeros(classes.n_tests + 1, dtype=np.int64)
+    np.cumsum(np.bincount(test_positions, minlength=classes.n_tests), out=offsets[1:])
+    return offsets, class_indices[order]
+
+
+def _union_of_rows(bits, row_indices, row_bytes, memory_budget):
+    union = np.zeros(row_bytes, dtype=np.uint8)
+    row_indices = np.asarray(row_indices, dtype=np.int64)
+    for start, stop in iter_row_blocks(len(row_indices), row_bytes, memory_budget):
+        union |= np.bitwise_or.reduce(np.asarray(bits[row_indices[start:stop]]), axis=0)
+    return union
+
+
+def compute_packed_tcap(graph: PackedSubsumptionGraph, memory_budget=DEFAULT_MEMORY_BUDGET, show_progress=True):
+    """
+    Compute the TCAP of every equivalence class, mirroring ``compute_tcap``.
+
+    Returns:
+        np.ndarray: The TCAP of each class (1.0 for dominators, 0.0 for classes no test kills).
+    """
+    bits = graph.classes.bits
+    dominators = graph.dominators()
+    dominator_tests = _union_of_rows(bits, dominators, graph.classes.row_bytes, memory_budget)
+
+    tcap = np.zeros(graph.n_classes, dtype=np.float64)
+    for start, stop in tqdm.tqdm(list(iter_row_blocks(graph.n_classes, graph.classes.row_bytes, memory_budget)),
+                                 desc="Computing TCAP", disable=not show_progress):
+        counts = graph.kill_counts[start:stop]
+        detected = popcount_rows(np.bitwise_and(np.asarray(bits[start:stop]), dominator_tests))
+        tcap[start:stop] = np.divide(detected, counts, out=np.zeros(len(counts)), where=counts > 0)
+    tcap[dominators] = 1.0
+    return tcap
+
+
+def _mutant_names(members):
+    return {str(mutant) for mutant in members}
+
+
+def packed_dominator_mutants(graph: PackedSubsumptionGraph):
+    """
+    Return the dominator table in the layout of ``compute_dominator_mutants``, with short names as nodes.
+
+    Returns:
+        tuple: The dominator DataFrame and the set of tests that detect a dominator mutant.
+    """
+    rows = []
+    dominator_mutant_detecting_tests = set()
+    for class_index in graph.dominators():
+        tests = graph.classes.tests_of(class_index)
+        rows.append({"Node": graph.short_names[class_index], "Mutants": _mutant_names(graph.members[class_index]),
+                     "Tests": tests})
+        dominator_mutant_detecting_tests |= tests
+    return pd.DataFrame(rows, columns=["Node", "Mutants", "Tests"]), dominator_mutant_detecting_tests
+
+
+def packed_lowest_layer_mutants(graph: PackedSubsumptionGraph, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Return the lowest layer table in the layout of ``compute_lowest_layer_mutants``."""
+    bits = graph.classes.bits
+    row_bytes = graph.classes.row_bytes
+    edges = graph.edges[np.argsort(graph.edges[:, 1], kind="stable")]
+    rows = []
+    for class_index in graph.lowest_layer():
+        row = np.asarray(bits[class_index])
+        parents = edges[np.searchsorted(edges[:, 1], class_index):np.searchsorted(edges[:, 1], class_index, "right"), 0]
+        parent_tests = _union_of_rows(bits, parents, row_bytes, memory_budget)
+        unique = np.bitwise_and(row, np.bitwise_not(parent_tests))
+        tests = tests_of_packed_row(row, graph.classes.test_ids)
+        unique_tests = tests_of_packed_row(unique, graph.classes.test_ids)
+        rows.append({"Node": graph.short_names[class_index], "Mutants": _mutant_names(graph.members[class_index]),
+                     "Unique Tests": unique_tests if unique_tests else tests, "Tests": tests})
+    return pd.DataFrame(rows, columns=["Node", "Mutants", "Unique Tests", "Tests"])
+
+
+def packed_tcap_scores(graph: PackedSubsumptionGraph, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Return the per-mutant TCAP table in the layout of ``compute_tcap``."""
+    tcap = compute_packed_tcap(graph, memory_budget)
+    rows = [(str(mutant), tcap[class_index]) for class_index, members in enumerate(graph.members)
+            for mutant in members]
+    return pd.DataFrame(rows, columns=["Mutant", "TCAP"])
@@ -1,17 +1,18 @@
-# TODO add to requirements.txt
-import networkx as nx
-import pandas as pd
-import tqdm
+# networkx, pandas and tqdm are imported where they are used to keep `import parser` cheap
+from os import path
 
 from MutantNode import MutantNode
 
 
-def create_nodes_from_csv(mutants_file_df: pd.DataFrame, column_for_mutants: int):
+def create_nodes_from_csv(mutants_file_df: "pd.DataFrame", column_for_mutants: int, show_progress=True):
+    import pandas as pd
+    import tqdm
+
     mutants_file_df = pd.DataFrame(mutants_file_df[mutants_file_df.columns[column_for_mutants]])
     nodes = {}
     unique_mutants = mutants_file_df[mutants_file_df.columns[0]].unique()
     for mutant_id in tqdm.tqdm(unique_mutants, total=len(unique_mutants),
-                               desc="Creating Initial Mutant Nodes"):
+                               desc="Creating Initial Mutant Nodes", disable=not show_progress):
 
         if mutant_id not in nodes:
             nodes[mutant_id] = MutantNode(mutant_id)
@@ -20,7 +21,7 @@ def create_nodes_from_csv(mutants_file_df: pd.DataFrame, column_for_mutants: int
 
 
 
-def parse_kill_matrix(kill_matrix_df: pd.DataFrame, column_for_mutants: int, column_for_tests: int, column_for_kill_status: int):
+def parse_kill_matrix(kill_matrix_df: "pd.DataFrame", column_for_mutants: int, column_for_tests: int, column_for_kill_status: int):
 
     # Filter the DataFrame to only include rows where kill status is 1
     filtered_df = kill_matrix_df[kill_matrix_df.iloc[:, column_for_kill_status] == 1]
@@ -54,7 +55,27 @@ def merge_indistinguishable_nodes(nodes):
     return merged_nodes
 
 
-def create_subsumption_hierarchy(kill_matrix, mutants):
+def create_subsumption_hierarchy(kill_matrix, mutants, checkpoint_path=None, checkpoint_every=1000, resume=False):
+    """
+    Build the subsumption hierarchy by inserting the killed mutants one after another.
+
+    Args:
+        kill_matrix: Unused, kept for compatibility.
+        mutants (dict): The merged nodes by short name.
+        checkpoint_path (str, optional): File to write a checkpoint to every ``checkpoint_every`` inserted mutants
+            and once the hierarchy is complete. The edges go to an append-only log next to it, see
+            ``save_hierarchy_checkpoint``.
+        checkpoint_every (int): Number of inserted mutants between two checkpoints. Each checkpoint only writes
+            the edges added since the previous one, so its cost is proportional to those edges and not to the
+            whole hierarchy.
+        resume (bool): Continue from the checkpoint at ``checkpoint_path`` if there is one. The result is the
+            same as that of an uninterrupted run.
+
+    Returns:
+        nx.DiGraph: The subsumption hierarchy.
+    """
+    import networkx as nx
+
     hierarchy = nx.DiGraph()
 
     # First, add all mutants as nodes to the hierarchy
@@ -64,43 +85,117 @@ def create_subsumption_hierarchy(kill_matrix, mutants):
         # only add edges between mutants with tests
         if len(mutants[mutant].tests) > 0:
             mutants_to_connect.append(mutant)
-
-    # Then, iterate through each mutant to establish parent-child relationships
-    mutants_considered = set()
-    mutants_considered.add(mutants_to_connect[0])
-
-    for mutant in mutants_to_connect[1:]:
-        mutants_considered.add(mutant)
+    if not mutants_to_connect:
+        return hierarchy
+
+    fingerprint = hierarchy_checkpoint_fingerprint(mutants, mutants_to_connect)
+    start, log_size = 1, 0
+    if resume and checkpoint_path is not None and path.exists(checkpoint_path):
+        start, log_size = restore_hierarchy_checkpoint(checkpoint_path, fingerprint, hierarchy, mutants)
+    # the edges added since the last checkpoint, in the order they were added
+    new_edges = [] if checkpoint_path is not None else None
+
+    # Then, iterate through each mutant to establish parent-child relationships. The mutants considered so far
+    # are visited in insertion order, so that the result does not depend on set ordering and a resumed run
+    # matches an uninterrupted one.
+    for index in range(start, len(mutants_to_connect)):
+        mutant = mutants_to_connect[index]
         mutant_obj = mutants[mutant]
         tests = mutant_obj.tests
 
-        # micro-optimization: only consider mutants that haven't been considered yet
-        for the_other_mutant in list(mutants_considered - set(mutant)):
+        for the_other_mutant in mutants_to_connect[:index]:
             the_other_mutant_obj = mutants[the_other_mutant]
-            the_other_mutant__tests = the_other_mutant_obj.tests
+            handle_new_node(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant_obj.tests,
+                            new_edges)
 
-            # avoid self edges (we should also avoid this
-            if the_other_mutant == mutant or len(the_other_mutant__tests) == 0:
-                continue
-
-            handle_new_node(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant__tests)
+        if checkpoint_path is not None and (index + 1) % checkpoint_every == 0:
+            log_size = save_hierarchy_checkpoint(checkpoint_path, fingerprint, index + 1, new_edges, log_size)
+            new_edges.clear()
 
+    if checkpoint_path is not None:
+        save_hierarchy_checkpoint(checkpoint_path, fingerprint, len(mutants_to_connect), new_edges, log_size)
     return hierarchy
 
 
-def handle_new_node(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant__tests):
+def hierarchy_checkpoint_fingerprint(mutants, mutants_to_connect):
+    """Hash the names and tests of the mutants to connect, so that a checkpoint is only reused for the same input."""
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+    for mutant in mutants_to_connect:
+        digest.update(repr((mutant, sorted(map(str, mutants[mutant].tests)))).encode())
+    return digest.hexdigest()
+
+
+def save_hierarchy_checkpoint(checkpoint_path, fingerprint, next_index, new_edges, log_size):
+    """
+    Append the edges added since the last checkpoint to the edge log, then record how far the log is valid.
+
+    The edges only ever grow, so the log at ``{checkpoint_path}.edges`` holds every ``(parent, child)`` pair by
+    short name in the order they were added, and replaying it rebuilds the hierarchy and the parent and child
+    lists. The checkpoint file itself only holds the fingerprint, the index of the next mutant and the size of the
+    valid log; it is written next to the checkpoint and then renamed over it, so a preempted write never leaves a
+    truncated checkpoint behind, and log records appended after the last rename are ignored on resume.
+
+    Returns:
+        int: The size of the valid log in bytes.
+    """
+    import os
+    import pickle
+
+    # a fresh build starts a new log; a resumed one drops what was appended after its last checkpoint
+    with open(f"{checkpoint_path}.edges", "r+b" if log_size else "wb") as log_file:
+        log_file.truncate(log_size)
+        log_file.seek(log_size)
+        if new_edges:
+            pickle.dump([(parent.name, child.name) for parent, child in new_edges], log_file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        log_size = log_file.tell()
+
+    state = {"fingerprint": fingerprint, "next_index": next_index, "log_size": log_size}
+    temporary_path = f"{checkpoint_path}.tmp"
+    with open(temporary_path, "wb") as checkpoint_file:
+        pickle.dump(state, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, checkpoint_path)
+    return log_size
+
+
+def restore_hierarchy_checkpoint(checkpoint_path, fingerprint, hierarchy, mutants):
+    """
+    Replay the edge log of a checkpoint into the hierarchy and the parent and child lists of the mutants.
+
+    Returns:
+        tuple: The index of the next mutant to insert and the size of the valid edge log in bytes.
+    """
+    import pickle
+
+    with open(checkpoint_path, "rb") as checkpoint_file:
+        state = pickle.load(checkpoint_file)
+    if state["fingerprint"] != fingerprint:
+        raise ValueError(f"The checkpoint {checkpoint_path} was written for different mutants or tests")
+    if "log_size" not in state:
+        raise ValueError(f"The checkpoint {checkpoint_path} predates the edge log; delete it to start over")
+
+    with open(f"{checkpoint_path}.edges", "rb") as log_file:
+        while log_file.tell() < state["log_size"]:
+            for parent, child in pickle.load(log_file):
+                add_edge(hierarchy, mutants[parent], mutants[child])
+    return state["next_index"], state["log_size"]
+
+
+def handle_new_node(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant__tests, new_edges=None):
     # Check if the mutant's tests are a superset of the potential parent's tests
     if tests.issuperset(the_other_mutant__tests):
         # Check if there is any direct child of the potential parent that should actually be the direct child of this mutant
-        add_or_refine_edge(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant__tests)
+        add_or_refine_edge(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant__tests, new_edges)
 
 
     elif the_other_mutant__tests.issuperset(tests):
         # Check if there is any direct child of the mutant that should actually be the direct child of the potential parent
-        add_or_refine_edge(hierarchy, the_other_mutant_obj, the_other_mutant__tests, mutant_obj, tests)
+        add_or_refine_edge(hierarchy, the_other_mutant_obj, the_other_mutant__tests, mutant_obj, tests, new_edges)
 
 
-def add_or_refine_edge(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant__tests):
+def add_or_refine_edge(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_other_mutant__tests, new_edges=None):
     did_we_recursively_add = []
 
     for potential_child in mutant_obj.parents:
@@ -109,29 +204,41 @@ def add_or_refine_edge(hierarchy, mutant_obj, tests, the_other_mutant_obj, the_o
             continue
 
         if potential_child.tests.issuperset(the_other_mutant__tests):
-            did_we_recursively_add.append(add_or_refine_edge(hierarchy, potential_child, potential_child.tests, the_other_mutant_obj, tests))
+            did_we_recursively_add.append(add_or_refine_edge(hierarchy, potential_child, potential_child.tests, the_other_mutant_obj, tests, new_edges))
 
 
     if not any(did_we_recursively_add):
-        hierarchy.add_edge(the_other_mutant_obj, mutant_obj)
-        if mutant_obj not in the_other_mutant_obj.children:
-            the_other_mutant_obj.add_child(mutant_obj)
-        if the_other_mutant_obj not in mutant_obj.parents:
-            mutant_obj.add_parent(the_other_mutant_obj)
+        # record the edges that are new, for the checkpoint log
+        if new_edges is not None and not hierarchy.has_edge(the_other_mutant_obj, mutant_obj):
+            new_edges.append((the_other_mutant_obj, mutant_obj))
+        add_edge(hierarchy, the_other_mutant_obj, mutant_obj)
 
         return True
     return False
 
 
+def add_edge(hierarchy, parent, child):
+    hierarchy.add_edge(parent, child)
+    if child not in parent.children:
+        parent.add_child(child)
+    if parent not in child.parents:
+        child.add_parent(parent)
+
+
+
+def short_name(i):
+    # hexadecimal name that starts with a letter
+    hex_name = hex(i)[2:]
+    if i < 10:
+        hex_name = f"0{hex_name}"
+    return f"X{hex_name}"
+
 
 def enumerate_nodes_with_short_names(merged_nodes):
     # give hexadecimal names to the merged nodes that starts with a letter and replace the name of the node with the hexadecimal name
     short_names_to_nodes_mapping = {}
     for i, node in enumerate(merged_nodes):
-        hex_name = hex(i)[2:]
-        if i < 10:
-            hex_name = f"0{hex_name}"
-        hex_name = f"X{hex_name}"
+        hex_name = short_name(i)
         short_names_to_nodes_mapping[hex_name] = node
         merged_nodes[node].name = hex_name
     # update the keys in merged_nodes
@@ -142,19 +249,31 @@ def enumerate_nodes_with_short_names(merged_nodes):
 def generate_mutation_subsumption_graph(csv_df, column_for_mutants_in_csv,
                                         killmatrix_df, column_for_mutants_in_kill_matrix,
                                         column_for_tests_in_kill_matrix,
-                                        column_for_kill_status_in_kill_matrix):
-    mutants_file_df, nodes = create_nodes_from_csv(csv_df, column_for_mutants_in_csv)
+                                        column_for_kill_status_in_kill_matrix,
+                                        show_progress=True, checkpoint_path=None, checkpoint_every=1000,
+                                        resume=False):
+    mutants_file_df, nodes = create_nodes_from_csv(csv_df, column_for_mutants_in_csv, show_progress)
     kill_matrix = parse_kill_matrix(killmatrix_df, column_for_mutants_in_kill_matrix,
                                     column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix)
 
     # assign tests to the nodes
     for _, (mutant, tests) in kill_matrix.iterrows():
         nodes[mutant].add_tests(tests)
+
+    return build_subsumption_graph(nodes, kill_matrix, checkpoint_path, checkpoint_every, resume)
+
+
+def build_subsumption_graph(nodes, kill_matrix=None, checkpoint_path=None, checkpoint_every=1000, resume=False):
+    """
+    Merge the mutant nodes, which already carry their tests, and build the subsumption hierarchy over them.
+
+    The checkpoint arguments are passed on to ``create_subsumption_hierarchy``.
+    """
     merged_nodes = merge_indistinguishable_nodes(nodes)
     merged_nodes, short_names_to_nodes_mapping = enumerate_nodes_with_short_names(merged_nodes)
 
 
     # Create a subsumption hierarchy from the kill matrix
-    hierarchy = create_subsumption_hierarchy(kill_matrix, merged_nodes)
+    hierarchy = create_subsumption_hierarchy(kill_matrix, merged_nodes, checkpoint_path, checkpoint_every, resume)
 
     return hierarchy, merged_nodes, short_names_to_nodes_mapping
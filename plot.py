@@ -7,8 +7,49 @@ from tqdm import tqdm
 import matplotlib.colors as mcolors
 
 
-def plot_graph(hierarchy, results_dir="results", results_prefix=""):
-    pos = graphviz_layout(hierarchy, prog='dot')
+# distance between neighbouring nodes and between layers, in the points that Graphviz positions use
+LAYER_SPACING = 72
+
+
+def layered_layout(hierarchy, layers):
+    """
+    Position the nodes from a precomputed topological layering instead of running Graphviz ``dot``.
+
+    Layer 0 is drawn at the top. Within a layer, nodes are ordered by the mean position of their parents so that
+    edges cross less; nodes missing from the layering (mutants no test kills) are drawn in the top layer.
+
+    Args:
+        hierarchy (nx.DiGraph): The subsumption hierarchy.
+        layers (list): The nodes of every layer, from the dominators down, e.g. ``GraphMetrics.layers()``.
+
+    Returns:
+        dict: The position of every node.
+    """
+    layered = {node for layer in layers for node in layer}
+    layers = [list(layer) for layer in layers] or [[]]
+    layers[0] += [node for node in hierarchy.nodes() if node not in layered]
+
+    pos = {}
+    for depth, layer in enumerate(layers):
+        if depth:
+            parent_x = {node: [pos[parent][0] for parent in hierarchy.predecessors(node) if parent in pos]
+                        for node in layer}
+            layer = sorted(layer, key=lambda node: sum(parent_x[node]) / max(1, len(parent_x[node])))
+        offset = (len(layer) - 1) / 2
+        for i, node in enumerate(layer):
+            pos[node] = ((i - offset) * LAYER_SPACING, (len(layers) - 1 - depth) * LAYER_SPACING)
+    return pos
+
+
+def plot_graph(hierarchy, results_dir="results", results_prefix="", layers=None):
+    """
+    Plot the graph and save it as ``{results_prefix}_mutation_subsumption_graph.png``.
+
+    Args:
+        layers (list, optional): A precomputed topological layering to position the nodes with. By default the
+            layout is computed by Graphviz ``dot``.
+    """
+    pos = graphviz_layout(hierarchy, prog='dot') if layers is None else layered_layout(hierarchy, layers)
 
     # Determine figure size based on nodes and edges
     num_root_nodes = sum(1 for node in hierarchy.nodes() if hierarchy.in_degree(node) == 0)
@@ -0,0 +1,87 @@
+import pandas as pd
+
+
+class KillMatrixReduction:
+    """
+    The mapping between the original tests of a kill matrix and the representative tests kept after reduction.
+
+    Tests with identical kill vectors are collapsed into the first of them, whose weight is the size of its group,
+    and tests that kill no mutant are dropped. Since the groups are disjoint, expanding kill sets back to the
+    original tests preserves every subset relation, so the hierarchy built over the representatives is the one
+    the original tests would give.
+    """
+
+    def __init__(self, groups, dropped_tests):
+        self.groups = groups
+        self.dropped_tests = dropped_tests
+
+    @property
+    def n_original_tests(self):
+        return sum(len(tests) for tests in self.groups.values()) + len(self.dropped_tests)
+
+    @property
+    def n_representatives(self):
+        return len(self.groups)
+
+    @property
+    def weights(self):
+        """dict: The number of original tests each representative stands for."""
+        return {representative: len(tests) for representative, tests in self.groups.items()}
+
+    def expand(self, tests):
+        """Map a set of representative tests back to the original test IDs."""
+        return {test for representative in tests for test in self.groups[representative]}
+
+    def expand_nodes(self, merged_nodes):
+        """Replace the tests and unique tests of every node with their original test IDs, in place."""
+        for node in merged_nodes.values():
+            node.tests = self.expand(node.tests)
+            node.unique_tests = self.expand(node.unique_tests)
+
+    def summary(self):
+        """
+        Summarize the reduction. The weights give the duplicate tests, the largest group of tests with one kill
+        vector, and the reduction ratio: the number of original tests per representative the graph is built over.
+        """
+        weights = self.weights.values()
+        return {
+            "Original Tests": self.n_original_tests,
+            "Representative Tests": self.n_representatives,
+            "Duplicate Tests": sum(weights) - self.n_representatives,
+            "Tests Killing Nothing": len(self.dropped_tests),
+            "Largest Group": max(weights, default=0),
+            "Reduction Ratio": self.n_original_tests / max(1, self.n_representatives),
+        }
+
+
+def reduce_kill_matrix(kill_matrix_df: pd.DataFrame, column_for_mutants: int, column_for_tests: int,
+                       column_for_kill_status: int):
+    """
+    Collapse tests with identical kill vectors and drop tests that kill no mutant.
+
+    Args:
+        kill_matrix_df (pd.DataFrame): The kill matrix in long format (one row per mutant/test pair).
+        column_for_mutants (int): Index of the mutant ID column.
+        column_for_tests (int): Index of the test ID column.
+        column_for_kill_status (int): Index of the kill status column (1 means killed).
+
+    Returns:
+        tuple: ``(reduced_df, reduction)``. ``reduced_df`` keeps the columns of the input and only the kill rows
+        of the representative tests; ``reduction`` maps the representatives back to the original tests.
+    """
+    test_column = kill_matrix_df.columns[column_for_tests]
+    mutant_column = kill_matrix_df.columns[column_for_mutants]
+    killed_df = kill_matrix_df[kill_matrix_df.iloc[:, column_for_kill_status] == 1]
+
+    kill_vectors = killed_df.groupby(test_column, sort=False)[mutant_column].apply(frozenset)
+    groups = {}
+    representative_of_vector = {}
+    for test, mutants in kill_vectors.items():
+        representative = representative_of_vector.setdefault(mutants, test)
+        groups.setdefault(representative, []).append(test)
+
+    killing_tests = set(kill_vectors.index)
+    dropped_tests = [test for test in kill_matrix_df[test_column].unique() if test not in killing_tests]
+
+    reduced_df = killed_df[killed_df[test_column].isin(groups.keys())]
+    return reduced_df, KillMatrixReduction(groups, dropped_tests)
@@ -0,0 +1,203 @@
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import path, makedirs
+from urllib.parse import parse_qs, urlparse
+
+from analysis import MutationAnalysis
+from main import load_cache_if_possible
+
+
+def parse_arguments():
+    """
+    Parse command-line arguments for the analysis server.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Serve mutation subsumption graph queries over HTTP")
+    parser.add_argument("--projects", help="JSON file mapping project names to their --csv and --killmatrix arguments",
+                        required=True)
+    parser.add_argument("--host", help="Host to bind to", default="127.0.0.1")
+    parser.add_argument("--port", help="Port to listen on", type=int, default=8765)
+    parser.add_argument("--max_memory", help="Memory bound in MB for the cached graphs", type=int, default=1024)
+    parser.add_argument("--disable_cache", help="Disable the sanitized CSV cache", action="store_true")
+    return parser.parse_args()
+
+
+def build_project_analysis(project_config, cache_dir="cache", disable_cache=False):
+    """
+    Build the analysis of a project from its configuration.
+
+    Args:
+        project_config (dict): ``{"csv": [file, column], "killmatrix": [file, mutant, test, kill status]}``, the
+            same values as the ``--csv`` and ``--killmatrix`` command-line arguments of ``main.py``.
+        cache_dir (str): Directory of the sanitized CSV cache shared with ``main.py``.
+        disable_cache (bool): Force sanitization instead of loading the cache.
+
+    Returns:
+        MutationAnalysis: The built analysis, with its results and reachability index computed.
+    """
+    csv_file, column_for_mutants = project_config["csv"]
+    killmatrix_file, *killmatrix_columns = project_config["killmatrix"]
+
+    makedirs(cache_dir, exist_ok=True)
+    csv_df = load_cache_if_possible(csv_file, path.join(cache_dir, f"{path.basename(csv_file)}_sanitized.csv"),
+                                    disable_cache)
+    kill_matrix_df = load_cache_if_possible(
+        killmatrix_file, path.join(cache_dir, f"{path.basename(killmatrix_file)}_sanitized.csv"), disable_cache)
+
+    analysis = MutationAnalysis.from_dataframes(csv_df, int(column_for_mutants), kill_matrix_df,
+                                                *(int(column) for column in killmatrix_columns))
+    # compute everything up front so queries only read, and the size estimate covers the full analysis
+    for result in ("tcap_scores", "lowest_layer_mutants", "reachability_index"):
+        getattr(analysis, result)
+    return analysis
+
+
+class AnalysisCache:
+    """
+    A least-recently-used cache of built analyses, bounded by their estimated memory.
+
+    The most recently used analysis is always kept, even if it alone exceeds the bound.
+    """
+
+    def __init__(self, loader, max_bytes):
+        self.loader = loader
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.lock = threading.Lock()
+        self.build_locks = {}
+
+    @property
+    def total_bytes(self):
+        return sum(self.sizes.values())
+
+    def get(self, name):
+        with self.lock:
+            if name in self.entries:
+                self.entries.move_to_end(name)
+                return self.entries[name]
+            build_lock = self.build_locks.setdefault(name, threading.Lock())
+
+        # build outside the cache lock so queries for other projects are not blocked
+        with build_lock:
+            with self.lock:
+                if name in self.entries:
+                    self.entries.move_to_end(name)
+                    return self.entries[name]
+            analysis = self.loader(name)
+            with self.lock:
+                self.entries[name] = analysis
+                self.sizes[name] = analysis.estimated_size()
+                self._evict()
+        return analysis
+
+    def snapshot(self):
+        """
+        Return the cached project names, from least to most recently used, and their total estimated size, read
+        together under the cache lock so a concurrent build or eviction cannot change them in between.
+        """
+        with self.lock:
+            return list(self.entries), self.total_bytes
+
+    def _evict(self):
+        while len(self.entries) > 1 and self.total_bytes > self.max_bytes:
+            evicted, _ = self.entries.popitem(last=False)
+            del self.sizes[evicted]
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """
+    Answers ``GET /<project>/<query>?mutant=<id>`` with JSON, where query is ``tcap``, ``dominators`` or
+    ``unique_tests``, and ``GET /projects`` with the configured and cached projects.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        mutant = parse_qs(url.query).get("mutant", [None])[0]
+        try:
+            if parts == ["projects"]:
+                cached, cached_bytes = self.server.analysis_cache.snapshot()
+                self._send(200, {"projects": sorted(self.server.projects), "cached": cached,
+                                 "cached_bytes": cached_bytes})
+            elif len(parts) == 2:
+                self._send(200, self._answer(parts[0], parts[1], mutant))
+            else:
+                self._send(404, {"error": f"Unknown path: {url.path}"})
+        except KeyError as error:
+            self._send(404, {"error": error.args[0]})
+        except ValueError as error:
+            self._send(400, {"error": str(error)})
+
+    def _answer(self, project, query, mutant):
+        if project not in self.server.projects:
+            raise KeyError(f"Unknown project: {project}")
+        analysis = self.server.analysis_cache.get(project)
+
+        if query == "dominators" and mutant is None:
+            return {"dominators": [analysis.mutants_of(node) for node in analysis.dominator_mutants["Node"]]}
+        if mutant is None:
+            raise ValueError("Missing the mutant query parameter")
+        if query == "tcap":
+            return {"mutant": mutant, "tcap": analysis.tcap_of(mutant)}
+        if query == "dominators":
+            return {"mutant": mutant,
+                    "dominators": [analysis.mutants_of(node) for node in analysis.dominators_subsuming(mutant)]}
+        if query == "unique_tests":
+            unique_tests = analysis.unique_tests_of(mutant)
+            return {"mutant": mutant, "lowest_layer": unique_tests is not None,
+                    "unique_tests": sorted(map(str, unique_tests or []))}
+        raise KeyError(f"Unknown query: {query}")
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(projects, host="127.0.0.1", port=8765, max_memory=1024, cache_dir="cache", disable_cache=False):
+    """
+    Create the analysis server without starting it.
+
+    Args:
+        projects (dict): Project name to project configuration, see ``build_project_analysis``.
+        max_memory (int): Memory bound in MB for the cached analyses.
+
+    Returns:
+        ThreadingHTTPServer: The server; call ``serve_forever`` to start answering queries.
+    """
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.projects = projects
+    server.analysis_cache = AnalysisCache(
+        lambda name: build_project_analysis(projects[name], cache_dir, disable_cache), max_memory * 1024 * 1024)
+    return server
+
+
+def main():
+    args = parse_arguments()
+    with open(args.projects) as projects_file:
+        projects = json.load(projects_file)
+
+    server = create_server(projects, args.host, args.port, args.max_memory, disable_cache=args.disable_cache)
+    print(f"Serving {len(projects)} projects on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from parser import short_name
+
+DEFAULT_SKETCH_SIZE = 64
+# z-score of the two-sided 95% confidence intervals reported with the estimates
+CONFIDENCE_Z = 1.96
+
+
+def hash_tests(tests):
+    """Hash test IDs to uint64 values that are stable across runs and processes."""
+    return pd.util.hash_array(np.asarray(pd.Series(tests).astype(str), dtype=object))
+
+
+class KillSetSketches:
+    """
+    A bottom-k MinHash sketch of every mutant's kill set together with its exact cardinality.
+
+    ``sketches[i]`` holds the (at most) ``k`` smallest test hashes of mutant ``i`` in increasing order, so when a
+    mutant is killed by ``k`` tests or fewer its sketch is its complete kill set.
+    """
+
+    def __init__(self, mutant_ids, counts, sketches, k):
+        self.mutant_ids = list(mutant_ids)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.sketches = sketches
+        self.k = k
+
+    def is_exact(self, i):
+        return self.counts[i] <= self.k
+
+    def threshold(self, i):
+        """The largest hash below which the sketch contains every element of the kill set."""
+        return np.iinfo(np.uint64).max if self.is_exact(i) else self.sketches[i][-1]
+
+
+def sketch_kill_matrix(csv_df, column_for_mutants_in_csv, killmatrix_df, column_for_mutants_in_kill_matrix,
+                       column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix,
+                       k=DEFAULT_SKETCH_SIZE):
+    """
+    Sketch the kill set of every mutant from the inputs of ``generate_mutation_subsumption_graph``.
+
+    Returns:
+        tuple: The ``KillSetSketches`` and the long-format DataFrame of killing (mutant, test, hash) rows, which
+        the exact confirmation step reads kill sets from.
+    """
+    mutant_ids = csv_df[csv_df.columns[column_for_mutants_in_csv]].unique()
+    killed = killmatrix_df[killmatrix_df.iloc[:, column_for_kill_status_in_kill_matrix] == 1]
+    killed = pd.DataFrame({"Mutant": killed.iloc[:, column_for_mutants_in_kill_matrix].to_numpy(),
+                           "Test": killed.iloc[:, column_for_tests_in_kill_matrix].to_numpy()}).drop_duplicates()
+    killed["Hash"] = hash_tests(killed["Test"])
+
+    # the k smallest hashes of every mutant, selected without a Python loop over the rows
+    killed = killed.sort_values(["Mutant", "Hash"], kind="stable")
+    counts = killed.groupby("Mutant").size()
+    bottom_k = killed[killed.groupby("Mutant").cumcount() < k]
+    sketch_by_mutant = {mutant: hashes.to_numpy() for mutant, hashes in bottom_k.groupby("Mutant")["Hash"]}
+
+    empty = np.empty(0, dtype=np.uint64)
+    sketches = [sketch_by_mutant.get(mutant, empty) for mutant in mutant_ids]
+    return KillSetSketches(mutant_ids, counts.reindex(mutant_ids, fill_value=0).to_numpy(), sketches, k), killed
+
+
+def _containment_sample(sketches, subset, superset):
+    """
+    Return how many sampled elements of ``subset`` fall in ``superset`` and how many were sampled.
+
+    Only hashes below both thresholds are compared, because below them each sketch lists every element of its set.
+    """
+    threshold = min(sketches.threshold(subset), sketches.threshold(superset))
+    sample = sketches.sketches[subset][sketches.sketches[subset] <= threshold]
+    return int(np.isin(sample, sketches.sketches[superset], assume_unique=True).sum()), len(sample)
+
+
+def _proportion_error(successes, sample_size, population):
+    """Half-width of a 95% interval for a proportion sampled without replacement from ``population`` items."""
+    if sample_size >= population:
+        return 0.0
+    if sample_size == 0:
+        return 1.0
+    p = successes / sample_size
+    correction = (population - sample_size) / max(1, population - 1)
+    if p in (0.0, 1.0):
+        # rule of three: the 95% bound on a proportion that was never (or always) observed
+        return min(1.0, 3 / sample_size * correction)
+    return min(1.0, CONFIDENCE_Z * math.sqrt(p * (1 - p) / sample_size * correction))
+
+
+class SketchEstimate:
+    """
+    Approximate equivalence classes, dominator candidates, and TCAP computed from kill-set sketches.
+
+    Every class is represented by its first mutant. A class is a dominator candidate when no smaller class looks
+    like a subset of it; ``witnesses`` records, for every other killed class, the smaller class that looked like
+    a subset so that the exclusion can be checked exactly with a single comparison.
+    """
+
+    def __init__(self, sketches: KillSetSketches, killed_df):
+        self.sketches = sketches
+        self.killed_df = killed_df
+        self.classes = self._estimate_classes()
+        self.witnesses = {}
+        self.dominators = self._estimate_dominators()
+
+    def _estimate_classes(self):
+        # identical kill sets always have identical sketches and counts, so true classes are never split
+        groups = {}
+        for i, sketch in enumerate(self.sketches.sketches):
+            groups.setdefault((int(self.sketches.counts[i]), sketch.tobytes()), []).append(i)
+        return list(groups.values())
+
+    def _representative(self, class_index):
+        return self.classes[class_index][0]
+
+    def _estimate_dominators(self):
+        sketches = self.sketches
+        killed_classes = [c for c in range(len(self.classes)) if sketches.counts[self._representative(c)] > 0]
+
+        # a subset of A has its smallest hash in A's sketch, so index the classes by their smallest hash
+        by_min_hash = {}
+        for c in killed_classes:
+            by_min_hash.setdefault(sketches.sketches[self._representative(c)][0], []).append(c)
+
+        dominators = []
+        for c in killed_classes:
+            representative = self._representative(c)
+            for h in sketches.sketches[representative]:
+                witness = next((other for other in by_min_hash.get(h, [])
+                                if sketches.counts[self._representative(other)] < sketches.counts[representative]
+                                and self._looks_contained(other, c)), None)
+                if witness is not None:
+                    self.witnesses[c] = witness
+                    break
+            else:
+                dominators.append(c)
+        return dominators
+
+    def _looks_contained(self, subset_class, superset_class):
+        contained, sample_size = _containment_sample(self.sketches, self._representative(subset_class),
+                                                     self._representative(superset_class))
+        return sample_size > 0 and contained == sample_size
+
+    def dominator_test_hashes(self):
+        """The hashes of the tests that kill a dominator candidate, read exactly from the kill matrix."""
+        candidates = {self.sketches.mutant_ids[self._representative(c)] for c in self.dominators}
+        return self.killed_df.loc[self.killed_df["Mutant"].isin(candidates), "Hash"].unique()
+
+    def equivalence_classes(self):
+        """pd.DataFrame: The estimated classes with the columns Node, Mutants, Kill Count and Exact."""
+        rows = []
+        for c, members in enumerate(self.classes):
+            representative = members[0]
+            rows.append({"Node": short_name(c), "Mutants": {str(self.sketches.mutant_ids[i]) for i in members},
+                         "Kill Count": int(self.sketches.counts[representative]),
+                         "Exact": bool(self.sketches.is_exact(representative) or len(members) == 1)})
+        return pd.DataFrame(rows, columns=["Node", "Mutants", "Kill Count", "Exact"])
+
+    def dominator_candidates(self):
+        """pd.DataFrame: The dominator candidates with the columns Node, Mutants and Kill Count."""
+        rows = [{"Node": short_name(c), "Mutants": {str(self.sketches.mutant_ids[i]) for i in self.classes[c]},
+                 "Kill Count": int(self.sketches.counts[self._representative(c)])} for c in self.dominators]
+        return pd.DataFrame(rows, columns=["Node", "Mutants", "Kill Count"])
+
+    def tcap_scores(self):
+        """
+        Estimate the TCAP of every mutant from the fraction of its sketch that detects a dominator candidate.
+
+        Returns:
+            pd.DataFrame: The columns Mutant, TCAP, TCAP Error (half-width of a 95% interval, 0 when exact)
+            and Exact.
+        """
+        dominator_hashes = self.dominator_test_hashes()
+        dominator_classes = set(self.dominators)
+        rows = []
+        for c, members in enumerate(self.classes):
+            representative = members[0]
+            count = int(self.sketches.counts[representative])
+            sketch = self.sketches.sketches[representative]
+            if c in dominator_classes:
+                tcap, error = 1.0, 0.0
+            elif count == 0:
+                tcap, error = 0.0, 0.0
+            else:
+                detected = int(np.isin(sketch, dominator_hashes).sum())
+                tcap, error = detected / len(sketch), _proportion_error(detected, len(sketch), count)
+            for i in members:
+                rows.append({"Mutant": str(self.sketches.mutant_ids[i]), "TCAP": tcap, "TCAP Error": error,
+                             "Exact": error == 0.0})
+        return pd.DataFrame(rows, columns=["Mutant", "TCAP", "TCAP Error", "Exact"])
+
+    def confirm(self):
+        """
+        Confirm the estimate exactly, reading kill sets only where the sketches could be wrong.
+
+        Estimated classes are split where their exact kill sets differ, a class excluded from the dominators is
+        settled with one exact comparison against its witness, and only the remaining candidates are checked for
+        minimality against the smaller classes that share their lowest-hashed test.
+
+        Returns:
+            tuple: The exact dominator table (columns Node, Mutants, Tests, as ``compute_dominator_mutants``) and
+            the exact per-mutant TCAP table (columns Mutant, TCAP).
+        """
+        kill_sets = {mutant: frozenset(tests) for mutant, tests in self.killed_df.groupby("Mutant")["Test"]}
+        mutant_ids = self.sketches.mutant_ids
+
+        def kill_set(i):
+            return kill_sets.get(mutant_ids[i], frozenset())
+
+        # split the estimated classes whose members are not exact duplicates
+        exact_classes = []
+        confirmed_witnesses = {}
+        for c, members in enumerate(self.classes):
+            by_kill_set = {}
+            for i in members:
+                by_kill_set.setdefault(kill_set(i), []).append(i)
+            if c in self.witnesses and len(by_kill_set) == 1:
+                confirmed_witnesses[len(exact_classes)] = kill_set(self._representative(self.witnesses[c]))
+            exact_classes.extend(by_kill_set.values())
+
+        class_sets = [kill_set(members[0]) for members in exact_classes]
+        hashes = dict(zip(self.killed_df["Test"], self.killed_df["Hash"]))
+        by_min_test = {}
+        for c, tests in enumerate(class_sets):
+            if tests:
+                by_min_test.setdefault(min(tests, key=hashes.__getitem__), []).append(c)
+
+        dominators = []
+        for c, tests in enumerate(class_sets):
+            if not tests:
+                continue
+            witness = confirmed_witnesses.get(c)
+            if witness is not None and witness < tests:
+                continue
+            if not any(class_sets[other] < tests for test in tests for other in by_min_test.get(test, [])):
+                dominators.append(c)
+
+        dominator_rows = [{"Node": short_name(c), "Mutants": {str(mutant_ids[i]) for i in exact_classes[c]},
+                           "Tests": set(class_sets[c])} for c in dominators]
+        dominator_tests = set().union(*(class_sets[c] for c in dominators))
+
+        counts = self.killed_df.groupby("Mutant").size()
+        detected = self.killed_df[self.killed_df["Test"].isin(dominator_tests)].groupby("Mutant").size()
+        tcap = (detected.reindex(counts.index, fill_value=0) / counts).to_dict()
+        dominator_mutants = {mutant_ids[i] for c in dominators for i in exact_classes[c]}
+        tcap_rows = [{"Mutant": str(mutant), "TCAP": 1.0 if mutant in dominator_mutants else tcap.get(mutant, 0.0)}
+                     for mutant in mutant_ids]
+
+        return (pd.DataFrame(dominator_rows, columns=["Node", "Mutants", "Tests"]),
+                pd.DataFrame(tcap_rows, columns=["Mutant", "TCAP"]))
+
+
+def estimate_mutation_subsumption(csv_df, column_for_mutants_in_csv, killmatrix_df, column_for_mutants_in_kill_matrix,
+                                  column_for_tests_in_kill_matrix, column_for_kill_status_in_kill_matrix,
+                                  k=DEFAULT_SKETCH_SIZE):
+    """
+    Estimate equivalence classes, dominators, and TCAP from bottom-k sketches of the kill sets.
+
+    Takes the same inputs as ``generate_mutation_subsumption_graph``. Kill sets of at most ``k`` tests are
+    sketched exactly, so a larger ``k`` trades speed for accuracy.
+
+    Returns:
+        SketchEstimate: The estimate; call ``confirm`` on it for exact dominators and TCAP.
+    """
+    sketches, killed_df = sketch_kill_matrix(csv_df, column_for_mutants_in_csv, killmatrix_df,
+                                             column_for_mutants_in_kill_matrix, column_for_tests_in_kill_matrix,
+                                             column_for_kill_status_in_kill_matrix, k)
+    return SketchEstimate(sketches, killed_df)
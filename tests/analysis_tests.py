@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from analysis import MutationAnalysis
+from helpers import KILL_MATRIX_PATH
+
+EXPECTED_TCAP = {
+    'm2': 0.5, 'm5': 0.5, 'm3': 0.5, 'm6': 0.5,
+    'm1': 0.0, 'm10': 0.0, 'm11': 1.0, 'm12': 1.0,
+    'm8': 1.0, 'm13': 1.0, 'm4': 1.0, 'm7': 1.0,
+    'm9': 1.0, 'm14': 1.0
+}
+
+
+class TestMutationAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.kill_matrix_df = pd.read_csv(KILL_MATRIX_PATH)
+
+    def _check_results(self, analysis):
+        dominator_mutants = set().union(*analysis.dominator_mutants["Mutants"])
+        self.assertEqual(dominator_mutants, {"m8", "m13", "m4", "m7", "m9", "m14"})
+        self.assertEqual(analysis.dominator_mutant_detecting_tests, {"t1", "t2"})
+        self.assertEqual(list(analysis.lowest_layer_mutants["Mutants"]), [{"m3", "m6"}])
+        self.assertEqual(dict(zip(analysis.tcap_scores["Mutant"], analysis.tcap_scores["TCAP"])), EXPECTED_TCAP)
+
+    def test_from_dataframes_is_silent(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            analysis = MutationAnalysis.from_dataframes(self.kill_matrix_df, 1, self.kill_matrix_df, 1, 0, 2)
+            self._check_results(analysis)
+        self.assertEqual(stdout.getvalue(), "")
+
+    def test_from_kill_sets_and_arrays(self):
+        killed = self.kill_matrix_df[self.kill_matrix_df["Killed"] == 1]
+        kill_sets = {mutant: set(killed[killed["Mutant"] == mutant]["TestID"])
+                     for mutant in self.kill_matrix_df["Mutant"].unique()}
+        self._check_results(MutationAnalysis.from_kill_sets(kill_sets))
+
+        test_ids = sorted(self.kill_matrix_df["TestID"].unique())
+        matrix = [[test in kill_sets[mutant] for test in test_ids] for mutant in kill_sets]
+        self._check_results(MutationAnalysis.from_arrays(matrix, list(kill_sets), test_ids))
+
+    def test_writers_are_explicit(self):
+        analysis = MutationAnalysis.from_dataframes(self.kill_matrix_df, 1, self.kill_matrix_df, 1, 0, 2)
+        with tempfile.TemporaryDirectory() as results_dir:
+            analysis.tcap_scores
+            self.assertEqual(os.listdir(results_dir), [])
+            written = analysis.write_csvs(results_dir, "tcap")
+            self.assertEqual(sorted(os.listdir(results_dir)),
+                             ["tcap_dominator_mutants_tests.csv", "tcap_lowest_layer_mutant_to_unique_tests.csv",
+                              "tcap_tcap_scores.csv"])
+            self.assertEqual(len(written), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,7 +23,27 @@ class TestMainWithTCAPData(unittest.TestCase):
             sanitize=False,
             disable_cache=False,
             results_dir="../results",
-            results_prefix="tcap"
+            results_prefix="tcap",
+            no_plot=False,
+            out_of_core=False,
+            memory_budget=1024,
+            approximate=False,
+            diff_killmatrix=None,
+            test_order=None,
+            priority=False,
+            metrics=False,
+            reduce_tests=False,
+            engine="in_memory",
+            max_memory=None,
+            output_format="csv",
+            compression=None,
+            what_if=None,
+            group_by=None,
+            workers=None,
+            follow=False,
+            checkpoint=None,
+            checkpoint_every=1000,
+            resume=False
         )
 
         # Mock the sanitized data loading
@@ -96,7 +116,27 @@ class TestMainWithTCAPData(unittest.TestCase):
             sanitize=False,
             disable_cache=False,
             results_dir="../results",
-            results_prefix="tcap"
+            results_prefix="tcap",
+            no_plot=False,
+            out_of_core=False,
+            memory_budget=1024,
+            approximate=False,
+            diff_killmatrix=None,
+            test_order=None,
+            priority=False,
+            metrics=False,
+            reduce_tests=False,
+            engine="in_memory",
+            max_memory=None,
+            output_format="csv",
+            compression=None,
+            what_if=None,
+            group_by=None,
+            workers=None,
+            follow=False,
+            checkpoint=None,
+            checkpoint_every=1000,
+            resume=False
         )
 
         # Mock the sanitized data loading
@@ -158,7 +198,27 @@ class TestMainWithTCAPData(unittest.TestCase):
             sanitize=False,
             disable_cache=False,
             results_dir="../results",
-            results_prefix="tcap"
+            results_prefix="tcap",
+            no_plot=False,
+            out_of_core=False,
+            memory_budget=1024,
+            approximate=False,
+            diff_killmatrix=None,
+            test_order=None,
+            priority=False,
+            metrics=False,
+            reduce_tests=False,
+            engine="in_memory",
+            max_memory=None,
+            output_format="csv",
+            compression=None,
+            what_if=None,
+            group_by=None,
+            workers=None,
+            follow=False,
+            checkpoint=None,
+            checkpoint_every=1000,
+            resume=False
         )
 
         # Mock the sanitized data loading
@@ -218,7 +278,27 @@ class TestMainWithTCAPData(unittest.TestCase):
             sanitize=False,
             disable_cache=False,
             results_dir="../results",
-            results_prefix="tcap"
+            results_prefix="tcap",
+            no_plot=False,
+            out_of_core=False,
+            memory_budget=1024,
+            approximate=False,
+            diff_killmatrix=None,
+            test_order=None,
+            priority=False,
+            metrics=False,
+            reduce_tests=False,
+            engine="in_memory",
+            max_memory=None,
+            output_format="csv",
+            compression=None,
+            what_if=None,
+            group_by=None,
+            workers=None,
+            follow=False,
+            checkpoint=None,
+            checkpoint_every=1000,
+            resume=False
         )
 
         # Mock the sanitized data loading
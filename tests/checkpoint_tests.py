@@ -0,0 +1,130 @@
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import parser
+from helpers import KILL_MATRIX_PATH
+from main import main
+from MutantNode import MutantNode
+
+
+def random_nodes(seed, n_mutants=40, n_tests=10):
+    generator = random.Random(seed)
+    nodes = {}
+    for m in range(n_mutants):
+        nodes[f"m{m}"] = MutantNode(f"m{m}")
+        nodes[f"m{m}"].add_tests({f"t{t}" for t in range(n_tests) if generator.random() < 0.3})
+    return nodes
+
+
+def graph_state(hierarchy, merged_nodes):
+    return (list((parent.name, child.name) for parent, child in hierarchy.edges()),
+            {name: ([node.name for node in merged_nodes[name].parents],
+                    [node.name for node in merged_nodes[name].children]) for name in merged_nodes})
+
+
+class Preempted(Exception):
+    pass
+
+
+class TestHierarchyCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.test_dir, "hierarchy.checkpoint")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _preempted_build(self, seed, after_calls):
+        handle_new_node = parser.handle_new_node
+        calls = []
+
+        def preempt(*args):
+            calls.append(None)
+            if len(calls) > after_calls:
+                raise Preempted()
+            return handle_new_node(*args)
+
+        with mock.patch("parser.handle_new_node", side_effect=preempt):
+            with self.assertRaises(Preempted):
+                parser.build_subsumption_graph(random_nodes(seed), checkpoint_path=self.checkpoint_path,
+                                               checkpoint_every=4)
+
+    def test_resumed_build_matches_uninterrupted_build(self):
+        for seed in range(3):
+            hierarchy, merged_nodes, _ = parser.build_subsumption_graph(random_nodes(seed))
+            expected = graph_state(hierarchy, merged_nodes)
+
+            self._preempted_build(seed, after_calls=150)
+            hierarchy, merged_nodes, _ = parser.build_subsumption_graph(
+                random_nodes(seed), checkpoint_path=self.checkpoint_path, checkpoint_every=4, resume=True)
+            self.assertEqual(graph_state(hierarchy, merged_nodes), expected)
+            os.remove(self.checkpoint_path)
+
+    def test_resume_skips_checkpointed_mutants(self):
+        self._preempted_build(seed=1, after_calls=150)
+        with mock.patch("parser.handle_new_node", wraps=parser.handle_new_node) as handle_new_node:
+            parser.build_subsumption_graph(random_nodes(1), checkpoint_path=self.checkpoint_path, resume=True)
+        uninterrupted_calls = sum(range(len([node for node in parser.merge_indistinguishable_nodes(
+            random_nodes(1)).values() if node.tests])))
+        self.assertLess(handle_new_node.call_count, uninterrupted_calls - 100)
+
+    def test_edges_appended_after_the_last_checkpoint_are_ignored(self):
+        hierarchy, merged_nodes, _ = parser.build_subsumption_graph(random_nodes(2))
+        expected = graph_state(hierarchy, merged_nodes)
+
+        self._preempted_build(seed=2, after_calls=150)
+        # a preemption between appending to the edge log and renaming the checkpoint leaves a partial record
+        with open(f"{self.checkpoint_path}.edges", "ab") as log_file:
+            log_file.write(b"partial record")
+        hierarchy, merged_nodes, _ = parser.build_subsumption_graph(
+            random_nodes(2), checkpoint_path=self.checkpoint_path, checkpoint_every=4, resume=True)
+        self.assertEqual(graph_state(hierarchy, merged_nodes), expected)
+
+        # the completed log holds every edge once, in the order they were added
+        with open(f"{self.checkpoint_path}.edges", "rb") as log_file:
+            logged = []
+            while log_file.tell() < os.path.getsize(f"{self.checkpoint_path}.edges"):
+                logged.extend(pickle.load(log_file))
+        self.assertEqual(sorted(logged), sorted(expected[0]))
+        self.assertEqual(len(logged), len(set(logged)))
+
+    def test_checkpoint_of_other_input_is_rejected(self):
+        parser.build_subsumption_graph(random_nodes(seed=1), checkpoint_path=self.checkpoint_path)
+        with self.assertRaises(ValueError):
+            parser.build_subsumption_graph(random_nodes(seed=2), checkpoint_path=self.checkpoint_path, resume=True)
+
+    def test_no_killed_mutants(self):
+        nodes = {"m1": MutantNode("m1"), "m2": MutantNode("m2")}
+        hierarchy, _, _ = parser.build_subsumption_graph(nodes, checkpoint_path=self.checkpoint_path, resume=True)
+        self.assertEqual(hierarchy.number_of_edges(), 0)
+
+
+class TestCheckpointCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.working_dir = os.getcwd()
+        os.chdir(self.test_dir)
+
+    def tearDown(self):
+        os.chdir(self.working_dir)
+        shutil.rmtree(self.test_dir)
+
+    def test_resume_with_automatic_engine_selection_writes_the_checkpoint(self):
+        argv = ["main.py", "--csv", KILL_MATRIX_PATH, "1", "--killmatrix", KILL_MATRIX_PATH, "1", "0", "2",
+                "--results_dir", "results", "--no_plot", "--resume"]
+        # a packed engine would be picked for a large kill matrix, which does not checkpoint the hierarchy build
+        with mock.patch.object(sys, "argv", argv), mock.patch("engine.select_engine", return_value="out_of_core"):
+            main()
+        self.assertTrue(os.path.exists(os.path.join("cache", "killmatrix.csv_hierarchy.checkpoint")))
+
+
+if __name__ == '__main__':
+    unittest.main()
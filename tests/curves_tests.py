@@ -0,0 +1,67 @@
+import random
+import unittest
+
+import numpy as np
+
+from analysis import MutationAnalysis
+from curves import OrderingCurves
+from helpers import random_kill_matrix
+from kill_matrix import encode_kill_matrix
+
+
+def prefix_scores(kill_sets, dominator_sets, prefix):
+    """Recompute the scores of one prefix from scratch."""
+    prefix = set(prefix)
+    dominator_tests = frozenset().union(*dominator_sets)
+    killed = tcap_sum = 0
+    for tests in kill_sets.values():
+        run = tests & prefix
+        if run:
+            killed += 1
+            tcap_sum += 1.0 if tests in dominator_sets else len(run & dominator_tests) / len(run)
+    dominators_killed = sum(1 for tests in dominator_sets if tests & prefix)
+    return killed, dominators_killed, tcap_sum / len(kill_sets)
+
+
+class TestOrderingCurves(unittest.TestCase):
+
+    def test_curve_matches_prefix_recomputation(self):
+        for seed in range(5):
+            kill_matrix_df = random_kill_matrix(seed, n_mutants=40, n_tests=12, kill_probability=0.2)
+            analysis = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2)
+            kill_sets = {mutant: frozenset(node.tests) for mutant in kill_matrix_df["Mutant"].unique()
+                         for node in [analysis.node_of(mutant)]}
+            dominator_sets = {frozenset(node.tests) for node in analysis.dominator_mutants["Node"]}
+
+            test_order = sorted(kill_matrix_df["TestID"].unique())
+            random.Random(seed).shuffle(test_order)
+            curve = OrderingCurves(encode_kill_matrix(kill_matrix_df, 1, 0, 2)).curve(test_order)
+
+            for step in range(len(test_order)):
+                killed, dominators_killed, mean_tcap = prefix_scores(kill_sets, dominator_sets,
+                                                                     test_order[:step + 1])
+                self.assertEqual(curve["Killed Mutants"][step], killed)
+                self.assertEqual(curve["Dominators Killed"][step], dominators_killed)
+                self.assertAlmostEqual(curve["Mean Suite TCAP"][step], mean_tcap)
+            self.assertAlmostEqual(curve["Mean Suite TCAP"].iloc[-1], analysis.tcap_scores["TCAP"].mean())
+
+    def test_compare_orderings(self):
+        kill_matrix_df = random_kill_matrix(seed=7)
+        curves = OrderingCurves(encode_kill_matrix(kill_matrix_df, 1, 0, 2))
+        test_order = list(kill_matrix_df["TestID"].unique())
+        curves_df, summary_df = curves.compare({"forward": test_order, "reverse": test_order[::-1]})
+
+        self.assertEqual(list(summary_df["Ordering"]), ["forward", "reverse"])
+        self.assertEqual(len(curves_df), 2 * len(test_order))
+        final = curves_df.groupby("Ordering").last()
+        self.assertTrue(np.allclose(final["Mean Suite TCAP"], final["Mean Suite TCAP"].iloc[0]))
+        self.assertTrue((final["Dominator Score"] == 1.0).all())
+
+    def test_unknown_tests_are_rejected(self):
+        curves = OrderingCurves(encode_kill_matrix(random_kill_matrix(seed=1), 1, 0, 2))
+        with self.assertRaises(ValueError):
+            curves.curve(["t0", "not_a_test"])
+
+
+if __name__ == '__main__':
+    unittest.main()
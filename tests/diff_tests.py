@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from analysis import MutationAnalysis
+from diff import diff_kill_matrices, kill_sets_from_kill_matrix
+from helpers import random_kill_matrix, reference_edges
+from incremental import IncrementalSubsumptionGraph
+
+
+def change_tests(kill_matrix_df, seed, tests):
+    """Re-draw the kill column of the given tests."""
+    generator = random.Random(seed)
+    candidate_df = kill_matrix_df.copy()
+    changed = candidate_df["TestID"].isin(tests)
+    candidate_df.loc[changed, "Killed"] = [int(generator.random() < 0.3) for _ in range(changed.sum())]
+    return candidate_df
+
+
+class TestKillMatrixDiff(unittest.TestCase):
+
+    def test_incremental_graph_matches_rebuild(self):
+        for seed in range(10):
+            kill_matrix_df = random_kill_matrix(seed)
+            candidate_df = change_tests(kill_matrix_df, seed, ["t1", "t5"])
+            kill_matrix_diff = diff_kill_matrices(kill_matrix_df, candidate_df, 1, 0, 2)
+
+            candidate_sets = kill_sets_from_kill_matrix(candidate_df, 1, 0, 2)
+            rebuilt = IncrementalSubsumptionGraph.from_kill_sets(candidate_sets)
+            self.assertEqual(kill_matrix_diff.candidate.edges(), reference_edges(candidate_sets))
+            self.assertEqual(kill_matrix_diff.candidate.edges(), rebuilt.edges())
+            self.assertEqual(kill_matrix_diff.candidate.classes, rebuilt.classes)
+            self.assertTrue(kill_matrix_diff.changed_tests <= {"t1", "t5"})
+
+    def test_dominator_and_tcap_changes(self):
+        kill_matrix_df = random_kill_matrix(seed=3)
+        candidate_df = change_tests(kill_matrix_df, 3, ["t2"])
+        kill_matrix_diff = diff_kill_matrices(kill_matrix_df, candidate_df, 1, 0, 2)
+
+        baseline = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2)
+        candidate = MutationAnalysis.from_dataframes(candidate_df, 1, candidate_df, 1, 0, 2)
+        baseline_dominators = {frozenset(mutants) for mutants in baseline.dominator_mutants["Mutants"]}
+        candidate_dominators = {frozenset(mutants) for mutants in candidate.dominator_mutants["Mutants"]}
+
+        changes = kill_matrix_diff.dominator_changes()
+        self.assertEqual({frozenset(m) for m in changes[changes["Change"] == "added"]["Mutants"]},
+                         candidate_dominators - baseline_dominators)
+        self.assertEqual({frozenset(m) for m in changes[changes["Change"] == "removed"]["Mutants"]},
+                         baseline_dominators - candidate_dominators)
+
+        expected = {mutant: candidate.tcap_of(mutant) for mutant in candidate.tcap_scores["Mutant"]
+                    if candidate.tcap_of(mutant) != baseline.tcap_of(mutant)}
+        tcap_changes = kill_matrix_diff.tcap_changes()
+        self.assertEqual(dict(zip(tcap_changes["Mutant"], tcap_changes["Candidate TCAP"])), expected)
+
+    def test_identical_matrices_have_no_changes(self):
+        kill_matrix_df = random_kill_matrix(seed=4)
+        kill_matrix_diff = diff_kill_matrices(kill_matrix_df, kill_matrix_df.copy(), 1, 0, 2)
+        self.assertEqual(kill_matrix_diff.changed_mutants, [])
+        self.assertTrue(kill_matrix_diff.dominator_changes().empty)
+        self.assertTrue(kill_matrix_diff.edge_changes().empty)
+        self.assertTrue(kill_matrix_diff.tcap_changes().empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
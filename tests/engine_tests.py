@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from engine import KillMatrixProfile, estimate_engines, profile_kill_matrix, select_engine
+from helpers import KILL_MATRIX_PATH
+from main import choose_engine
+
+MEGABYTE = 1024 * 1024
+
+# the options that only the in-memory pipeline supports, none of them requested
+IN_MEMORY_ONLY_OPTIONS = dict(priority=False, reduce_tests=False, metrics=False, checkpoint=None, resume=False,
+                              no_plot=True)
+# the modes that run on the in-memory DataFrames, none of them requested
+IN_MEMORY_ONLY_MODES = dict(approximate=False, diff_killmatrix=None, test_order=None, group_by=None, what_if=None)
+
+
+class TestEngineSelection(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_profile_is_counted_and_cached(self):
+        profile_path = os.path.join(self.test_dir, "profile.json")
+        profile = profile_kill_matrix(KILL_MATRIX_PATH, 1, 0, 2, profile_path)
+        self.assertEqual((profile.n_rows, profile.n_mutants, profile.n_tests, profile.n_kills), (56, 14, 4, 22))
+
+        with mock.patch("engine.pd.read_csv", side_effect=AssertionError("the cached profile was not used")):
+            self.assertEqual(profile_kill_matrix(KILL_MATRIX_PATH, 1, 0, 2, profile_path).to_dict(),
+                             profile.to_dict())
+
+    def test_selection_follows_the_memory_bound(self):
+        small = KillMatrixProfile(n_rows=56, n_mutants=14, n_tests=4, n_kills=22)
+        self.assertEqual(select_engine(estimate_engines(small, 1024 * MEGABYTE), 1024 * MEGABYTE), "in_memory")
+
+        large = KillMatrixProfile(n_rows=10 ** 9, n_mutants=10 ** 6, n_tests=1000, n_kills=10 ** 8)
+        estimates = estimate_engines(large, 256 * MEGABYTE)
+        self.assertLess(estimates["out_of_core"]["memory"], estimates["vectorized"]["memory"])
+        self.assertLess(estimates["vectorized"]["memory"], estimates["in_memory"]["memory"])
+        self.assertEqual(select_engine(estimates, 1024 ** 4), "vectorized")
+        self.assertEqual(select_engine(estimates, 512 * MEGABYTE), "out_of_core")
+        self.assertEqual(select_engine(estimates, 1), "out_of_core")
+
+    def test_forced_engines_skip_the_scan(self):
+        args = mock.Mock(killmatrix=[KILL_MATRIX_PATH, 1, 0, 2], out_of_core=True, engine="auto", memory_budget=64,
+                         **IN_MEMORY_ONLY_OPTIONS, **IN_MEMORY_ONLY_MODES)
+        self.assertEqual(choose_engine(args, self.test_dir), ("out_of_core", 64 * MEGABYTE))
+        args.out_of_core, args.engine = False, "vectorized"
+        self.assertEqual(choose_engine(args, self.test_dir), ("vectorized", 64 * MEGABYTE))
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_auto_selection_caps_the_block_budget(self):
+        args = mock.Mock(killmatrix=[KILL_MATRIX_PATH, 1, 0, 2], out_of_core=False, engine="auto",
+                         memory_budget=1024, max_memory=100, **IN_MEMORY_ONLY_OPTIONS, **IN_MEMORY_ONLY_MODES)
+        self.assertEqual(choose_engine(args, self.test_dir), ("in_memory", 50 * MEGABYTE))
+
+    def auto_args(self, **options):
+        return mock.Mock(killmatrix=[KILL_MATRIX_PATH, 1, 0, 2], out_of_core=False, engine="auto", memory_budget=1024,
+                         max_memory=100, **{**IN_MEMORY_ONLY_OPTIONS, **IN_MEMORY_ONLY_MODES, **options})
+
+    def test_auto_selection_keeps_in_memory_for_in_memory_only_options(self):
+        requested = dict(priority=True, reduce_tests=True, metrics=True, checkpoint="hierarchy.checkpoint",
+                         resume=True, no_plot=False)
+        for option, value in requested.items():
+            args = self.auto_args(**{option: value})
+            with mock.patch("engine.select_engine", return_value="out_of_core"):
+                self.assertEqual(choose_engine(args, self.test_dir), ("in_memory", 50 * MEGABYTE), option)
+            self.assertTrue(os.path.exists(os.path.join(self.test_dir, "killmatrix.csv_profile.json")), option)
+
+    def test_auto_selection_skips_the_plot_or_fails_when_in_memory_does_not_fit(self):
+        too_large = {"memory": 10 ** 12, "time": 1.0}
+        estimates = {"in_memory": too_large, "vectorized": too_large, "out_of_core": {"memory": 1, "time": 2.0}}
+        with mock.patch("engine.estimate_engines", return_value=estimates):
+            args = self.auto_args(no_plot=False)
+            self.assertEqual(choose_engine(args, self.test_dir), ("out_of_core", 50 * MEGABYTE))
+            self.assertTrue(args.no_plot)
+
+            with self.assertRaisesRegex(ValueError, "--priority"):
+                choose_engine(self.auto_args(no_plot=False, priority=True), self.test_dir)
+
+    def test_auto_selection_keeps_in_memory_for_in_memory_modes(self):
+        args = self.auto_args(approximate=True)
+        self.assertEqual(choose_engine(args, self.test_dir), ("in_memory", 1024 * MEGABYTE))
+        self.assertEqual(os.listdir(self.test_dir), [])
+
+    def test_forced_packed_engines_reject_in_memory_only_options(self):
+        args = mock.Mock(killmatrix=[KILL_MATRIX_PATH, 1, 0, 2], out_of_core=False, engine="vectorized",
+                         memory_budget=64, **dict(IN_MEMORY_ONLY_OPTIONS, **IN_MEMORY_ONLY_MODES, resume=True))
+        with self.assertRaisesRegex(ValueError, "--resume"):
+            choose_engine(args, self.test_dir)
+        args.engine, args.resume = "in_memory", True
+        self.assertEqual(choose_engine(args, self.test_dir), ("in_memory", 64 * MEGABYTE))
+
+        args.engine, args.resume, args.no_plot = "out_of_core", False, False
+        self.assertEqual(choose_engine(args, self.test_dir), ("out_of_core", 64 * MEGABYTE))
+        self.assertTrue(args.no_plot)
+
+
+if __name__ == '__main__':
+    unittest.main()
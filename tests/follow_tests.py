@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from analysis import MutationAnalysis
+from diff import kill_sets_from_kill_matrix
+from follow import KillMatrixFollower, follow_kill_matrix
+from helpers import random_kill_matrix, reference_edges
+
+
+class TestFollow(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.kill_matrix_path = os.path.join(self.test_dir, "killmatrix.csv")
+        self.kill_matrix_df = random_kill_matrix(seed=5)
+        self.lines = self.kill_matrix_df.to_csv(index=False).splitlines(keepends=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _append(self, text):
+        with open(self.kill_matrix_path, "a") as kill_matrix_file:
+            kill_matrix_file.write(text)
+
+    def test_ingest_matches_the_finished_file(self):
+        self._append(self.lines[0])
+        follower = KillMatrixFollower(self.kill_matrix_path, 1, 0, 2, mutant_ids=["m0", "unknown"])
+        self.assertEqual(follower.ingest(), 0)
+
+        rows = self.lines[1:]
+        for start in range(0, len(rows), 37):
+            chunk = "".join(rows[start:start + 37])
+            # the last line is written in two parts, as a running tool may flush it
+            self._append(chunk[:-5])
+            follower.ingest()
+            self._append(chunk[-5:])
+            follower.ingest()
+        self.assertEqual(follower.n_rows, len(rows))
+
+        kill_sets = kill_sets_from_kill_matrix(self.kill_matrix_df, 1, 0, 2)
+        self.assertEqual({mutant: tests for mutant, tests in follower.graph.kill_sets.items() if mutant != "unknown"},
+                         kill_sets)
+        self.assertEqual(follower.graph.edges(), reference_edges(kill_sets))
+        self.assertEqual(follower.tcap_scores().set_index("Mutant")["TCAP"]["unknown"], 0)
+
+    def test_dominators_match_the_batch_pipeline(self):
+        self._append("".join(self.lines))
+        follower = KillMatrixFollower(self.kill_matrix_path, 1, 0, 2,
+                                      mutant_ids=self.kill_matrix_df["Mutant"].unique())
+        follower.ingest()
+
+        batch_df = MutationAnalysis.from_dataframes(self.kill_matrix_df, 1, self.kill_matrix_df, 1, 0, 2) \
+            .dominator_mutants
+        follow_df = follower.dominator_mutants()
+        self.assertEqual(list(follow_df.columns), list(batch_df.columns))
+        self.assertEqual(sorted(zip(follow_df["Node"], map(sorted, follow_df["Mutants"]))),
+                         sorted(zip(map(str, batch_df["Node"]), map(sorted, batch_df["Mutants"]))))
+
+    def test_missing_file_and_quoted_newlines(self):
+        follower = KillMatrixFollower(self.kill_matrix_path, 1, 0, 2)
+        self.assertEqual(follower.ingest(), 0)
+
+        self._append('Test,Mutant,Killed\n"t1\nretried",m1,1\nt2,m2,1\n"t3')
+        self.assertEqual(follower.ingest(), 2)
+        self._append('\nretried",m2,1\n')
+        self.assertEqual(follower.ingest(), 1)
+        self.assertEqual(follower.graph.kill_sets, {"m1": {"t1\nretried"}, "m2": {"t2", "t3\nretried"}})
+
+    def test_follow_stops_when_dominators_are_stable(self):
+        self._append(self.lines[0])
+        follower = KillMatrixFollower(self.kill_matrix_path, 1, 0, 2)
+        rows = iter(self.lines[1:])
+
+        def append_rows(interval):
+            self._append("".join(next(rows, "") for _ in range(10)))
+
+        refreshed = []
+        progress_df = follow_kill_matrix(follower, lambda follower, progress: refreshed.append(len(progress)),
+                                         interval=0, stop_when_stable=3, max_refreshes=100, sleep=append_rows)
+        self.assertEqual(refreshed, list(range(1, len(progress_df) + 1)))
+        self.assertTrue(progress_df["Rows"].is_monotonic_increasing)
+        self.assertFalse(progress_df["Dominators Changed"].iloc[-3:].any())
+
+
+if __name__ == '__main__':
+    unittest.main()
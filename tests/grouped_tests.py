@@ -0,0 +1,53 @@
+import os
+import unittest
+
+import pandas as pd
+
+from analysis import MutationAnalysis
+from grouped import analyze_groups, group_file_names
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "test_data", "tcap")
+
+
+class TestGroupedAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.csv_df = pd.read_csv(os.path.join(TEST_DATA_DIR, "mutants.csv"))
+        self.kill_matrix_df = pd.read_csv(os.path.join(TEST_DATA_DIR, "killmatrix.csv"))
+
+    def test_groups_match_separate_analyses(self):
+        summary_df, group_results = analyze_groups(self.csv_df, 0, "Context", self.kill_matrix_df, 1, 0, 2,
+                                                   workers=2)
+        self.assertEqual(set(summary_df["Group"]), set(self.csv_df["Context"]))
+        self.assertEqual(summary_df["Mutants"].sum(), len(self.csv_df))
+
+        for group, group_csv_df in self.csv_df.groupby("Context"):
+            group_kill_matrix_df = self.kill_matrix_df[self.kill_matrix_df["Mutant"].isin(group_csv_df["Mutant"])]
+            analysis = MutationAnalysis.from_dataframes(group_csv_df, 0, group_kill_matrix_df, 1, 0, 2)
+            expected = {frozenset(mutants) for mutants in analysis.dominator_mutants["Mutants"]}
+            result = group_results[group]
+            self.assertEqual({frozenset(mutants) for mutants in result["dominator_mutants"]["Mutants"]}, expected)
+            self.assertAlmostEqual(result["summary"]["Mean TCAP"], analysis.tcap_scores["TCAP"].mean())
+
+    def test_global_dominators_are_attributed_to_groups(self):
+        summary_df, _ = analyze_groups(self.csv_df, 0, 1, self.kill_matrix_df, 1, 0, 2, workers=1)
+        analysis = MutationAnalysis.from_dataframes(self.csv_df, 0, self.kill_matrix_df, 1, 0, 2)
+        group_of = dict(zip(self.csv_df["Mutant"], self.csv_df["MutOp"]))
+
+        expected = {}
+        for mutants in analysis.dominator_mutants["Mutants"]:
+            for mutant in mutants:
+                expected[group_of[mutant]] = expected.get(group_of[mutant], 0) + 1
+        produced = summary_df[summary_df["Global Dominator Mutants"] > 0]
+        self.assertEqual(dict(zip(produced["Group"], produced["Global Dominator Mutants"])), expected)
+        self.assertAlmostEqual(summary_df["Global Dominator Share"].sum(), 1.0)
+
+    def test_group_file_names_are_distinct(self):
+        names = group_file_names(["< ↦−→ !=", "< ↦−→ ==", "a/b", "a b"])
+        self.assertEqual(len(set(names.values())), 4)
+        self.assertTrue(all(name.replace("_", "").replace("-", "").replace(".", "").isalnum()
+                            for name in names.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+"""Kill matrices and reference results shared by the test modules."""
+import os
+import random
+
+import pandas as pd
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+KILL_MATRIX_PATH = os.path.join(REPO_DIR, "test_data", "tcap", "killmatrix.csv")
+
+
+def random_kill_matrix(seed, n_mutants=30, n_tests=8, kill_probability=0.3):
+    """Draw a kill matrix in the ``TestID, Mutant, Killed`` layout, with every mutant and test present."""
+    generator = random.Random(seed)
+    return pd.DataFrame([(f"t{t}", f"m{m}", int(generator.random() < kill_probability))
+                         for m in range(n_mutants) for t in range(n_tests)], columns=["TestID", "Mutant", "Killed"])
+
+
+def reference_edges(kill_sets):
+    """Compute the edges of the subsumption graph of the given kill sets by comparing every pair of classes."""
+    classes = {tests for tests in kill_sets.values() if tests}
+    return {(parent, child) for parent in classes for child in classes
+            if parent < child and not any(parent < other < child for other in classes)}
@@ -0,0 +1,72 @@
+import unittest
+
+import networkx as nx
+
+from analysis import MutationAnalysis
+from helpers import random_kill_matrix
+from plot import layered_layout
+
+
+class TestGraphMetrics(unittest.TestCase):
+
+    def test_metrics_match_graph_traversals(self):
+        kill_matrix_df = random_kill_matrix(seed=7)
+        analysis = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2)
+        hierarchy = analysis.hierarchy
+        graph_metrics = analysis.graph_metrics
+        node_metrics = graph_metrics.node_metrics().set_index("Node")
+
+        killed = [node for node in hierarchy.nodes() if node.tests]
+        longest = max(len(path) for source in killed for target in killed
+                      for path in list(nx.all_simple_paths(hierarchy, source, target)) + [[source]])
+        for node in hierarchy.nodes():
+            row = node_metrics.loc[node.name]
+            descendants = nx.descendants(hierarchy, node)
+            self.assertEqual(row["Class Size"], len(analysis.mutants_of(node)))
+            self.assertEqual(row["Subsumed Nodes"], len(descendants))
+            self.assertEqual(row["Subsumed Mutants"], sum(descendant.size for descendant in descendants))
+            if node.tests:
+                depth = max((len(path) - 1 for root in nx.ancestors(hierarchy, node)
+                             for path in nx.all_simple_paths(hierarchy, root, node)), default=0)
+                self.assertEqual(row["Depth"], depth)
+                self.assertEqual(row["Dominator"], hierarchy.in_degree(node) == 0)
+            else:
+                self.assertEqual(row["Depth"], -1)
+
+        chain = graph_metrics.longest_chain()
+        self.assertEqual(len(chain), longest)
+        self.assertTrue(all(hierarchy.has_edge(parent, child) for parent, child in zip(chain, chain[1:])))
+
+        widths = graph_metrics.layer_widths()
+        self.assertEqual(widths["Nodes"].sum(), len(killed))
+        self.assertEqual(widths["Mutants"].sum(), sum(node.size for node in killed))
+        self.assertEqual(len(widths), longest)
+
+        distribution = graph_metrics.class_size_distribution()
+        self.assertEqual((distribution["Class Size"] * distribution["Classes"]).sum(), len(analysis.tcap_scores))
+
+    def test_small_example(self):
+        analysis = MutationAnalysis.from_kill_sets({"m1": {"t1"}, "m2": {"t1", "t2"}, "m3": {"t1", "t2"},
+                                                    "m4": {"t1", "t2", "t3"}, "m5": {"t4"}, "m6": set()})
+        graph_metrics = analysis.graph_metrics
+        self.assertEqual(list(graph_metrics.layer_widths()["Nodes"]), [2, 1, 1])
+        self.assertEqual(list(graph_metrics.layer_widths()["Mutants"]), [2, 2, 1])
+        self.assertEqual([analysis.mutants_of(node) for node in graph_metrics.longest_chain()],
+                         [["m1"], ["m2", "m3"], ["m4"]])
+        self.assertEqual(graph_metrics.class_size_distribution().values.tolist(), [[1, 4, 3], [2, 1, 1]])
+        summary = graph_metrics.summary()
+        self.assertEqual((summary["Longest Chain"], summary["Layers"], summary["Widest Layer"]), (3, 3, 2))
+        self.assertEqual(list(graph_metrics.node_metrics()["Subsumed Mutants"]), [0, 3, 0, 1, 0])
+        self.assertNotIn("descendants", analysis.reachability_index.__dict__)
+
+    def test_layered_layout_places_layers_top_down(self):
+        analysis = MutationAnalysis.from_kill_sets({"m1": {"t1"}, "m2": {"t1", "t2"}, "m3": {"t3"}, "m4": set()})
+        pos = layered_layout(analysis.hierarchy, analysis.graph_metrics.layers())
+        self.assertEqual(set(pos), set(analysis.hierarchy.nodes()))
+        m1, m2, m4 = (analysis.node_of(mutant) for mutant in ("m1", "m2", "m4"))
+        self.assertGreater(pos[m1][1], pos[m2][1])
+        self.assertEqual(pos[m1][1], pos[m4][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import sys
+import unittest
+from unittest import mock
+
+from oracle import ENGINES, compare_outcomes, fuzz, main, passed, random_kill_sets, reference_outcome, summarize
+
+
+class TestOracle(unittest.TestCase):
+
+    def test_reference_on_a_small_example(self):
+        reference = reference_outcome({"m1": {"t1"}, "m2": {"t1", "t2"}, "m3": {"t1", "t2"},
+                                       "m4": {"t1", "t2", "t3"}, "m5": {"t4"}, "m6": set()})
+        t1, t12, t123, t4 = (frozenset(tests) for tests in ({"t1"}, {"t1", "t2"}, {"t1", "t2", "t3"}, {"t4"}))
+        self.assertEqual(reference.classes[t12], {"m2", "m3"})
+        self.assertEqual(reference.classes[frozenset()], {"m6"})
+        self.assertEqual(reference.edges, {(t1, t12), (t12, t123)})
+        self.assertEqual(reference.dominators, {t1, t4})
+        self.assertEqual(reference.tcap, {"m1": 1.0, "m2": 0.5, "m3": 0.5, "m4": 1 / 3, "m5": 1.0, "m6": 0.0})
+
+    def test_engines_match_the_reference(self):
+        results_df = fuzz(n_cases=12, seed=5, max_mutants=60, max_tests=16)
+        self.assertEqual(set(results_df["Engine"]), set(ENGINES) | {"reference"})
+        self.assertTrue(results_df[["Classes Match", "Dominators Match", "TCAP Match", "Reachability Match"]]
+                        .all(axis=None))
+        self.assertEqual(results_df["Missing Edges"].sum(), 0)
+
+        # the packed and incremental engines keep exactly the transitively reduced edges
+        reduced_engines = results_df[results_df["Engine"].isin(["vectorized", "out_of_core", "incremental"])]
+        self.assertTrue(reduced_engines["Edges Match"].all())
+
+        self.assertTrue(passed(results_df).all())
+        summary = summarize(results_df).set_index("Engine")
+        self.assertEqual(summary.loc["reference", "Matched"], 12)
+        self.assertEqual(summary.loc["in_memory", "Passed"], 12)
+        self.assertEqual(summary.loc["vectorized", "Edges Mismatches"], 0)
+
+    def test_comparison_reports_each_aspect(self):
+        kill_sets, _ = random_kill_sets(random.Random(2), 30, 6)
+        reference = reference_outcome(kill_sets)
+        self.assertTrue(all(compare_outcomes(reference, reference)[f"{aspect} Match"]
+                            for aspect in ("Classes", "Edges", "Dominators", "TCAP")))
+
+        wrong = reference._replace(tcap=dict(reference.tcap, m0=reference.tcap["m0"] + 0.5),
+                                   edges=set(list(reference.edges)[1:]))
+        comparison = compare_outcomes(reference, wrong)
+        self.assertFalse(comparison["TCAP Match"])
+        self.assertFalse(comparison["Edges Match"])
+        self.assertEqual(comparison["Missing Edges"], 1)
+        self.assertTrue(comparison["Classes Match"])
+
+
+    def test_command_line_passes_on_transitive_edges(self):
+        with mock.patch.object(sys, "argv", ["oracle.py", "--cases", "6", "--max_mutants", "60"]):
+            self.assertEqual(main(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
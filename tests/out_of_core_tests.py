@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from helpers import KILL_MATRIX_PATH
+from kill_matrix import DEFAULT_MEMORY_BUDGET, encode_kill_matrix, encode_kill_matrix_to_file, open_encoded_kill_matrix
+from out_of_core import (generate_packed_subsumption_graph, packed_dominator_mutants, packed_lowest_layer_mutants,
+                         packed_tcap_scores)
+
+
+class TestOutOfCore(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.kill_matrix_df = pd.read_csv(KILL_MATRIX_PATH)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _memory_mapped_graph(self, memory_budget):
+        bits_path = os.path.join(self.test_dir, "killmatrix.bits")
+        encode_kill_matrix_to_file(KILL_MATRIX_PATH, 1, 0, 2, bits_path, memory_budget=memory_budget)
+        encoded = open_encoded_kill_matrix(bits_path)
+        self.assertIsInstance(encoded.bits, np.memmap)
+        return generate_packed_subsumption_graph(encoded, memory_budget, workdir=self.test_dir)
+
+    def test_encoding_matches_kill_matrix(self):
+        encoded = encode_kill_matrix(self.kill_matrix_df, 1, 0, 2)
+        self.assertEqual(encoded.tests_of(encoded.mutant_ids.index("m2")), {"t2", "t4"})
+        self.assertEqual(encoded.tests_of(encoded.mutant_ids.index("m1")), set())
+        self.assertEqual(list(encoded.kill_counts()), [0, 2, 4, 1, 2, 4, 1, 1, 1, 0, 2, 2, 1, 1])
+
+    def test_dominators_and_tcap(self):
+        # a tiny budget forces one row per block and one candidate pair per chunk
+        graph = self._memory_mapped_graph(memory_budget=1)
+
+        dominator_mutants_df, dominator_tests = packed_dominator_mutants(graph)
+        dominator_mutants = set().union(*dominator_mutants_df["Mutants"])
+        self.assertEqual(dominator_mutants, {"m8", "m13", "m4", "m7", "m9", "m14"})
+        self.assertEqual(dominator_tests, {"t1", "t2"})
+
+        lowest_layer_df = packed_lowest_layer_mutants(graph)
+        self.assertEqual(list(lowest_layer_df["Mutants"]), [{"m3", "m6"}])
+        self.assertEqual(lowest_layer_df["Unique Tests"][0], {"t3"})
+
+        expected_tcap = {
+            'm2': 0.5, 'm5': 0.5, 'm3': 0.5, 'm6': 0.5,
+            'm1': 0.0, 'm10': 0.0, 'm11': 1.0, 'm12': 1.0,
+            'm8': 1.0, 'm13': 1.0, 'm4': 1.0, 'm7': 1.0,
+            'm9': 1.0, 'm14': 1.0
+        }
+        tcap_df = packed_tcap_scores(graph, memory_budget=1)
+        self.assertEqual(dict(zip(tcap_df["Mutant"], tcap_df["TCAP"])), expected_tcap)
+
+    def test_edges_are_transitively_reduced(self):
+        graph = self._memory_mapped_graph(memory_budget=1024)
+        kill_sets = [graph.classes.tests_of(i) for i in range(graph.n_classes)]
+        edges = {tuple(edge) for edge in graph.edges.tolist()}
+
+        expected = set()
+        for parent, parent_tests in enumerate(kill_sets):
+            for child, child_tests in enumerate(kill_sets):
+                if parent_tests and parent_tests < child_tests and not any(
+                        parent_tests < tests < child_tests for tests in kill_sets):
+                    expected.add((parent, child))
+        self.assertEqual(edges, expected)
+
+    def test_merge_and_edges_match_across_block_sizes(self):
+        rng = np.random.default_rng(3)
+        kill_sets = {f"m{i}": {f"t{j}" for j in range(70) if rng.random() < 0.1 * (i % 4)} for i in range(60)}
+        kill_matrix_df = pd.DataFrame([(test, mutant, int(test in tests)) for mutant, tests in kill_sets.items()
+                                       for test in (f"t{j}" for j in range(70))], columns=["Test", "Mutant", "Killed"])
+        encoded = encode_kill_matrix(kill_matrix_df, 1, 0, 2)
+
+        def outcome(memory_budget):
+            graph = generate_packed_subsumption_graph(encoded, memory_budget, show_progress=False)
+            kill_sets = [frozenset(graph.classes.tests_of(i)) for i in range(graph.n_classes)]
+            return ({kill_sets[i]: frozenset(members) for i, members in enumerate(graph.members)},
+                    {(kill_sets[parent], kill_sets[child]) for parent, child in graph.edges.tolist()})
+
+        classes, edges = outcome(DEFAULT_MEMORY_BUDGET)
+        self.assertEqual(len(classes), len({frozenset(tests) for tests in kill_sets.values()}))
+        self.assertEqual(outcome(64), (classes, edges))
+
+    def test_runs_in_one_workdir_keep_their_own_classes(self):
+        graph = self._memory_mapped_graph(memory_budget=1024)
+        kill_sets = [graph.classes.tests_of(i) for i in range(graph.n_classes)]
+
+        other_df = self.kill_matrix_df.assign(Killed=1 - self.kill_matrix_df["Killed"])
+        with self.assertRaises(ValueError):
+            generate_packed_subsumption_graph(encode_kill_matrix(other_df, 1, 0, 2), 1024, workdir=self.test_dir)
+        other_path = os.path.join(self.test_dir, "other.csv")
+        other_df.to_csv(other_path, index=False)
+        encode_kill_matrix_to_file(other_path, 1, 0, 2, os.path.join(self.test_dir, "other.bits"))
+        generate_packed_subsumption_graph(open_encoded_kill_matrix(os.path.join(self.test_dir, "other.bits")), 1024,
+                                          workdir=self.test_dir)
+
+        self.assertEqual([graph.classes.tests_of(i) for i in range(graph.n_classes)], kill_sets)
+        self.assertEqual(sorted(name for name in os.listdir(self.test_dir) if name.endswith("_classes.bits")),
+                         ["killmatrix_equivalence_classes.bits", "other_equivalence_classes.bits"])
+
+
+if __name__ == '__main__':
+    unittest.main()
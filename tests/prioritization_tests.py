@@ -0,0 +1,61 @@
+import unittest
+
+import networkx as nx
+import pandas as pd
+
+from analysis import MutationAnalysis
+from helpers import random_kill_matrix
+from prioritization import compute_mutant_priority_scores
+from reachability import ReachabilityIndex
+
+
+class TestMutantPriorityScores(unittest.TestCase):
+
+    def test_scores_match_graph_traversals(self):
+        kill_matrix_df = random_kill_matrix(seed=4)
+        analysis = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2)
+        hierarchy = analysis.hierarchy
+        class_sizes = {node: len(analysis.mutants_of(node)) for node in hierarchy.nodes()}
+        scores = analysis.priority_scores
+
+        self.assertEqual(len(scores), sum(class_sizes.values()))
+        self.assertTrue(scores["Priority"].is_monotonic_decreasing)
+        for row in scores.itertuples(index=False):
+            node = analysis.node_of(row.Mutant)
+            depth = max((len(path) - 1 for root in hierarchy.nodes() if hierarchy.in_degree(root) == 0
+                         for path in nx.all_simple_paths(hierarchy, root, node)), default=0)
+            subsumed = sum(class_sizes[descendant] for descendant in nx.descendants(hierarchy, node))
+            self.assertEqual(row.Depth, depth)
+            self.assertEqual(row[4], subsumed)
+            self.assertEqual(row[5], len(node.tests))
+            expected = (subsumed + 1) / ((depth + 1) * len(node.tests)) if node.tests else 0
+            self.assertAlmostEqual(row.Priority, expected)
+
+    def test_small_example(self):
+        analysis = MutationAnalysis.from_kill_sets({"m1": {"t1"}, "m2": {"t1", "t2"}, "m3": {"t3"},
+                                                    "m4": {"t1", "t3"}, "m5": set()})
+        scores = analysis.priority_scores.set_index("Mutant")["Priority"]
+        self.assertEqual(scores["m1"], 3.0)
+        self.assertEqual(scores["m3"], 2.0)
+        self.assertEqual(scores["m2"], 0.25)
+        self.assertEqual(scores["m5"], 0)
+
+    def test_scoring_builds_no_closure(self):
+        analysis = MutationAnalysis.from_kill_sets({"m1": {"t1"}, "m2": {"t1", "t2"}, "m3": {"t3"}})
+        size_before_scoring = analysis.estimated_size()
+        analysis.priority_scores
+        self.assertNotIn("descendants", analysis.reachability_index.__dict__)
+        self.assertNotIn("ancestors", analysis.reachability_index.__dict__)
+        self.assertEqual(analysis.estimated_size(), size_before_scoring)
+
+    def test_scores_do_not_depend_on_the_memory_budget(self):
+        kill_matrix_df = random_kill_matrix(seed=6)
+        analysis = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2)
+        # a budget of one byte sweeps the closure eight descendant columns at a time
+        scores = compute_mutant_priority_scores(analysis.hierarchy, analysis.short_names_to_nodes_mapping,
+                                                ReachabilityIndex.from_hierarchy(analysis.hierarchy, memory_budget=1))
+        pd.testing.assert_frame_equal(scores, analysis.priority_scores)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import random
+import unittest
+
+import networkx as nx
+import numpy as np
+
+from MutantNode import MutantNode
+from reachability import ArrayGraph, ReachabilityIndex
+
+
+def random_dag(seed, n_nodes=40, edge_probability=0.1):
+    generator = random.Random(seed)
+    nodes = [MutantNode(f"X{i:02x}") for i in range(n_nodes)]
+    hierarchy = nx.DiGraph()
+    hierarchy.add_nodes_from(generator.sample(nodes, n_nodes))
+    for i in range(n_nodes):
+        for j in range(i + 1, n_nodes):
+            if generator.random() < edge_probability:
+                hierarchy.add_edge(nodes[i], nodes[j])
+    return hierarchy
+
+
+class TestReachabilityIndex(unittest.TestCase):
+
+    def test_matches_networkx_traversals(self):
+        for seed in range(10):
+            hierarchy = random_dag(seed)
+            index = ReachabilityIndex.from_hierarchy(hierarchy)
+            for node in hierarchy.nodes():
+                self.assertEqual(set(index.subsumed_by(node)), nx.descendants(hierarchy, node))
+                self.assertEqual(set(index.subsumers_of(node)), nx.ancestors(hierarchy, node))
+                for other_node in hierarchy.nodes():
+                    self.assertEqual(index.subsumes(node, other_node), nx.has_path(hierarchy, node, other_node)
+                                     and node is not other_node)
+
+    def test_queries_search_the_graph_when_the_closure_does_not_fit(self):
+        hierarchy = random_dag(seed=7)
+        index = ReachabilityIndex.from_hierarchy(hierarchy, memory_budget=1)
+        self.assertFalse(index.fits_in_memory)
+        for node in hierarchy.nodes():
+            self.assertEqual(set(index.subsumed_by(node)), nx.descendants(hierarchy, node))
+            self.assertEqual(set(index.subsumers_of(node)), nx.ancestors(hierarchy, node))
+            for other_node in list(hierarchy.nodes())[:5]:
+                self.assertEqual(index.subsumes(node, other_node), other_node in nx.descendants(hierarchy, node))
+        with self.assertRaises(ValueError):
+            index.descendants
+        self.assertNotIn("descendants", index.__dict__)
+
+    def test_descendant_counts(self):
+        hierarchy = random_dag(seed=3)
+        index = ReachabilityIndex.from_hierarchy(hierarchy)
+        weights = np.arange(1, hierarchy.number_of_nodes() + 1)
+        nodes = index.graph.nodes
+
+        self.assertEqual(list(index.descendant_counts()),
+                         [len(nx.descendants(hierarchy, node)) for node in nodes])
+        self.assertEqual(list(index.descendant_counts(weights)),
+                         [sum(weights[index.graph.index[d]] for d in nx.descendants(hierarchy, node))
+                          for node in nodes])
+
+    def test_layers_are_longest_path_depths(self):
+        hierarchy = random_dag(seed=5)
+        graph = ArrayGraph.from_hierarchy(hierarchy)
+        for node in nx.topological_sort(hierarchy):
+            parents = list(hierarchy.predecessors(node))
+            expected = max(graph.depth[graph.index[parent]] for parent in parents) + 1 if parents else 0
+            self.assertEqual(graph.depth[graph.index[node]], expected)
+        self.assertEqual(sum(len(layer) for layer in graph.layers), hierarchy.number_of_nodes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+import pandas as pd
+
+from main import compute_dominator_mutants, compute_lowest_layer_mutants
+from parser import generate_mutation_subsumption_graph
+from reduction import reduce_kill_matrix
+from TCAP_calculator import compute_tcap
+
+
+def kill_matrix_with_redundant_tests(seed, n_mutants=25, n_tests=6, n_copies=3, n_idle=2):
+    """A random kill matrix where every test has parameterized copies and some tests kill nothing."""
+    generator = random.Random(seed)
+    rows = []
+    for t in range(n_tests):
+        kills = [int(generator.random() < 0.3) for _ in range(n_mutants)]
+        for copy in range(n_copies):
+            rows += [(f"t{t}[{copy}]", f"m{m}", kills[m]) for m in range(n_mutants)]
+    for t in range(n_idle):
+        rows += [(f"idle{t}", f"m{m}", 0) for m in range(n_mutants)]
+    return pd.DataFrame(rows, columns=["TestID", "Mutant", "Killed"])
+
+
+def results(kill_matrix_df, reduce_tests):
+    # the mutants CSV still lists every mutant, including those the reduced matrix no longer mentions
+    csv_df = kill_matrix_df
+    reduction = None
+    if reduce_tests:
+        kill_matrix_df, reduction = reduce_kill_matrix(kill_matrix_df, 1, 0, 2)
+    hierarchy, merged_nodes, mapping = generate_mutation_subsumption_graph(csv_df, 1, kill_matrix_df, 1, 0, 2,
+                                                                           show_progress=False)
+    if reduction is not None:
+        reduction.expand_nodes(merged_nodes)
+
+    dominators_df, dominator_tests = compute_dominator_mutants(hierarchy, mapping)
+    lowest_layer_df = compute_lowest_layer_mutants(hierarchy, merged_nodes, mapping)
+    tcap_df = compute_tcap(hierarchy, set(dominators_df["Node"]), dominator_tests, mapping, verbose=False)
+    return ({(frozenset(row.Mutants), frozenset(row.Tests)) for row in dominators_df.itertuples()},
+            {frozenset(row.Mutants): frozenset(row[3]) for row in lowest_layer_df.itertuples(index=False)},
+            dict(zip(tcap_df["Mutant"], tcap_df["TCAP"])))
+
+
+class TestKillMatrixReduction(unittest.TestCase):
+
+    def test_reduction_groups(self):
+        kill_matrix_df = kill_matrix_with_redundant_tests(seed=2)
+        reduced_df, reduction = reduce_kill_matrix(kill_matrix_df, 1, 0, 2)
+
+        self.assertEqual(reduction.dropped_tests, ["idle0", "idle1"])
+        self.assertEqual(reduction.n_original_tests, 20)
+        self.assertTrue(all(weight % 3 == 0 for weight in reduction.weights.values()))
+        summary = reduction.summary()
+        self.assertEqual(summary["Duplicate Tests"], 20 - 2 - reduction.n_representatives)
+        self.assertEqual(summary["Largest Group"], max(reduction.weights.values()))
+        self.assertEqual(summary["Reduction Ratio"], 20 / reduction.n_representatives)
+        self.assertEqual(set(reduced_df["TestID"]), set(reduction.groups))
+        self.assertTrue((reduced_df["Killed"] == 1).all())
+
+    def test_results_match_unreduced_pipeline(self):
+        for seed in range(5):
+            kill_matrix_df = kill_matrix_with_redundant_tests(seed)
+            self.assertEqual(results(kill_matrix_df, reduce_tests=True), results(kill_matrix_df, reduce_tests=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from helpers import KILL_MATRIX_PATH
+from server import AnalysisCache, build_project_analysis, create_server
+
+PROJECT = {"csv": [KILL_MATRIX_PATH, 1], "killmatrix": [KILL_MATRIX_PATH, 1, 0, 2]}
+
+
+class FakeAnalysis:
+
+    def __init__(self, size):
+        self.size = size
+
+    def estimated_size(self):
+        return self.size
+
+
+class TestAnalysisServer(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for file_name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, file_name))
+        os.rmdir(self.cache_dir)
+
+    def test_queries(self):
+        analysis = build_project_analysis(PROJECT, self.cache_dir)
+
+        self.assertEqual(analysis.tcap_of("m2"), 0.5)
+        self.assertEqual(analysis.tcap_of("m13"), 1.0)
+        self.assertEqual([analysis.mutants_of(node) for node in analysis.dominators_subsuming("m3")],
+                         [["m13", "m8"], ["m14", "m4", "m7", "m9"]])
+        self.assertEqual(analysis.unique_tests_of("m6"), {"t3"})
+        self.assertIsNone(analysis.unique_tests_of("m2"))
+        with self.assertRaises(KeyError):
+            analysis.tcap_of("m99")
+
+    def test_cache_evicts_least_recently_used(self):
+        loads = []
+        cache = AnalysisCache(lambda name: loads.append(name) or FakeAnalysis(40), max_bytes=100)
+
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        cache.get("b")
+        self.assertEqual(loads, ["a", "b", "c", "b"])
+        self.assertLessEqual(cache.total_bytes, 100)
+        self.assertEqual(cache.snapshot(), (["c", "b"], 80))
+
+    def test_http_queries(self):
+        server = create_server({"tcap": PROJECT}, port=0, cache_dir=self.cache_dir)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urlopen(f"{base_url}/tcap/tcap?mutant=m5") as response:
+                self.assertEqual(json.load(response), {"mutant": "m5", "tcap": 0.5})
+            with urlopen(f"{base_url}/projects") as response:
+                self.assertEqual(json.load(response)["cached"], ["tcap"])
+            with self.assertRaises(HTTPError) as error:
+                urlopen(f"{base_url}/unknown/tcap?mutant=m5")
+            self.assertEqual(error.exception.code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
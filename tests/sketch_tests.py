@@ -0,0 +1,46 @@
+import unittest
+
+import pandas as pd
+
+from analysis import MutationAnalysis
+from helpers import KILL_MATRIX_PATH, random_kill_matrix
+from sketch import estimate_mutation_subsumption
+
+
+class TestSketchEstimate(unittest.TestCase):
+
+    def test_exact_when_kill_sets_fit_in_the_sketch(self):
+        kill_matrix_df = pd.read_csv(KILL_MATRIX_PATH)
+        estimate = estimate_mutation_subsumption(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2, k=8)
+
+        self.assertEqual(set().union(*estimate.dominator_candidates()["Mutants"]),
+                         {"m8", "m13", "m4", "m7", "m9", "m14"})
+        self.assertTrue(estimate.equivalence_classes()["Exact"].all())
+        tcap_df = estimate.tcap_scores()
+        self.assertEqual(tcap_df.set_index("Mutant").loc["m2", "TCAP"], 0.5)
+        self.assertTrue((tcap_df["TCAP Error"] == 0).all())
+
+    def test_estimates_report_error_bounds(self):
+        kill_matrix_df = random_kill_matrix(seed=1, n_mutants=60, n_tests=25)
+        estimate = estimate_mutation_subsumption(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2, k=2)
+        tcap_df = estimate.tcap_scores()
+
+        self.assertTrue(((tcap_df["TCAP Error"] >= 0) & (tcap_df["TCAP Error"] <= 1)).all())
+        self.assertTrue((tcap_df.loc[~tcap_df["Exact"], "TCAP Error"] > 0).all())
+
+    def test_confirm_matches_exact_pipeline(self):
+        for seed in range(5):
+            kill_matrix_df = random_kill_matrix(seed, n_mutants=60, n_tests=25)
+            exact = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2)
+            for k in (1, 3, 64):
+                estimate = estimate_mutation_subsumption(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2, k=k)
+                dominator_mutants_df, tcap_df = estimate.confirm()
+
+                self.assertEqual(sorted(map(sorted, dominator_mutants_df["Mutants"])),
+                                 sorted(map(sorted, exact.dominator_mutants["Mutants"])))
+                self.assertEqual(dict(zip(tcap_df["Mutant"], tcap_df["TCAP"])),
+                                 dict(zip(exact.tcap_scores["Mutant"], exact.tcap_scores["TCAP"])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from helpers import KILL_MATRIX_PATH, REPO_DIR
+
+HEAVY_MODULES = ["matplotlib", "networkx", "numpy", "pandas", "pygraphviz", "tqdm"]
+
+
+def _loaded_heavy_modules(code, cwd=REPO_DIR):
+    """Run ``code`` in a fresh interpreter and return the heavy modules it ended up importing."""
+    check = f"{code}\nimport sys\nprint('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    output = subprocess.run([sys.executable, "-c", check], cwd=cwd, env=env, capture_output=True, text=True,
+                            check=True).stdout
+    loaded = output.strip().splitlines()[-1][len("loaded:"):]
+    return set(filter(None, loaded.split(",")))
+
+
+def _pipeline_command(results_dir, *extra_args):
+    return [sys.executable, os.path.join(REPO_DIR, "main.py"),
+            "--csv", KILL_MATRIX_PATH, "1", "--killmatrix", KILL_MATRIX_PATH, "1", "0", "2",
+            "--tcap", "--results_dir", results_dir, "--results_prefix", "startup", *extra_args]
+
+
+def time_command(command, repeat=5, cwd=None):
+    """Return the best wall-clock time in seconds of running ``command`` ``repeat`` times."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, capture_output=True, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_importing_main_loads_no_heavy_dependencies(self):
+        self.assertEqual(_loaded_heavy_modules("import main"), set())
+
+    def test_help_loads_no_heavy_dependencies(self):
+        code = "import sys, main\nsys.argv = ['main.py', '--help']\ntry:\n    main.main()\nexcept SystemExit:\n    pass"
+        self.assertEqual(_loaded_heavy_modules(code), set())
+
+    def test_non_plotting_path_skips_plotting_dependencies(self):
+        with tempfile.TemporaryDirectory() as results_dir:
+            code = (f"import sys, main\nsys.argv = {_pipeline_command(results_dir, '--no_plot')[1:]!r}\n"
+                    f"main.main()")
+            loaded = _loaded_heavy_modules(code, cwd=results_dir)
+        self.assertNotIn("matplotlib", loaded)
+        self.assertNotIn("pygraphviz", loaded)
+
+
+@unittest.skipUnless(os.environ.get("STARTUP_BENCHMARK"), "set STARTUP_BENCHMARK=1 to time the start-up")
+class TestStartupBenchmark(unittest.TestCase):
+
+    def test_print_startup_times(self):
+        with tempfile.TemporaryDirectory() as benchmark_dir:
+            timings = {
+                "main.py --help": time_command([sys.executable, os.path.join(REPO_DIR, "main.py"), "--help"]),
+                "main.py --tcap --no_plot": time_command(_pipeline_command(benchmark_dir, "--no_plot"),
+                                                         cwd=benchmark_dir),
+            }
+        for command, seconds in timings.items():
+            print(f"{command}: {seconds * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analysis import MutationAnalysis
+from helpers import random_kill_matrix
+from kill_matrix import encode_kill_matrix, encode_kill_matrix_to_file
+from what_if import RemovalImpact
+
+
+def rebuilt_impact(kill_matrix_df, removed_tests):
+    """Rebuild the whole analysis without the removed tests."""
+    kept_df = kill_matrix_df[~kill_matrix_df["TestID"].isin(removed_tests)]
+    before = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kill_matrix_df, 1, 0, 2)
+    after = MutationAnalysis.from_dataframes(kill_matrix_df, 1, kept_df, 1, 0, 2)
+
+    def dominator_mutants(analysis):
+        return {mutant for mutants in analysis.dominator_mutants["Mutants"] for mutant in mutants}
+
+    def killed(analysis):
+        return sum(len(analysis.mutants_of(node)) for node in analysis.merged_nodes.values() if node.tests)
+
+    return {
+        "Killed Mutants Lost": killed(before) - killed(after),
+        "Dominators After": len(after.dominator_mutants),
+        "Dominator Mutants Lost": len(dominator_mutants(before) - dominator_mutants(after)),
+        "Dominator Mutants Gained": len(dominator_mutants(after) - dominator_mutants(before)),
+        "Mean TCAP After": after.tcap_scores["TCAP"].mean(),
+    }
+
+
+class TestRemovalImpact(unittest.TestCase):
+
+    def test_impact_matches_rebuilt_analysis(self):
+        for seed in range(4):
+            kill_matrix_df = random_kill_matrix(seed, n_mutants=30, n_tests=8, kill_probability=0.25)
+            removal_impact = RemovalImpact(encode_kill_matrix(kill_matrix_df, 1, 0, 2))
+            generator = random.Random(seed)
+            subsets = [[test] for test in removal_impact.test_ids] + \
+                      [generator.sample(removal_impact.test_ids, 3) for _ in range(5)]
+            for removed_tests in subsets:
+                impact = removal_impact.impact(removed_tests)
+                expected = rebuilt_impact(kill_matrix_df, removed_tests)
+                for column, value in expected.items():
+                    self.assertAlmostEqual(impact[column], value, msg=f"{column} without {removed_tests}")
+
+    def test_ranking(self):
+        kill_matrix_df = random_kill_matrix(seed=6, n_mutants=30, n_tests=8, kill_probability=0.15)
+        impact_df = RemovalImpact(encode_kill_matrix(kill_matrix_df, 1, 0, 2)).rank()
+        self.assertEqual(len(impact_df), 8)
+        self.assertTrue(impact_df["Killed Mutants Lost"].is_monotonic_decreasing)
+        self.assertEqual(set().union(*impact_df["Removed Tests"]), set(kill_matrix_df["TestID"]))
+
+    def test_memory_mapped_classes_match(self):
+        kill_matrix_df = random_kill_matrix(seed=2, n_mutants=30, n_tests=8, kill_probability=0.25)
+        test_dir = tempfile.mkdtemp()
+        try:
+            kill_matrix_path = os.path.join(test_dir, "killmatrix.csv")
+            kill_matrix_df.to_csv(kill_matrix_path, index=False)
+            encoded = encode_kill_matrix_to_file(kill_matrix_path, 1, 0, 2, os.path.join(test_dir, "killmatrix.bits"))
+            # a small budget splits the class matrix and the subsets of the TCAP pass into several chunks
+            removal_impact = RemovalImpact(encoded, memory_budget=512, workdir=test_dir)
+            self.assertIsInstance(removal_impact.bits, np.memmap)
+            expected = RemovalImpact(encode_kill_matrix(kill_matrix_df, 1, 0, 2)).rank()
+            pd.testing.assert_frame_equal(removal_impact.rank(), expected)
+        finally:
+            shutil.rmtree(test_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
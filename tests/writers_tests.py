@@ -0,0 +1,83 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from analysis import MutationAnalysis
+from writers import check_output_options, to_list_columns, to_long_format, write_table
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+HAS_ZSTANDARD = importlib.util.find_spec("zstandard") is not None
+
+
+class TestWriters(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.analysis = MutationAnalysis.from_kill_sets({"m1": {"t1"}, "m2": {"t1"}, "m3": {"t1", "t2"},
+                                                         "m4": set()})
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_long_format_has_one_row_per_set_element(self):
+        long_df = to_long_format(self.analysis.dominator_mutants)
+        self.assertEqual(list(long_df.columns), ["Node", "Field", "Value"])
+        node = self.analysis.node_of("m1").name
+        self.assertEqual(sorted(map(tuple, long_df.values.tolist())),
+                         [(node, "Mutants", "m1"), (node, "Mutants", "m2"), (node, "Tests", "t1")])
+
+        tcap_df = self.analysis.tcap_scores
+        self.assertIs(to_long_format(tcap_df), tcap_df)
+
+    def test_empty_tables_keep_the_long_columns(self):
+        empty_df = self.analysis.dominator_mutants.iloc[:0]
+        self.assertEqual(list(to_long_format(empty_df).columns), ["Node", "Field", "Value"])
+        self.assertEqual(len(to_long_format(empty_df)), 0)
+
+    def test_list_columns_are_sorted_strings(self):
+        table = pd.DataFrame({"Node": ["X00", "X01", "X02"], "Tests": [{"t2", "t10"}, set(), {3, 1}]})
+        self.assertEqual(to_list_columns(table)["Tests"].tolist(), [["t10", "t2"], [], ["1", "3"]])
+
+    def test_compressed_long_csv_round_trip(self):
+        file_path = write_table(self.analysis.lowest_layer_mutants, self.test_dir, "p",
+                                "lowest_layer_mutant_to_unique_tests", "long_csv", "gzip")
+        self.assertTrue(file_path.endswith("p_lowest_layer_mutant_to_unique_tests_long.csv.gz"))
+        long_df = pd.read_csv(file_path)
+        self.assertEqual(set(long_df[long_df["Field"] == "Tests"]["Value"]), {"t1", "t2"})
+        self.assertEqual(set(long_df[long_df["Field"] == "Unique Tests"]["Value"]), {"t2"})
+
+    def test_default_csv_is_unchanged(self):
+        file_path = write_table(self.analysis.dominator_mutants, self.test_dir, "p", "dominator_mutants_tests")
+        expected_path = os.path.join(self.test_dir, "expected.csv")
+        self.analysis.dominator_mutants.to_csv(expected_path, index=False)
+        with open(file_path) as written, open(expected_path) as expected:
+            self.assertEqual(written.read(), expected.read())
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_parquet_has_list_columns(self):
+        file_paths = self.analysis.write_csvs(self.test_dir, "p", output_format="parquet", compression="zstd")
+        dominators_df = pd.read_parquet(file_paths[0])
+        self.assertEqual(list(dominators_df["Mutants"][0]), ["m1", "m2"])
+        self.assertEqual(list(dominators_df["Tests"][0]), ["t1"])
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            check_output_options("csv", "snappy")
+        with self.assertRaises(ValueError):
+            check_output_options("json")
+        if not HAS_PYARROW:
+            with self.assertRaises(ImportError):
+                check_output_options("parquet")
+        if not HAS_ZSTANDARD:
+            with self.assertRaises(ImportError):
+                check_output_options("csv", "zstd")
+            with self.assertRaises(ImportError):
+                check_output_options("long_csv", "zstd")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import csv
+
+import numpy as np
+import pandas as pd
+
+from kill_matrix import DEFAULT_MEMORY_BUDGET, EncodedKillMatrix, iter_row_blocks, popcount_rows, rows_per_block
+from out_of_core import classes_killed_by_tests, compute_packed_tcap, generate_packed_subsumption_graph
+
+IMPACT_COLUMNS = ["Removed Tests", "Killed Mutants Lost", "Mutation Score After", "Dominators After",
+                  "Dominator Mutants Lost", "Dominator Mutants Gained", "Mean TCAP After", "Mean TCAP Delta"]
+
+
+def read_test_subsets(test_subsets_file):
+    """Read one subset of tests per line, with the tests of a line separated by commas as in a CSV row."""
+    with open(test_subsets_file, newline="") as file:
+        rows = [[test.strip() for test in row if test.strip()] for row in csv.reader(file)]
+    return [row for row in rows if row]
+
+
+def _has_strict_subset(rows, counts, subsets, subset_counts, memory_budget):
+    """Return which packed rows have one of the ``subsets`` rows as a strict subset."""
+    found = np.zeros(len(rows), dtype=bool)
+    if len(subsets) == 0:
+        return found
+    block = max(1, rows_per_block(len(subsets) * rows.shape[1], memory_budget, copies=2))
+    for start in range(0, len(rows), block):
+        # subset[i, j]: row j of the subsets is a subset of row i of the block
+        subset = ~np.any(subsets[None, :, :] & ~rows[start:start + block, None, :], axis=2)
+        found[start:start + block] = (subset & (subset_counts[None, :] < counts[start:start + block, None])).any(axis=1)
+    return found
+
+
+class RemovalImpact:
+    """
+    The impact of removing tests on the kill matrix, the dominators, and TCAP, without rebuilding the graph.
+
+    Removing a set of tests ``R`` only shrinks the kill sets that contain one of them. A class whose kill set does
+    not meet ``R`` and was not a dominator keeps a dominator strictly below it, so it cannot become one; nor can
+    an affected class that keeps a dominator strictly below it that does not meet ``R``. The new dominators are
+    therefore the minimal sets among the original dominators and the remaining affected classes, and only those
+    candidates are compared pairwise.
+
+    The per-subset work is bounded by the classes the subset touches: the classes killed by the removed tests,
+    read by index from the class matrix, and the dominators. Over the single-test removals of ``rank``, the
+    affected classes add up to the number of kills. A class's TCAP only changes when its kill set or the
+    dominators change, so the TCAP sum is updated from those classes alone, unless the tests that detect
+    dominators change by more than the removed ones. The subsets for which that happens are collected and their
+    TCAP sums computed together, in one pass over blocks of the class matrix. The class matrix stays memory-mapped
+    when the kill matrix is and a ``workdir`` is given.
+    """
+
+    def __init__(self, encoded: EncodedKillMatrix, memory_budget=DEFAULT_MEMORY_BUDGET, workdir=None):
+        self.memory_budget = memory_budget
+        self.graph = generate_packed_subsumption_graph(encoded, memory_budget, workdir)
+        self.bits = self.graph.classes.bits
+        self.test_ids = encoded.test_ids
+        self.test_positions = {test: j for j, test in enumerate(self.test_ids)}
+        self.n_mutants = encoded.n_mutants
+
+        self.class_sizes = np.array([len(members) for members in self.graph.members], dtype=np.int64)
+        self.killed_mutants = int(self.class_sizes[self.graph.kill_counts > 0].sum())
+        self.dominators = self.graph.dominators()
+        self.dominator_rows = np.asarray(self.bits[self.dominators])
+        self.dominator_tests = np.bitwise_or.reduce(self.dominator_rows, axis=0) if len(self.dominators) \
+            else np.zeros(self.bits.shape[1], dtype=np.uint8)
+        self.tcap = compute_packed_tcap(self.graph, memory_budget)
+        self.tcap_sum = float((self.tcap * self.class_sizes).sum())
+        self._kill_offsets, self._killed_classes = classes_killed_by_tests(self.graph, memory_budget)
+
+    def _affected_classes(self, positions):
+        return np.unique(np.concatenate([self._killed_classes[self._kill_offsets[j]:self._kill_offsets[j + 1]]
+                                         for j in positions] + [np.empty(0, dtype=np.int64)]))
+
+    def _tcap_of_rows(self, rows, dominator_tests):
+        counts = popcount_rows(rows)
+        detected = popcount_rows(rows & dominator_tests)
+        return np.divide(detected, counts, out=np.zeros(len(rows)), where=counts > 0)
+
+    def _candidate_impact(self, removed_tests):
+        """
+        Compute the impact of removing the given tests from the affected classes and the dominators only.
+
+        Returns:
+            tuple: The row of ``IMPACT_COLUMNS`` without the TCAP columns, and either the TCAP sum after the removal
+            or, when it needs a pass over every class, ``None`` and the kept and dominator-detecting test masks.
+        """
+        unknown = [test for test in removed_tests if test not in self.test_positions]
+        if unknown:
+            raise ValueError(f"Tests not in the kill matrix: {unknown[:10]}")
+        positions = np.array(sorted({self.test_positions[test] for test in removed_tests}), dtype=np.int64)
+        removed = np.zeros(self.bits.shape[1], dtype=np.uint8)
+        np.bitwise_or.at(removed, positions >> 3, (np.uint8(0x80) >> (positions & 7).astype(np.uint8)))
+        kept = ~removed
+
+        affected = self._affected_classes(positions)
+        affected_rows = np.asarray(self.bits[affected]) & kept
+        affected_counts = popcount_rows(affected_rows)
+        killed_mutants_lost = int(self.class_sizes[affected[affected_counts == 0]].sum())
+
+        # the classes whose kill set or dominator status can change, with their rows after the removal
+        changed = np.union1d(self.dominators, affected)
+        rows = np.empty((len(changed), self.bits.shape[1]), dtype=np.uint8)
+        rows[np.searchsorted(changed, affected)] = affected_rows
+        rows[np.searchsorted(changed, self.dominators)] = self.dominator_rows & kept
+        counts = popcount_rows(rows)
+
+        unaffected_dominators = ~np.any(self.dominator_rows & removed, axis=1)
+        candidates = (counts > 0) & ~_has_strict_subset(rows, counts, self.dominator_rows[unaffected_dominators],
+                                                        popcount_rows(self.dominator_rows[unaffected_dominators]),
+                                                        self.memory_budget)
+        minimal = np.zeros(len(changed), dtype=bool)
+        candidate_positions = np.flatnonzero(candidates)
+        minimal[candidate_positions] = ~_has_strict_subset(rows[candidates], counts[candidates], rows[candidates],
+                                                           counts[candidates], self.memory_budget)
+        dominator_tests = np.bitwise_or.reduce(rows[minimal], axis=0) if minimal.any() else np.zeros_like(kept)
+        was_dominator = np.isin(changed, self.dominators)
+
+        row = {
+            "Removed Tests": set(removed_tests),
+            "Killed Mutants Lost": killed_mutants_lost,
+            "Mutation Score After": (self.killed_mutants - killed_mutants_lost) / max(1, self.n_mutants),
+            "Dominators After": len(np.unique(rows[minimal], axis=0)) if minimal.any() else 0,
+            "Dominator Mutants Lost": int(self.class_sizes[changed[was_dominator & ~minimal]].sum()),
+            "Dominator Mutants Gained": int(self.class_sizes[changed[~was_dominator & minimal]].sum()),
+        }
+        if not np.array_equal(dominator_tests, self.dominator_tests & kept):
+            return row, None, (kept, dominator_tests)
+        sizes = self.class_sizes[changed]
+        tcap_sum = self.tcap_sum - float((self.tcap[changed] * sizes).sum()) + \
+            float((self._tcap_of_rows(rows, dominator_tests) * sizes).sum())
+        return row, tcap_sum, None
+
+    def _tcap_sums(self, masks):
+        """
+        Compute the TCAP sum over every class for many ``(kept, dominator_tests)`` masks in one pass.
+
+        Every block of class rows is unpacked once and multiplied with the unpacked masks of a chunk of subsets, so
+        the kept and detected test counts of every class under every subset come out of two matrix products.
+        """
+        n_tests = len(self.test_ids)
+        kept = np.unpackbits(np.array([mask[0] for mask in masks]), axis=1, count=n_tests).T.astype(np.float64)
+        detecting = np.unpackbits(np.array([mask[0] & mask[1] for mask in masks]), axis=1,
+                                  count=n_tests).T.astype(np.float64)
+        sums = np.zeros(len(masks))
+        chunk = max(1, int(self.memory_budget // (4 * 8 * max(1, n_tests))))
+        for start, stop in iter_row_blocks(self.graph.n_classes, 8 * (n_tests + 4 * chunk), self.memory_budget,
+                                           copies=1):
+            unpacked = np.unpackbits(np.asarray(self.bits[start:stop]), axis=1, count=n_tests).astype(np.float64)
+            sizes = self.class_sizes[start:stop, None]
+            for chunk_start in range(0, len(masks), chunk):
+                counts = unpacked @ kept[:, chunk_start:chunk_start + chunk]
+                detected = unpacked @ detecting[:, chunk_start:chunk_start + chunk]
+                tcap = np.divide(detected, counts, out=np.zeros_like(counts), where=counts > 0)
+                sums[chunk_start:chunk_start + chunk] += (tcap * sizes).sum(axis=0)
+        return sums
+
+    def _impacts(self, test_subsets):
+        rows, tcap_sums, masks = [], [], []
+        for removed_tests in test_subsets:
+            row, tcap_sum, mask = self._candidate_impact(removed_tests)
+            rows.append(row)
+            tcap_sums.append(tcap_sum)
+            if mask is not None:
+                masks.append(mask)
+
+        full_sums = iter(self._tcap_sums(masks) if masks else [])
+        for row, tcap_sum in zip(rows, tcap_sums):
+            mean_tcap = (next(full_sums) if tcap_sum is None else tcap_sum) / max(1, self.n_mutants)
+            row["Mean TCAP After"] = mean_tcap
+            row["Mean TCAP Delta"] = mean_tcap - self.tcap_sum / max(1, self.n_mutants)
+        return rows
+
+    def impact(self, removed_tests):
+        """
+        Compute the impact of removing the given tests.
+
+        Returns:
+            dict: A row with the columns of ``IMPACT_COLUMNS``.
+        """
+        return self._impacts([removed_tests])[0]
+
+    def rank(self, test_subsets=None):
+        """
+        Compute the impact of removing every test on its own, or every given subset of tests, ranked from the
+        largest unique contribution down: the most killed mutants lost, then the most dominator mutants lost, then
+        the largest drop of the mean TCAP.
+
+        Returns:
+            pd.DataFrame: One row per test or subset with the columns of ``IMPACT_COLUMNS``.
+        """
+        if test_subsets is None:
+            test_subsets = [[test] for test in self.test_ids]
+        impact_df = pd.DataFrame(self._impacts(test_subsets), columns=IMPACT_COLUMNS)
+        impact_df = impact_df.sort_values(["Killed Mutants Lost", "Dominator Mutants Lost", "Mean TCAP Delta"],
+                                          ascending=[False, False, True], kind="stable")
+        return impact_df.reset_index(drop=True)
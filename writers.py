@@ -0,0 +1,117 @@
+from os import path
+
+OUTPUT_FORMATS = ["csv", "long_csv", "parquet"]
+CSV_COMPRESSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst", "zip": ".zip"}
+PARQUET_COMPRESSIONS = ["snappy", "gzip", "brotli", "zstd", "lz4"]
+# the columns of the result tables that hold sets, used to tell the set columns of an empty table
+SET_COLUMNS = ["Mutants", "Tests", "Unique Tests", "Removed Tests", "Parent Mutants", "Child Mutants"]
+
+
+def check_output_options(output_format="csv", compression=None):
+    """
+    Check that the output format and compression go together, and that their optional packages are installed, so
+    that a run fails before the graph is built rather than at its first write.
+
+    Raises:
+        ValueError: When the compression is not available for the format.
+        ImportError: When Parquet is requested and pyarrow is not installed, or zstd-compressed CSV files are
+            requested and zstandard is not installed.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if output_format == "parquet":
+        if compression is not None and compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"Parquet files support the compressions {PARQUET_COMPRESSIONS}, not {compression}")
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Writing Parquet files requires pyarrow: pip install pyarrow")
+    elif compression is not None and compression not in CSV_COMPRESSIONS:
+        raise ValueError(f"CSV files support the compressions {list(CSV_COMPRESSIONS)}, not {compression}")
+    elif compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise ImportError("Writing zstd-compressed CSV files requires zstandard: pip install zstandard")
+
+
+def _is_set(value):
+    return isinstance(value, (set, frozenset))
+
+
+def _set_columns(table):
+    if not len(table):
+        return [column for column in table.columns if column in SET_COLUMNS]
+    return [column for column in table.columns if all(map(_is_set, table[column]))]
+
+
+def _node_names(table):
+    """Replace the MutantNode objects of the Node column with their short names."""
+    if "Node" in table.columns:
+        table = table.assign(Node=[getattr(node, "name", node) for node in table["Node"]])
+    return table
+
+
+def _sorted_lists(values):
+    """Turn a column of sets into sorted lists of strings, exploding all the sets at once."""
+    import pandas as pd
+
+    values = values.reset_index(drop=True)
+    elements = values.explode().dropna().astype(str).rename("Value").rename_axis("Row").reset_index()
+    grouped = elements.sort_values(["Row", "Value"], kind="stable").groupby("Row")["Value"].agg(list)
+    lists = pd.Series([[] for _ in range(len(values))], dtype=object)
+    lists.iloc[grouped.index.to_numpy()] = grouped.to_numpy()
+    return lists.to_numpy()
+
+
+def to_list_columns(table):
+    """Return a copy of the table with Node names and every set column as sorted lists of strings."""
+    table = _node_names(table)
+    return table.assign(**{column: _sorted_lists(table[column]) for column in _set_columns(table)})
+
+
+def to_long_format(table):
+    """
+    Explode every set column into one row per element.
+
+    The other columns identify each row; the set columns are replaced by a Field column naming the exploded
+    column and a Value column holding one of its elements. The set columns are melted into Field and Value and
+    then exploded in bulk, and an empty table gets the same columns. Tables without set columns are returned as
+    they are.
+    """
+    table = _node_names(table)
+    set_columns = _set_columns(table)
+    if not set_columns:
+        return table
+    id_columns = [column for column in table.columns if column not in set_columns]
+
+    long_df = table.reset_index(drop=True).melt(id_vars=id_columns, value_vars=set_columns, var_name="Field",
+                                                value_name="Value", ignore_index=False)
+    long_df = long_df.explode("Value").dropna(subset=["Value"])
+    long_df = long_df.assign(Value=long_df["Value"].astype(str),
+                             Position=long_df["Field"].map({field: i for i, field in enumerate(set_columns)}))
+    long_df = long_df.rename_axis("Row").sort_values(["Row", "Position", "Value"], kind="stable")
+    return long_df.drop(columns="Position").reset_index(drop=True)
+
+
+def write_table(table, results_dir, results_prefix, name, output_format="csv", compression=None):
+    """
+    Write one result table as ``{results_prefix}_{name}`` in the requested format.
+
+    ``csv`` keeps the layout written by ``to_csv``; ``long_csv`` writes ``{name}_long.csv`` with the set columns
+    exploded by ``to_long_format``; ``parquet`` writes list-typed columns. CSV compressions add their usual
+    extension (e.g. ``.csv.gz``).
+
+    Returns:
+        str: The path of the written file.
+    """
+    if output_format == "parquet":
+        file_path = path.join(results_dir, f"{results_prefix}_{name}.parquet")
+        to_list_columns(table).to_parquet(file_path, index=False, compression=compression or "snappy")
+        return file_path
+
+    if output_format == "long_csv":
+        table, name = to_long_format(table), f"{name}_long"
+    file_path = path.join(results_dir, f"{results_prefix}_{name}.csv{CSV_COMPRESSIONS.get(compression, '')}")
+    table.to_csv(file_path, index=False, compression=compression)
+    return file_path